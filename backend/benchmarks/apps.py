@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class BenchmarksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'benchmarks'
+    verbose_name = 'Нагрузочное тестирование'
+    verbose_name_plural = 'Нагрузочное тестирование'
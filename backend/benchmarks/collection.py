@@ -0,0 +1,197 @@
+"""Сценарий нагрузочного теста из Postman-коллекции.
+
+Берутся только запросы, которые должны выполняться успешно: папки
+*_bad_requests пропускаются. Папка register_and_get_tokens выполняется
+один раз при старте виртуального пользователя, остальные запросы - по
+кругу. Значения, которые тесты коллекции сохраняют через
+pm.collectionVariables.set, извлекаются из ответов так же.
+"""
+
+import json
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import quote
+
+BAD_REQUESTS_FOLDER = 'bad_requests'
+SETUP_FOLDER = 'register_and_get_tokens'
+
+# Во сколько раз повторять читающие запросы папки или запроса за круг.
+DEFAULT_WEIGHTS = {
+    'get_recipes': 10,
+    'recipe_filters_for_favorite_and_shopping_cart': 5,
+    'get_recipe_short_link': 2,
+    'get_subscriptions': 3,
+    'get_tags_info': 3,
+    'get_ingradients': 3,
+    'get_user_info': 2,
+    'download_shopping_cart': 2,
+}
+
+VARIABLE = re.compile(r'{{(\w+)}}')
+UNIQUE_VARIABLE = re.compile(r'(?i)(username|email)$')
+EXPECTED_STATUS = re.compile(r'Статус-код ответа должен быть (\d{3})')
+CONSTANT = re.compile(r'const (\w+) = _\.get\(responseData, "(\w+)"\)')
+SET_VARIABLE = re.compile(
+    r'pm\.collectionVariables\.set\(["\'](\w+)["\'],\s*(.+)\);?$'
+)
+RESPONSE_VALUE = re.compile(
+    r'responseData((?:\[\d+\]|\.\w+)*?)(?:\.slice\(0,\s*(\d+)\))?'
+)
+PATH_PART = re.compile(r'\[(\d+)\]|\.(\w+)')
+
+
+class Capture(NamedTuple):
+    """Переменная, значение которой берется из JSON-ответа."""
+
+    variable: str
+    path: tuple
+    length: Optional[int] = None
+
+    def extract(self, data) -> str:
+        for key in self.path:
+            data = data[key]
+        value = str(data)
+        return value if self.length is None else value[:self.length]
+
+
+class Step(NamedTuple):
+    name: str
+    folders: tuple
+    method: str
+    url: str
+    body: Optional[str]
+    token: Optional[str]
+    expected_status: Optional[int]
+    captures: tuple
+
+    @property
+    def route(self) -> str:
+        """Маршрут для отчета: метод, шаблон адреса и вид авторизации."""
+        route = f'{self.method} {self.url}'
+        return route + ' [token]' if self.token else route
+
+
+def render(template: str, variables: dict, url: bool = False) -> str:
+    def value(match):
+        result = variables[match.group(1)]
+        return quote(result, safe='') if url else result
+    return VARIABLE.sub(value, template)
+
+
+def parse_captures(script) -> tuple:
+    constants = {}
+    captures = []
+    for line in map(str.strip, script):
+        match = CONSTANT.search(line)
+        if match:
+            constants[match.group(1)] = ('.' + match.group(2), None)
+            continue
+        match = SET_VARIABLE.search(line)
+        if match is None:
+            continue
+        variable, expression = match.groups()
+        if expression in constants:
+            path, length = constants[expression]
+        else:
+            value = RESPONSE_VALUE.fullmatch(expression)
+            if value is None:
+                continue
+            path, length = value.groups()
+        captures.append(Capture(
+            variable,
+            tuple(
+                int(index) if index else key
+                for index, key in PATH_PART.findall(path)
+            ),
+            int(length) if length else None
+        ))
+    return tuple(captures)
+
+
+def request_token(auth: Optional[dict], inherited: Optional[str]):
+    """Переменная с токеном запроса; без auth он наследуется от папки."""
+    if auth is None:
+        return inherited
+    if auth['type'] != 'apikey':
+        return None
+    value = {item['key']: item['value'] for item in auth['apikey']}['value']
+    return VARIABLE.search(value).group(1)
+
+
+def iter_steps(items, folders=(), token=None):
+    for item in items:
+        item_token = request_token(item.get('auth'), token)
+        if 'item' in item:
+            if not item['name'].endswith(BAD_REQUESTS_FOLDER):
+                yield from iter_steps(
+                    item['item'],
+                    (*folders, item['name'].split(' //')[0]),
+                    item_token
+                )
+            continue
+        request = item['request']
+        script = [
+            line
+            for event in item.get('event', ())
+            if event['listen'] == 'test'
+            for line in event['script']['exec']
+        ]
+        status = EXPECTED_STATUS.search('\n'.join(script))
+        url = request['url']
+        yield Step(
+            name=item['name'],
+            folders=folders,
+            method=request['method'],
+            url=(url if isinstance(url, str) else url['raw']).replace(
+                '{{baseUrl}}', ''
+            ),
+            body=(request.get('body') or {}).get('raw') or None,
+            token=request_token(request.get('auth'), token),
+            expected_status=int(status.group(1)) if status else None,
+            captures=parse_captures(script),
+        )
+
+
+def load_collection(path):
+    """Переменные коллекции, шаги подготовки и шаги одного круга."""
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    variables = {
+        variable['key']: variable['value']
+        for variable in collection.get('variable', ())
+    }
+    setup, steps = [], []
+    for step in iter_steps(collection['item']):
+        (setup if step.folders[0] == SETUP_FOLDER else steps).append(step)
+    return variables, setup, steps
+
+
+def unique_variables(variables: dict, prefix: str) -> dict:
+    """Переменные с уникальными для виртуального пользователя логинами.
+
+    Значения хранятся в коллекции вместе с JSON-кавычками, префикс
+    вставляется после открывающей кавычки.
+    """
+    result = dict(variables)
+    for key, value in variables.items():
+        if UNIQUE_VARIABLE.search(key) and not key.startswith('tooLong'):
+            result[key] = json.dumps(prefix + json.loads(value))
+    return result
+
+
+def weighted_steps(steps, weights: dict) -> list:
+    """Шаги круга с повторами читающих запросов.
+
+    Вес задается для имени запроса или папки. Изменяющие запросы
+    выполняются один раз: от них зависят следующие шаги сценария.
+    """
+    result = []
+    for step in steps:
+        repeats = 1
+        if step.method == 'GET':
+            repeats = weights.get(step.name) or max(
+                (weights.get(folder, 1) for folder in step.folders),
+                default=1
+            )
+        result += [step] * repeats
+    return result
@@ -0,0 +1,419 @@
+"""Синтетический набор данных для проверки производительности.
+
+Строки выводятся из seed: повторный запуск на той же базе дает те же
+связи. Авторы рецептов, подписки, избранное и корзины распределены по
+степенному закону: немногие пользователи и рецепты собирают большую
+часть подписчиков и добавлений. Рецепты ссылаются на небольшой пул
+изображений, а не на отдельный файл каждый.
+"""
+
+import csv
+import io
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from favorite_recipes.models import UserFavoriteRecipes
+from foodgram_backend.constants import (DATASET_FAVORITES_PER_USER,
+                                        DATASET_HISTORY_DAYS,
+                                        DATASET_IMAGE_SIZE,
+                                        DATASET_INGREDIENTS_PER_RECIPE,
+                                        DATASET_POWER_LAW_EXPONENT,
+                                        DATASET_SHOPPING_CART_PER_USER,
+                                        DATASET_SUBSCRIPTIONS_PER_USER,
+                                        DATASET_TAGS_PER_RECIPE,
+                                        IMAGE_DERIVATIVE_SIZES)
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe, Recipe
+from shoppingcart_recipes.models import UserRecipeShoppingCart
+from tags.models import Tag
+from user_subscriptions.models import Subscription
+from utils.images import build_derivatives, derivative_name
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'dataset-'
+PASSWORD = 'foodgram-dataset'
+IMAGE_DIRECTORY = 'recipe_images/dataset'
+FIRST_NAMES = (
+    'Александр', 'Анна', 'Дмитрий', 'Елена', 'Иван', 'Мария', 'Никита',
+    'Ольга', 'Сергей', 'Татьяна',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров',
+    'Соколов', 'Михайлов', 'Новиков', 'Федоров',
+)
+RECIPE_TEXT = (
+    'Подготовьте ингредиенты, смешайте их в указанном порядке и '
+    'готовьте до готовности.'
+)
+
+
+def power_law_cdf(size: int, exponent: float) -> np.ndarray:
+    """Накопленные вероятности рангов 1..size с весами rank ** -exponent."""
+    cdf = np.cumsum(np.arange(1, size + 1, dtype=np.float64) ** -exponent)
+    return cdf / cdf[-1]
+
+
+def sample_ranks(rng, cdf: np.ndarray, count: int) -> np.ndarray:
+    ranks = np.searchsorted(cdf, rng.random(count), side='right')
+    return np.minimum(ranks, len(cdf) - 1)
+
+
+def unique_pairs(left: np.ndarray, right: np.ndarray):
+    """Пары (left, right) без повторов, отсортированные по left."""
+    base = int(right.max()) + 1 if len(right) else 1
+    keys = np.unique(left * base + right)
+    return keys // base, keys % base
+
+
+def to_datetimes(timestamps: np.ndarray) -> list:
+    return [
+        datetime.fromtimestamp(timestamp, timezone.utc)
+        for timestamp in timestamps.tolist()
+    ]
+
+
+@contextmanager
+def explicit_timestamps(models):
+    """Отключает auto_now и auto_now_add, чтобы сохранились даты набора."""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def render_image(number: int) -> bytes:
+    rng = np.random.default_rng(number)
+    black, white = (tuple(rng.integers(0, 256, 3).tolist()) for _ in range(2))
+    gradient = Image.linear_gradient('L').rotate(
+        float(rng.integers(0, 360)), expand=True
+    ).resize(DATASET_IMAGE_SIZE)
+    buffer = io.BytesIO()
+    ImageOps.colorize(gradient, black, white).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def image_pool(size: int) -> list:
+    """Изображения пула вместе с уменьшенными копиями.
+
+    Недостающие файлы создаются, существующие используются повторно.
+    """
+    names = []
+    for number in range(size):
+        name = f'{IMAGE_DIRECTORY}/{number}.jpg'
+        if not default_storage.exists(name):
+            name = default_storage.save(
+                name, ContentFile(render_image(number))
+            )
+        if not all(
+            default_storage.exists(derivative_name(name, derivative))
+            for derivative in IMAGE_DERIVATIVE_SIZES
+        ):
+            build_derivatives(name)
+        names.append(name)
+    return names
+
+
+class OrmWriter:
+    """Пакетная запись через bulk_create."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def write(self, model, rows: dict) -> int:
+        fields = list(rows)
+        objects = [
+            model(**dict(zip(fields, values)))
+            for values in zip(*rows.values())
+        ]
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        return len(objects)
+
+
+class CopyWriter(OrmWriter):
+    """Запись через COPY в PostgreSQL.
+
+    Поля, которых нет в rows, заполняются значениями по умолчанию.
+    """
+
+    @staticmethod
+    def format(value):
+        if value is None:
+            return r'\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def write(self, model, rows: dict) -> int:
+        count = len(next(iter(rows.values())))
+        columns = []
+        values = []
+        for field in model._meta.concrete_fields:
+            if field.attname in rows:
+                values.append(rows[field.attname])
+            elif field.primary_key:
+                continue
+            else:
+                values.append([field.get_default()] * count)
+            columns.append(field.column)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in zip(*values):
+            writer.writerow(map(self.format, row))
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {model._meta.db_table} ({", ".join(columns)}) '
+                "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        return count
+
+
+class DatasetGenerator:
+    """Пользователи, подписки, рецепты, избранное и корзины.
+
+    Каждая стадия делится на куски по chunk_size строк, куски пишутся
+    параллельно в workers потоках, каждый в своей транзакции. Id
+    пользователей и рецептов назначаются заранее после текущих
+    максимальных, поэтому куски не зависят друг от друга, а случайные
+    значения куска зависят только от seed, стадии и номера куска.
+    """
+
+    def __init__(
+            self, users: int, recipes: int, seed: int, writer, workers: int,
+            chunk_size: int, images
+    ):
+        self.users = users
+        self.recipes = recipes
+        self.seed = seed
+        self.writer = writer
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.images = images
+        self.user_start = (
+            User.objects.aggregate(Max('id'))['id__max'] or 0
+        ) + 1
+        self.recipe_start = (
+            Recipe.objects.aggregate(Max('id'))['id__max'] or 0
+        ) + 1
+        self.tag_ids = np.array(
+            Tag.objects.order_by('id').values_list('id', flat=True),
+            dtype=np.int64
+        )
+        self.ingredient_ids = np.array(
+            Ingredient.objects.order_by('id').values_list('id', flat=True),
+            dtype=np.int64
+        )
+        rng = np.random.default_rng(seed)
+        # Номера пользователей, рецептов и ингредиентов по убыванию
+        # популярности: популярные разбросаны по всему диапазону id.
+        self.user_ranks = rng.permutation(users)
+        self.recipe_ranks = rng.permutation(recipes)
+        self.ingredient_ranks = rng.permutation(len(self.ingredient_ids))
+        self.user_cdf = power_law_cdf(users, DATASET_POWER_LAW_EXPONENT)
+        self.recipe_cdf = power_law_cdf(recipes, DATASET_POWER_LAW_EXPONENT)
+        self.ingredient_cdf = power_law_cdf(
+            len(self.ingredient_ids), DATASET_POWER_LAW_EXPONENT
+        )
+        self.end = timezone.now().timestamp()
+        self.span = timedelta(days=DATASET_HISTORY_DAYS).total_seconds()
+        self.start = self.end - self.span
+        self.password = make_password(PASSWORD)
+
+    def generate(self, log=None):
+        """Создает набор по стадиям, возвращает число строк по моделям."""
+        stages = (
+            (self.create_users, self.users),
+            (self.create_subscriptions, self.users),
+            (self.create_recipes, self.recipes),
+            (self.create_favorites, self.users),
+            (self.create_shopping_carts, self.users),
+        )
+        total = Counter()
+        with explicit_timestamps((Recipe, UserFavoriteRecipes,
+                                  UserRecipeShoppingCart)):
+            for number, (task, size) in enumerate(stages):
+                written = self.run_stage(number, task, size)
+                if log:
+                    for label, count in written.items():
+                        log(label, count)
+                total.update(written)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), (User, Recipe)
+            ):
+                cursor.execute(sql)
+        return total
+
+    def run_stage(self, stage: int, task, size: int) -> Counter:
+        def run(start):
+            rng = np.random.default_rng((self.seed, stage, start))
+            with transaction.atomic():
+                return task(start, min(start + self.chunk_size, size), rng)
+
+        def run_in_thread(start):
+            try:
+                return run(start)
+            finally:
+                connection.close()
+
+        starts = range(0, size, self.chunk_size)
+        written = Counter()
+        if self.workers == 1:
+            for counts in map(run, starts):
+                written.update(counts)
+            return written
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix='dataset'
+        ) as executor:
+            for counts in executor.map(run_in_thread, starts):
+                written.update(counts)
+        return written
+
+    def recipe_moments(self, positions: np.ndarray) -> np.ndarray:
+        """Время публикации рецептов: равномерно по истории в порядке id."""
+        return self.start + self.span * (positions + 0.5) / self.recipes
+
+    def write(self, model, rows: dict) -> dict:
+        return {model._meta.label: self.writer.write(model, rows)}
+
+    def create_users(self, start: int, stop: int, rng) -> dict:
+        ids = (self.user_start + np.arange(start, stop)).tolist()
+        size = len(ids)
+        return self.write(User, {
+            'id': ids,
+            'username': [f'{USERNAME_PREFIX}{pk}' for pk in ids],
+            'email': [f'{USERNAME_PREFIX}{pk}@example.com' for pk in ids],
+            'first_name': [
+                FIRST_NAMES[index]
+                for index in rng.integers(len(FIRST_NAMES), size=size)
+            ],
+            'last_name': [
+                LAST_NAMES[index]
+                for index in rng.integers(len(LAST_NAMES), size=size)
+            ],
+            'password': [self.password] * size,
+            'is_active': [True] * size,
+            'date_joined': to_datetimes(
+                self.start - rng.random(size) * self.span
+            ),
+        })
+
+    def create_subscriptions(self, start: int, stop: int, rng) -> dict:
+        counts = rng.poisson(DATASET_SUBSCRIPTIONS_PER_USER, stop - start)
+        subscribers = np.repeat(np.arange(start, stop), counts)
+        targets = self.user_ranks[
+            sample_ranks(rng, self.user_cdf, int(counts.sum()))
+        ]
+        keep = subscribers != targets
+        subscribers, targets = unique_pairs(subscribers[keep], targets[keep])
+        return self.write(Subscription, {
+            'subscriber_id': (self.user_start + subscribers).tolist(),
+            'subscribe_target_id': (self.user_start + targets).tolist(),
+        })
+
+    def create_recipes(self, start: int, stop: int, rng) -> dict:
+        positions = np.arange(start, stop)
+        ids = self.recipe_start + positions
+        size = len(ids)
+        authors = self.user_ranks[sample_ranks(rng, self.user_cdf, size)]
+        created = to_datetimes(self.recipe_moments(positions))
+        cooking_times = np.clip(
+            np.rint(rng.lognormal(3.3, 0.7, size)), 1, 600
+        ).astype(np.int64)
+        written = self.write(Recipe, {
+            'id': ids.tolist(),
+            'name': [f'Рецепт {pk}' for pk in ids.tolist()],
+            'text': [RECIPE_TEXT] * size,
+            'cooking_time': cooking_times.tolist(),
+            'image': [
+                self.images[index]
+                for index in rng.integers(len(self.images), size=size)
+            ],
+            'has_image_derivatives': [True] * size,
+            'created_at': created,
+            'updated_at': created,
+            'author_id': (self.user_start + authors).tolist(),
+        })
+
+        low, high = DATASET_TAGS_PER_RECIPE
+        counts = rng.integers(low, high + 1, size)
+        recipe_ids, tag_ids = unique_pairs(
+            np.repeat(ids, counts),
+            self.tag_ids[rng.integers(len(self.tag_ids), size=counts.sum())]
+        )
+        written.update(self.write(Recipe.tags.through, {
+            'recipe_id': recipe_ids.tolist(),
+            'tag_id': tag_ids.tolist(),
+        }))
+
+        low, high = DATASET_INGREDIENTS_PER_RECIPE
+        counts = rng.integers(low, high + 1, size)
+        recipe_ids, ingredient_ids = unique_pairs(
+            np.repeat(ids, counts),
+            self.ingredient_ids[self.ingredient_ranks[
+                sample_ranks(rng, self.ingredient_cdf, int(counts.sum()))
+            ]]
+        )
+        written.update(self.write(IngredientRecipe, {
+            'recipe_id': recipe_ids.tolist(),
+            'ingredient_id': ingredient_ids.tolist(),
+            'amount': rng.integers(1, 501, len(recipe_ids)).tolist(),
+        }))
+        return written
+
+    def create_user_recipes(self, model, mean: int, start, stop, rng):
+        """Рецепты в избранном или корзине, добавленные после публикации."""
+        counts = rng.poisson(mean, stop - start)
+        users, positions = unique_pairs(
+            np.repeat(np.arange(start, stop), counts),
+            self.recipe_ranks[
+                sample_ranks(rng, self.recipe_cdf, int(counts.sum()))
+            ]
+        )
+        published = self.recipe_moments(positions)
+        return self.write(model, {
+            'user_id': (self.user_start + users).tolist(),
+            'recipe_id': (self.recipe_start + positions).tolist(),
+            'created_at': to_datetimes(
+                published + rng.random(len(users)) * (self.end - published)
+            ),
+        })
+
+    def create_favorites(self, start: int, stop: int, rng) -> dict:
+        return self.create_user_recipes(
+            UserFavoriteRecipes, DATASET_FAVORITES_PER_USER, start, stop, rng
+        )
+
+    def create_shopping_carts(self, start: int, stop: int, rng) -> dict:
+        return self.create_user_recipes(
+            UserRecipeShoppingCart, DATASET_SHOPPING_CART_PER_USER,
+            start, stop, rng
+        )
@@ -0,0 +1,136 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.dataset import (PASSWORD, USERNAME_PREFIX, CopyWriter,
+                                DatasetGenerator, OrmWriter, image_pool)
+from foodgram_backend.constants import (DATASET_BATCH_SIZE,
+                                        DATASET_CHUNK_SIZE,
+                                        DATASET_IMAGE_POOL_SIZE,
+                                        DATASET_PRESETS, DATASET_WORKERS)
+from ingredients.models import Ingredient
+from recipes.ingredient_index import recipe_ingredient_index
+from tags.models import Tag
+
+# Производные данные, которые bulk-запись не обновляет сигналами.
+REBUILD_COMMANDS = (
+    ('reconcile_counters',),
+    ('rebuild_shopping_lists',),
+    ('rebuild_feeds',),
+    ('compute_similar_recipes',),
+    ('rebuild_trending', '--activity'),
+)
+# Команды, которые на больших наборах идут долго и включаются флагом.
+OPT_IN_COMMANDS = {'compute_similar_recipes': 'similar'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает синтетический набор пользователей, рецептов, подписок, '
+        'избранного и корзин со степенным распределением популярности.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'preset',
+            nargs='?',
+            choices=DATASET_PRESETS,
+            default='10k',
+            help='Размер набора по числу рецептов.'
+        )
+        parser.add_argument('--users', type=int, help='Вместо пресета.')
+        parser.add_argument('--recipes', type=int, help='Вместо пресета.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DATASET_WORKERS,
+            help='Потоков записи на PostgreSQL; SQLite пишется в один.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DATASET_CHUNK_SIZE,
+            help='Строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DATASET_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=DATASET_IMAGE_POOL_SIZE,
+            help='Размер пула изображений рецептов.'
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.'
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help='Не пересчитывать счетчики, ленты, списки покупок '
+                 'и популярные рецепты.'
+        )
+        parser.add_argument(
+            '--similar',
+            action='store_true',
+            help='Пересчитать и похожие рецепты; на больших наборах '
+                 'это самый долгий шаг.'
+        )
+
+    def handle(self, *args, preset, seed, chunk_size, batch_size, **options):
+        users, recipes = DATASET_PRESETS[preset]
+        users = options['users'] or users
+        recipes = options['recipes'] or recipes
+        if users < 2 or recipes < 1:
+            raise CommandError('Нужны минимум 2 пользователя и 1 рецепт.')
+        if not Tag.objects.exists() or Ingredient.objects.count() < 2:
+            raise CommandError(
+                'Нужны тэги и ингредиенты: выполните manage.py load_catalog.'
+            )
+        postgres = connection.vendor == 'postgresql'
+        writer = (
+            CopyWriter(batch_size) if postgres and not options['no_copy']
+            else OrmWriter(batch_size)
+        )
+        workers = options['workers'] if postgres else 1
+
+        started = time.perf_counter()
+        images = image_pool(options['images'])
+        generator = DatasetGenerator(
+            users, recipes, seed, writer, workers, chunk_size, images
+        )
+        generator.generate(log=self.log_stage(started))
+        recipe_ingredient_index.invalidate()
+        self.stdout.write(
+            f'Пользователи {USERNAME_PREFIX}<id>@example.com, '
+            f'пароль {PASSWORD}'
+        )
+        if options['skip_rebuild']:
+            return
+        for command in REBUILD_COMMANDS:
+            flag = OPT_IN_COMMANDS.get(command[0])
+            if flag and not options[flag]:
+                self.stdout.write(
+                    f'{command[0]}: пропущено, включите --{flag}'
+                )
+                continue
+            step_started = time.perf_counter()
+            call_command(*command, stdout=self.stdout, stderr=self.stderr)
+            self.stdout.write(
+                f'{command[0]}: {time.perf_counter() - step_started:.1f} с'
+            )
+
+    def log_stage(self, started):
+        def log(label, count):
+            elapsed = max(time.perf_counter() - started, 1e-6)
+            self.stdout.write(
+                f'{label}: {count} строк, {elapsed:.1f} с с начала'
+            )
+        return log
@@ -0,0 +1,236 @@
+import json
+import math
+import secrets
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from benchmarks.collection import (DEFAULT_WEIGHTS, load_collection,
+                                   weighted_steps)
+from benchmarks.runner import (LoadTestError, VirtualUser, compare,
+                               fetch_json, gunicorn_server, summarize)
+from foodgram_backend.constants import (LOAD_TEST_DURATION, LOAD_TEST_USERS,
+                                        LOAD_TEST_WORKERS)
+
+DEFAULT_COLLECTION = (
+    Path(settings.BASE_DIR).parent
+    / 'postman_collection' / 'foodgram.postman_collection.json'
+)
+USERNAME_PREFIX = 'loadtest-'
+COLUMNS = ('requests', 'errors', 'rps', 'p50', 'p95', 'p99')
+CHANGES = ('rps', 'p50', 'p95', 'p99')
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест API по сценарию из Postman-коллекции: '
+        'пропускная способность и задержки p50/p95/p99 по маршрутам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            default=str(DEFAULT_COLLECTION),
+            help='Файл Postman-коллекции.'
+        )
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного бэкенда. По умолчанию запускается '
+                 'gunicorn с БД из текущего окружения (SQLite или '
+                 'PostgreSQL при DB_POSTGRES).'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=LOAD_TEST_WORKERS,
+            help='Число воркеров gunicorn.'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=LOAD_TEST_USERS,
+            help='Число одновременных виртуальных пользователей.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            help='Секунды, после которых новые круги сценария не '
+                 f'начинаются. По умолчанию {LOAD_TEST_DURATION}, если не '
+                 'задан --iterations.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            help='Число кругов сценария на пользователя.'
+        )
+        parser.add_argument(
+            '--weights',
+            help='JSON-файл {"папка или запрос": повторы} для читающих '
+                 'запросов вместо весов по умолчанию.'
+        )
+        parser.add_argument(
+            '--save',
+            help='Сохранить результаты в JSON-файл, например как базовые.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-файл результатов для сравнения.'
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            help='Завершиться с ошибкой, если p95 какого-либо маршрута '
+                 'выросла относительно --baseline больше чем на столько '
+                 'процентов.'
+        )
+        parser.add_argument(
+            '--keep-users',
+            action='store_true',
+            help='Не удалять созданных тестом пользователей.'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            baseline = self.read_json(options['baseline'])
+        weights = DEFAULT_WEIGHTS
+        if options['weights']:
+            weights = self.read_json(options['weights'])
+        try:
+            variables, setup, steps = load_collection(options['collection'])
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Не удалось прочитать коллекцию: {error}')
+        steps = weighted_steps(steps, weights)
+        iterations = options['iterations']
+        duration = options['duration']
+        if duration is None:
+            duration = math.inf if iterations else LOAD_TEST_DURATION
+        prefix = f'{USERNAME_PREFIX}{secrets.token_hex(3)}-'
+
+        started_at = timezone.now()
+        try:
+            with self.server(options['url'], options['workers']) as address:
+                self.check_catalog(*address)
+                deadline = time.monotonic() + duration
+                users = [
+                    VirtualUser(
+                        *address, variables, f'{prefix}{number}-',
+                        setup, steps, deadline, iterations
+                    )
+                    for number in range(options['users'])
+                ]
+                for user in users:
+                    user.start()
+                for user in users:
+                    user.join()
+            for user in users:
+                if user.failure:
+                    self.stderr.write(
+                        f'Пользователь {user.name} не прошел подготовку: '
+                        f'{user.failure}'
+                    )
+            results = summarize(users)
+        except LoadTestError as error:
+            raise CommandError(str(error))
+        finally:
+            if not options['keep_users']:
+                get_user_model().objects.filter(
+                    username__startswith=prefix
+                ).delete()
+
+        results['meta'] = {
+            'started_at': started_at.isoformat(),
+            'collection': Path(options['collection']).name,
+            'url': options['url'],
+            'workers': None if options['url'] else options['workers'],
+            'database': None if options['url'] else connection.vendor,
+            'users': options['users'],
+            'iterations': iterations,
+            'steps_per_iteration': len(steps),
+            'weights': weights,
+        }
+        changes = compare(results, baseline) if baseline else {}
+        self.report(results, changes)
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if baseline and options['max_regression'] is not None:
+            regressions = [
+                f'{route}: p95 {change["p95"]:+.1f}%'
+                for route, change in changes.items()
+                if change.get('p95', 0) > options['max_regression']
+            ]
+            if regressions:
+                raise CommandError(
+                    'Задержки выросли относительно базового запуска:\n'
+                    + '\n'.join(regressions)
+                )
+
+    @staticmethod
+    def read_json(path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+
+    @staticmethod
+    @contextmanager
+    def server(url, workers):
+        if not url:
+            with gunicorn_server(workers) as address:
+                yield address
+            return
+        parts = urlsplit(url)
+        yield parts.hostname, parts.port or 80
+
+    @staticmethod
+    def check_catalog(host, port):
+        """Сценарию нужны как минимум три тэга и два ингредиента."""
+        try:
+            tags = fetch_json(host, port, '/api/tags/')
+            ingredients = fetch_json(host, port, '/api/ingredients/')
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Бэкенд недоступен: {error}')
+        if len(tags) < 3 or len(ingredients) < 2:
+            raise CommandError(
+                'Для теста нужны минимум 3 тэга и 2 ингредиента: '
+                'выполните manage.py load_catalog.'
+            )
+
+    def report(self, results, changes):
+        meta = results['meta']
+        self.stdout.write(
+            f'Пользователей: {meta["users"]}, шагов в круге: '
+            f'{meta["steps_per_iteration"]}, '
+            f'время: {results["elapsed"]:.1f} с'
+        )
+        header = f'{"маршрут":<72}' + ''.join(
+            f'{column:>10}' for column in COLUMNS
+        )
+        if changes:
+            header += ''.join(f'{"Δ" + name:>9}' for name in CHANGES)
+        self.stdout.write(header)
+        rows = [*results['routes'].items(), ('всего', results['total'])]
+        for route, stats in rows:
+            line = f'{route:<72}' + ''.join(
+                f'{"-" if stats[column] is None else stats[column]:>10}'
+                for column in COLUMNS
+            )
+            change = changes.get('total' if route == 'всего' else route)
+            if change:
+                line += ''.join(
+                    f'{change[name]:>+8.1f}%' if name in change else ' ' * 9
+                    for name in CHANGES
+                )
+            self.stdout.write(line)
+        for route, stats in results['routes'].items():
+            for reason, count in stats['error_reasons'].items():
+                self.stderr.write(f'{route}: {reason} x{count}')
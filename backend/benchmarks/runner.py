@@ -0,0 +1,276 @@
+"""Виртуальные пользователи, gunicorn для теста и статистика задержек."""
+
+import http.client
+import json
+import math
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+
+from foodgram_backend.constants import (LOAD_TEST_REQUEST_TIMEOUT,
+                                        LOAD_TEST_SERVER_TIMEOUT)
+from .collection import render, unique_variables
+
+PERCENTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+
+
+class LoadTestError(Exception):
+    pass
+
+
+class VirtualUser(threading.Thread):
+    """Проходит шаги подготовки, затем повторяет круг шагов сценария.
+
+    Новый круг не начинается после deadline или после iterations кругов,
+    так что каждый круг удаляет созданные им объекты. Задержки пишутся
+    только для шагов круга.
+    """
+
+    def __init__(
+            self, host: str, port: int, variables: dict, prefix: str,
+            setup, steps, deadline: float, iterations=None
+    ):
+        super().__init__(name=prefix.rstrip('-'), daemon=True)
+        self.host = host
+        self.port = port
+        self.variables = unique_variables(variables, prefix)
+        self.setup = setup
+        self.steps = steps
+        self.deadline = deadline
+        self.iterations = iterations
+        self.latencies = {}
+        self.errors = {}
+        self.failure = None
+        self.connection = None
+        self.started = self.finished = None
+
+    def run(self):
+        self.connect()
+        try:
+            for step in self.setup:
+                error = self.execute(step)
+                if error:
+                    self.failure = f'{step.name}: {error}'
+                    return
+            self.started = perf_counter()
+            completed = 0
+            while time.monotonic() < self.deadline and (
+                self.iterations is None or completed < self.iterations
+            ):
+                for step in self.steps:
+                    self.record(step, self.execute(step, timed=True))
+                completed += 1
+            self.finished = perf_counter()
+        finally:
+            self.connection.close()
+
+    def connect(self):
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = http.client.HTTPConnection(
+            self.host, self.port, timeout=LOAD_TEST_REQUEST_TIMEOUT
+        )
+
+    def record(self, step, error):
+        if error:
+            errors = self.errors.setdefault(step.route, {})
+            errors[error] = errors.get(error, 0) + 1
+
+    def execute(self, step, timed: bool = False):
+        """Выполняет шаг и возвращает описание ошибки или None."""
+        try:
+            url = render(step.url, self.variables, url=True)
+            body = step.body and render(step.body, self.variables)
+            headers = {'Content-Type': 'application/json'} if body else {}
+            if step.token:
+                headers['Authorization'] = (
+                    'Token ' + self.variables[step.token]
+                )
+        except KeyError as error:
+            return f'нет переменной {error}'
+        started = perf_counter()
+        try:
+            self.connection.request(
+                step.method, url, body and body.encode(), headers
+            )
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException) as error:
+            self.connect()
+            return type(error).__name__
+        if timed:
+            self.latencies.setdefault(step.route, []).append(
+                perf_counter() - started
+            )
+        if (
+            response.status != step.expected_status
+            if step.expected_status else response.status >= 400
+        ):
+            return f'статус {response.status}'
+        if step.captures:
+            try:
+                data = json.loads(content)
+                for capture in step.captures:
+                    self.variables[capture.variable] = capture.extract(data)
+            except (ValueError, LookupError, TypeError):
+                return 'неожиданный ответ'
+        return None
+
+
+def percentile(values: list, share: float) -> float:
+    """Перцентиль отсортированного списка по ближайшему рангу."""
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+def route_stats(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    stats = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2),
+        'mean': None,
+    }
+    for name, _ in PERCENTILES:
+        stats[name] = None
+    if latencies:
+        stats['mean'] = round(sum(latencies) / len(latencies) * 1000, 2)
+        for name, share in PERCENTILES:
+            stats[name] = round(percentile(latencies, share) * 1000, 2)
+    return stats
+
+
+def fetch_json(host: str, port: int, path: str):
+    connection = http.client.HTTPConnection(
+        host, port, timeout=LOAD_TEST_REQUEST_TIMEOUT
+    )
+    try:
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def summarize(users) -> dict:
+    """Число запросов, ошибки, пропускная способность и задержки в мс.
+
+    Пропускная способность считается за время от начала первого круга до
+    конца последнего, без шагов подготовки.
+    """
+    users = [user for user in users if user.finished is not None]
+    if not users:
+        raise LoadTestError(
+            'Ни один виртуальный пользователь не завершил тест.'
+        )
+    elapsed = max(
+        max(user.finished for user in users)
+        - min(user.started for user in users),
+        1e-6
+    )
+    latencies, errors = {}, {}
+    for user in users:
+        for route, values in user.latencies.items():
+            latencies.setdefault(route, []).extend(values)
+        for route, by_reason in user.errors.items():
+            for reason, count in by_reason.items():
+                route_errors = errors.setdefault(route, {})
+                route_errors[reason] = route_errors.get(reason, 0) + count
+    routes = {
+        route: dict(
+            route_stats(
+                latencies.get(route, []),
+                sum(errors.get(route, {}).values()),
+                elapsed
+            ),
+            error_reasons=errors.get(route, {})
+        )
+        for route in sorted(latencies.keys() | errors.keys())
+    }
+    return {
+        'elapsed': round(elapsed, 3),
+        'routes': routes,
+        'total': route_stats(
+            [value for values in latencies.values() for value in values],
+            sum(route['errors'] for route in routes.values()),
+            elapsed
+        ),
+    }
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Изменение метрик относительно базового запуска в процентах."""
+    changes = {}
+    pairs = [
+        (route, stats, baseline['routes'].get(route))
+        for route, stats in results['routes'].items()
+    ]
+    pairs.append(('total', results['total'], baseline['total']))
+    for route, stats, base in pairs:
+        if not base:
+            continue
+        changes[route] = {
+            name: round((stats[name] - base[name]) / base[name] * 100, 1)
+            for name in ('rps', *dict(PERCENTILES))
+            if stats[name] is not None and base[name]
+        }
+    return changes
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(process, host: str, port: int) -> None:
+    deadline = time.monotonic() + LOAD_TEST_SERVER_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise LoadTestError(
+                f'gunicorn завершился с кодом {process.returncode}'
+            )
+        connection = http.client.HTTPConnection(host, port, timeout=1)
+        try:
+            connection.request('GET', '/api/tags/')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            connection.close()
+    raise LoadTestError(
+        f'gunicorn не ответил за {LOAD_TEST_SERVER_TIMEOUT} с'
+    )
+
+
+@contextmanager
+def gunicorn_server(workers: int):
+    """Запускает gunicorn с настройками и БД текущего окружения.
+
+    Возвращает адрес и порт сервера.
+    """
+    host, port = '127.0.0.1', free_port()
+    process = subprocess.Popen(
+        (
+            sys.executable, '-m', 'gunicorn',
+            'foodgram_backend.wsgi:application',
+            '--bind', f'{host}:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+        ),
+        cwd=settings.BASE_DIR
+    )
+    try:
+        wait_ready(process, host, port)
+        yield host, port
+    finally:
+        process.terminate()
+        try:
+            process.wait(LOAD_TEST_SERVER_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
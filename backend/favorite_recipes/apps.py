@@ -6,3 +6,6 @@ class FavoriteRecipesConfig(AppConfig):
     name = 'favorite_recipes'
     verbose_name = 'Избранные рецепты пользователя'
     verbose_name_plural = 'Избранные рецепты пользователя'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('favorite_recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userfavoriterecipes',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+    ]
@@ -22,6 +22,10 @@ class UserFavoriteRecipes(models.Model):
         verbose_name='Рецепт',
         related_name='recipe_favorite'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
 
     class Meta:
         verbose_name = 'Избранный рецепт пользователя'
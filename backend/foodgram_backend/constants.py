@@ -7,3 +7,73 @@ RECIPE_NAME_LENGTH = 256
 TAG_FIELD_MAX_LENGTH = 32
 USER_EMAIL_LENGTH = 254
 USER_NAME_LENGTH = 150
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_LOCAL_TTL = 2
+AUTH_TOKEN_CACHE_TTL = 5
+INGREDIENT_INDEX_TTL = 300
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_INDEX_NGRAM_SIZE = 3
+RECIPE_INGREDIENT_INDEX_REBUILD_INTERVAL = 30
+RECIPE_INGREDIENT_INDEX_MAX_IDS = 1000
+RECIPE_INGREDIENT_INDEX_COMMIT_MARGIN = 60
+SIMILAR_RECIPES_COUNT = 10
+SIMILAR_RECIPES_TAG_WEIGHT = 0.5
+SIMILAR_RECIPES_BATCH_SIZE = 256
+SIMILAR_RECIPES_CANDIDATES = 2000
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WINDOW_HOURS = 7 * 24
+TRENDING_FAVORITE_WEIGHT = 1.0
+TRENDING_SHOPPING_CART_WEIGHT = 0.5
+TRENDING_BATCH_SIZE = 1000
+IMAGE_DERIVATIVE_SIZES = {
+    'thumbnail': 160,
+    'card': 480,
+    'full': 1280,
+}
+IMAGE_DERIVATIVE_FORMAT = 'WEBP'
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+BASE64_DECODE_CHUNK_SIZE = 64 * 1024
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+SHOPPING_LIST_PDF_PAGE_SIZE = (1240, 1754)
+SHOPPING_LIST_PDF_RESOLUTION = 150
+SHOPPING_LIST_PDF_FONT_SIZE = 28
+SHOPPING_LIST_REBUILD_BATCH_SIZE = 1000
+SHOPPING_LIST_UPSERT_BATCH_SIZE = 1000
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+CATALOG_IMPORT_BATCH_SIZE = 5000
+CATALOG_IMPORT_CHUNK_SIZE = 64 * 1024
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_BACKFILL_SIZE = 50
+FEED_BATCH_SIZE = 1000
+FEED_MAX_PAGE_SIZE = 100
+METRICS_FLUSH_INTERVAL = 5
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+NPLUSONE_REPORTS_LIMIT = 100
+NPLUSONE_STACK_DEPTH = 15
+LOAD_TEST_USERS = 10
+LOAD_TEST_DURATION = 60
+LOAD_TEST_WORKERS = 4
+LOAD_TEST_REQUEST_TIMEOUT = 30
+LOAD_TEST_SERVER_TIMEOUT = 30
+# Пользователи и рецепты в пресетах generate_dataset.
+DATASET_PRESETS = {
+    '10k': (2_000, 10_000),
+    '100k': (20_000, 100_000),
+    '1m': (200_000, 1_000_000),
+    '10m': (2_000_000, 10_000_000),
+}
+DATASET_SUBSCRIPTIONS_PER_USER = 10
+DATASET_FAVORITES_PER_USER = 20
+DATASET_SHOPPING_CART_PER_USER = 3
+DATASET_INGREDIENTS_PER_RECIPE = (3, 12)
+DATASET_TAGS_PER_RECIPE = (1, 3)
+DATASET_POWER_LAW_EXPONENT = 1.0
+DATASET_HISTORY_DAYS = 365
+DATASET_IMAGE_POOL_SIZE = 16
+DATASET_IMAGE_SIZE = (960, 640)
+DATASET_CHUNK_SIZE = 20_000
+DATASET_BATCH_SIZE = 5000
+DATASET_WORKERS = 4
@@ -0,0 +1,307 @@
+"""Метрики запросов по маршрутам API.
+
+Каждый процесс копит счетчики в памяти и не чаще раза в
+METRICS_FLUSH_INTERVAL секунд сбрасывает их в свой файл в METRICS_DIR
+(по умолчанию в /dev/shm, то есть в общей памяти). Эндпоинт метрик
+складывает файлы всех воркеров gunicorn и отдает их в текстовом формате
+Prometheus. Файлы завершившихся воркеров переносятся в общий архив,
+чтобы их счетчики не пропадали и файлы не копились.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+from .constants import METRICS_FLUSH_INTERVAL, METRICS_LATENCY_BUCKETS
+
+COUNTERS = (
+    ('requests', 'http_requests_total', 'Число запросов'),
+    ('duration', None, None),
+    ('sql_queries', 'sql_queries_total', 'Число SQL-запросов'),
+    ('sql_seconds', 'sql_seconds_total', 'Время SQL-запросов'),
+    (
+        'serialize_seconds',
+        'serialize_seconds_total',
+        'Время сериализации, включая SQL-запросы во время нее'
+    ),
+    ('render_seconds', 'render_seconds_total', 'Время отрисовки ответа'),
+    ('response_bytes', 'response_bytes_total', 'Размер ответов'),
+)
+BUCKETS_OFFSET = len(COUNTERS)
+ARCHIVE_NAME = 'archive.json'
+LOCK_NAME = '.lock'
+
+_local = threading.local()
+
+
+class RequestTimings:
+    """Время SQL, сериализации и отрисовки в одном запросе."""
+
+    __slots__ = (
+        'sql_queries', 'sql_seconds', 'serialize_seconds',
+        'serialize_depth', 'render_started', 'render_seconds',
+    )
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.serialize_depth = 0
+        self.render_started = None
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обертка для connection.execute_wrapper."""
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += perf_counter() - started
+            self.sql_queries += 1
+
+    def start_render(self, response):
+        self.render_started = perf_counter()
+        response.add_post_render_callback(self.finish_render)
+
+    def finish_render(self, response):
+        self.render_seconds += perf_counter() - self.render_started
+
+    def server_timing(self, duration: float) -> str:
+        return ', '.join((
+            f'db;dur={self.sql_seconds * 1000:.1f};'
+            f'desc="{self.sql_queries} queries"',
+            f'serialize;dur={self.serialize_seconds * 1000:.1f}',
+            f'render;dur={self.render_seconds * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ))
+
+
+def start_request() -> RequestTimings:
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def current_timings():
+    return getattr(_local, 'timings', None)
+
+
+def finish_request() -> None:
+    _local.timings = None
+
+
+def instrument_serializers() -> None:
+    """Учитывает время serializer.data верхнего уровня в текущем запросе."""
+    data = BaseSerializer.data
+    if getattr(data.fget, 'instrumented', False):
+        return
+
+    def timed_data(serializer):
+        timings = current_timings()
+        if timings is None or timings.serialize_depth:
+            return data.fget(serializer)
+        timings.serialize_depth += 1
+        started = perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            timings.serialize_seconds += perf_counter() - started
+            timings.serialize_depth -= 1
+
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_values(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def merge_values(total: dict, values_by_key: dict) -> dict:
+    for key, values in values_by_key.items():
+        if key in total:
+            total[key] = [a + b for a, b in zip(total[key], values)]
+        else:
+            total[key] = values
+    return total
+
+
+def write_atomically(path: Path, content: str) -> None:
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(content)
+    os.replace(temporary, path)
+
+
+class MetricsRegistry:
+    """Счетчики и гистограммы длительности по (маршрут, метод, статус).
+
+    Файл процесса называется по pid и времени запуска, так что новый
+    процесс с тем же pid не затирает счетчики прежнего. Процесс,
+    унаследовавший реестр при fork, начинает счет с нуля.
+    """
+
+    def __init__(self, directory, flush_interval: int):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self._values = {}
+        self._flush_at = 0.0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._name = None
+
+    def _own_values(self) -> dict:
+        """Счетчики текущего процесса; вызывается под self._lock."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._name = f'{self._pid}-{time.time_ns()}.json'
+            self._values = {}
+            self._flush_at = 0.0
+        return self._values
+
+    def observe(
+            self, route: str, method: str, status: int, duration: float,
+            timings: RequestTimings, size: int
+    ) -> None:
+        key = f'{route} {method} {status}'
+        with self._lock:
+            own_values = self._own_values()
+            values = own_values.get(key)
+            if values is None:
+                values = own_values[key] = [0] * (
+                    BUCKETS_OFFSET + len(METRICS_LATENCY_BUCKETS) + 1
+                )
+            values[0] += 1
+            values[1] += duration
+            values[2] += timings.sql_queries
+            values[3] += timings.sql_seconds
+            values[4] += timings.serialize_seconds
+            values[5] += timings.render_seconds
+            values[6] += size
+            values[
+                BUCKETS_OFFSET + bisect_left(METRICS_LATENCY_BUCKETS, duration)
+            ] += 1
+        if time.monotonic() >= self._flush_at:
+            self.flush()
+
+    def flush(self) -> None:
+        """Атомарно записывает счетчики процесса в его файл."""
+        with self._lock:
+            content = json.dumps(self._own_values())
+            name = self._name
+            self._flush_at = time.monotonic() + self.flush_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_atomically(self.directory / name, content)
+
+    @staticmethod
+    def process_of(path: Path) -> tuple[int, int]:
+        """(pid, время запуска) из имени файла процесса."""
+        pid, _, started = path.stem.partition('-')
+        try:
+            return int(pid), int(started or 0)
+        except ValueError:
+            return 0, 0
+
+    def archive_finished(self) -> None:
+        """Переносит в архив файлы процессов, которые уже завершились.
+
+        Из нескольких файлов с одним pid живым может быть только самый
+        поздний, остальные остались от процессов, чей pid занят заново.
+        """
+        latest = {}
+        finished = []
+        for path in sorted(
+            self.directory.glob('*.json'), key=self.process_of
+        ):
+            if path.name == ARCHIVE_NAME:
+                continue
+            pid, _ = self.process_of(path)
+            if pid in latest:
+                finished.append(latest[pid])
+            latest[pid] = path
+        finished += [
+            path for pid, path in latest.items()
+            if path.name != self._name and not is_running(pid)
+        ]
+        if not finished:
+            return
+        archive = self.directory / ARCHIVE_NAME
+        total = read_values(archive)
+        for path in finished:
+            merge_values(total, read_values(path))
+        write_atomically(archive, json.dumps(total))
+        for path in finished:
+            path.unlink(missing_ok=True)
+
+    def collect(self) -> dict:
+        """Сумма счетчиков всех процессов, включая завершившиеся."""
+        self.flush()
+        with open(self.directory / LOCK_NAME, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.archive_finished()
+            total = {}
+            for path in self.directory.glob('*.json'):
+                merge_values(total, read_values(path))
+        return total
+
+    def render(self) -> str:
+        """Счетчики в текстовом формате Prometheus."""
+        series = []
+        for key, values in sorted(self.collect().items()):
+            route, method, status = key.split(' ')
+            series.append((
+                f'route="{route}",method="{method}",status="{status}"',
+                values
+            ))
+        lines = []
+        for position, (_, name, help_text) in enumerate(COUNTERS):
+            if name is None:
+                continue
+            lines += [
+                f'# HELP foodgram_{name} {help_text}',
+                f'# TYPE foodgram_{name} counter',
+            ]
+            lines += [
+                f'foodgram_{name}{{{labels}}} {values[position]}'
+                for labels, values in series
+            ]
+        name = 'foodgram_http_request_duration_seconds'
+        lines += [
+            f'# HELP {name} Длительность запросов',
+            f'# TYPE {name} histogram',
+        ]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(
+                (*METRICS_LATENCY_BUCKETS, '+Inf'), values[BUCKETS_OFFSET:]
+            ):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines += [
+                f'{name}_sum{{{labels}}} {values[1]}',
+                f'{name}_count{{{labels}}} {values[0]}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(settings.METRICS_DIR, METRICS_FLUSH_INTERVAL)
@@ -0,0 +1,93 @@
+import random
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import (current_timings, finish_request,
+                      instrument_serializers, registry, start_request)
+from .nplusone import QueryRepeatDetector, save_reports
+
+
+class PerformanceMiddleware:
+    """Собирает метрики каждого запроса по маршрутам.
+
+    Сотрудникам возвращает время SQL, сериализации и отрисовки
+    в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        timings = start_request()
+        started = perf_counter()
+        try:
+            with connection.execute_wrapper(timings):
+                response = self.get_response(request)
+        finally:
+            finish_request()
+        duration = perf_counter() - started
+
+        match = request.resolver_match
+        observe = partial(
+            registry.observe,
+            (match.url_name or match.view_name) if match else 'unmatched',
+            request.method,
+            response.status_code,
+            duration,
+            timings,
+        )
+        if response.streaming:
+            response.streaming_content = self.count_streamed(
+                response.streaming_content, observe
+            )
+        else:
+            observe(len(response.content))
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = timings.server_timing(duration)
+        return response
+
+    @staticmethod
+    def count_streamed(content, observe):
+        """Отдает части потокового ответа, считая их размер.
+
+        Запрос учитывается, когда ответ отправлен или клиент отключился.
+        """
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            observe(size)
+
+    def process_template_response(self, request, response):
+        timings = current_timings()
+        if timings is not None:
+            timings.start_render(response)
+        return response
+
+
+class NPlusOneMiddleware:
+    """Ищет повторяющиеся SQL-запросы в доле NPLUSONE_SAMPLE_RATE запросов.
+
+    В невыбранных запросах ничего не отслеживается.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.NPLUSONE_SAMPLE_RATE:
+            return self.get_response(request)
+        detector = QueryRepeatDetector(settings.NPLUSONE_THRESHOLD)
+        with connection.execute_wrapper(detector):
+            response = self.get_response(request)
+        reports = detector.reports(request)
+        if reports:
+            save_reports(reports)
+        return response
@@ -0,0 +1,151 @@
+"""Поиск повторяющихся SQL-запросов (N+1) в выборке запросов к API.
+
+Для доли запросов NPLUSONE_SAMPLE_RATE все SQL-выражения сводятся к
+отпечаткам без параметров. Если выражение повторилось больше
+NPLUSONE_THRESHOLD раз, запоминается стек и поля сериализаторов, в
+которых оно выполнялось. Отчеты пишутся в лог и в общий кэш, откуда их
+показывает эндпоинт для сотрудников. Остальные запросы не отслеживаются.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.serializers import Serializer
+
+from .constants import NPLUSONE_REPORTS_LIMIT, NPLUSONE_STACK_DEPTH
+
+REPORTS_KEY = 'nplusone:reports'
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+WHITESPACE = re.compile(r'\s+')
+
+INSTRUMENTATION_FILES = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('metrics.py', 'middleware.py', 'nplusone.py')
+}
+
+
+def fingerprint_sql(sql: str) -> str:
+    """SQL без значений: списки IN, числа и строки заменяются на ?."""
+    sql = PLACEHOLDER_LIST.sub('(?)', sql)
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    return WHITESPACE.sub(' ', sql.replace('%s', '?')).strip()
+
+
+def serializer_fields(frame) -> list[str]:
+    """Поля сериализаторов, которые заполнялись в момент запроса.
+
+    Возвращает цепочку от внешнего сериализатора к вложенному.
+    """
+    fields = []
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation':
+            serializer = frame.f_locals.get('self')
+            field = frame.f_locals.get('field')
+            if isinstance(serializer, Serializer) and field is not None:
+                fields.append(
+                    f'{type(serializer).__name__}.{field.field_name}'
+                )
+        frame = frame.f_back
+    return fields[::-1]
+
+
+def project_stack(frame) -> list[str]:
+    """Кадры стека из кода проекта, начиная с ближайшего к запросу.
+
+    Кадры самих middleware и инструментирования пропускаются.
+    """
+    base_dir = str(settings.BASE_DIR)
+    stack = []
+    while frame is not None and len(stack) < NPLUSONE_STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and 'site-packages' not in filename
+            and filename not in INSTRUMENTATION_FILES
+        ):
+            stack.append(
+                f'{filename[len(base_dir) + 1:]}:{frame.f_lineno} '
+                f'in {frame.f_code.co_name}'
+            )
+        frame = frame.f_back
+    return stack
+
+
+class QueryRepeatDetector:
+    """Считает отпечатки SQL в одном запросе для connection.execute_wrapper."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.contexts = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        fingerprint = fingerprint_sql(sql)
+        self.counts[fingerprint] += 1
+        if self.counts[fingerprint] == self.threshold + 1:
+            frame = sys._getframe(1)
+            self.contexts[fingerprint] = {
+                'fields': serializer_fields(frame),
+                'stack': project_stack(frame),
+            }
+        return execute(sql, params, many, context)
+
+    def reports(self, request) -> list[dict]:
+        match = request.resolver_match
+        return [
+            {
+                'id': hashlib.sha1(fingerprint.encode()).hexdigest()[:12],
+                'route': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'sql': fingerprint,
+                'count': self.counts[fingerprint],
+                'field': ' > '.join(context['fields']) or None,
+                'stack': context['stack'],
+                'seen_at': timezone.now().isoformat(),
+            }
+            for fingerprint, context in self.contexts.items()
+        ]
+
+
+def save_reports(reports: list[dict]) -> None:
+    """Пишет отчеты в лог и хранит последние по каждому выражению."""
+    for report in reports:
+        logger.warning(
+            'N+1 query: %s', json.dumps(report, ensure_ascii=False)
+        )
+    stored = {report['id']: report for report in cache.get(REPORTS_KEY, [])}
+    for report in reports:
+        report['occurrences'] = stored.pop(
+            report['id'], {}
+        ).get('occurrences', 0) + 1
+        stored[report['id']] = report
+    cache.set(
+        REPORTS_KEY, list(stored.values())[-NPLUSONE_REPORTS_LIMIT:], None
+    )
+
+
+def get_reports() -> list[dict]:
+    return sorted(
+        cache.get(REPORTS_KEY, []),
+        key=lambda report: report['seen_at'],
+        reverse=True
+    )
+
+
+def clear_reports() -> None:
+    cache.delete(REPORTS_KEY)
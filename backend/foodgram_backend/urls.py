@@ -5,17 +5,25 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .views import QueryReportView, metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics/', metrics, name='metrics'),
 
     path('s/', include('urlshortner.urls')),
 
     path('api/auth/', include('djoser.urls.authtoken')),
+    path(
+        'api/query-reports/',
+        QueryReportView.as_view(),
+        name='query-reports'
+    ),
 
     path('api/', include('tags.urls')),
     path('api/', include('ingredients.urls')),
-    path('api/', include('shoppingcart_recipes.urls')),
+    path('api/', include('similar_recipes.urls')),
     path('api/', include('user_subscriptions.urls')),
 ]
 
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import registry
+from .nplusone import clear_reports, get_reports
+
+
+def metrics(request):
+    """Метрики всех воркеров в текстовом формате Prometheus.
+
+    Если задан METRICS_TOKEN, требует заголовок Authorization: Bearer.
+    """
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get('Authorization', ''),
+        f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+class QueryReportView(APIView):
+    """Отчеты о повторяющихся SQL-запросах (N+1), только для сотрудников."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_reports())
+
+    def delete(self, request):
+        clear_reports()
+        return Response(status=status.HTTP_204_NO_CONTENT)
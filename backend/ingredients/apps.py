@@ -6,3 +6,6 @@ class IngredientsConfig(AppConfig):
     name = 'ingredients'
     verbose_name = 'Ингредиенты'
     verbose_name_plural = 'Ингредиенты'
+
+    def ready(self):
+        from . import signals  # noqa: F401
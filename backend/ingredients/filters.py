@@ -1,10 +1,13 @@
+from django.db.models import Case, IntegerField, Value, When
 from django_filters.rest_framework import Filter, FilterSet
 
+from foodgram_backend.constants import INGREDIENT_SEARCH_LIMIT
 from .models import Ingredient
+from .search import ingredient_index
 
 
 class IngredientFilter(FilterSet):
-    """Фильтрация по вхождению в название ингредиента."""
+    """Поиск ингредиентов по началу и вхождению в название."""
 
     name = Filter(method='filter_name')
 
@@ -13,7 +16,15 @@ class IngredientFilter(FilterSet):
         fields = ['name']
 
     def filter_name(self, queryset, name, value):
-        return (
-            queryset.filter(name__istartswith=value)
-            or queryset.filter(name__icontains=value)
+        ids = ingredient_index.search(value, INGREDIENT_SEARCH_LIMIT)
+        if not ids:
+            return queryset.none()
+        return queryset.filter(id__in=ids).order_by(
+            Case(
+                *(
+                    When(id=ingredient_id, then=Value(position))
+                    for position, ingredient_id in enumerate(ids)
+                ),
+                output_field=IntegerField()
+            )
         )
@@ -0,0 +1,288 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from foodgram_backend.constants import (CATALOG_IMPORT_BATCH_SIZE,
+                                        CATALOG_IMPORT_CHUNK_SIZE)
+from ingredients.models import Ingredient
+from ingredients.search import ingredient_index
+from shoppingcart_recipes.utils import invalidate_all_shopping_lists
+from tags.models import Tag
+from tags.registry import tag_registry
+from utils.catalog import invalidate_catalog
+
+DEFAULT_FILES = ('data/ingredients.csv', 'data/tags.json')
+
+# Модель, уникальное поле и обновляемые поля каждого справочника.
+CATALOGS = {
+    'ingredients.ingredient': (Ingredient, 'name', ('measurement_unit',)),
+    'tags.tag': (Tag, 'slug', ('name',)),
+}
+
+
+def iter_json_array(file, chunk_size: int):
+    """Построчно разбирает JSON-массив объектов, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        while position < len(buffer) and (
+            buffer[position].isspace() or started and buffer[position] == ','
+        ):
+            position += 1
+        if position == len(buffer):
+            buffer, position = file.read(chunk_size), 0
+            if not buffer:
+                raise CommandError('Неожиданный конец JSON-файла.')
+            continue
+        if not started:
+            if buffer[position] != '[':
+                raise CommandError('Ожидался JSON-массив объектов.')
+            started = True
+            position += 1
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise CommandError(
+                    'Некорректный JSON рядом с: ' + buffer[position:][:80]
+                )
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield item
+
+
+def read_json(file, chunk_size: int):
+    """Объекты из фикстуры Django или из массива значений полей."""
+    for item in iter_json_array(file, chunk_size):
+        if 'model' in item:
+            yield item['model'], item['fields']
+        elif 'slug' in item:
+            yield 'tags.tag', item
+        else:
+            yield 'ingredients.ingredient', item
+
+
+def read_csv(file):
+    """Строки ингредиентов вида: название,единица измерения."""
+    for row in csv.reader(file):
+        if not row or row == ['name', 'measurement_unit']:
+            continue
+        if len(row) != 2:
+            raise CommandError(f'Некорректная строка CSV: {row}')
+        yield 'ingredients.ingredient', {
+            'name': row[0], 'measurement_unit': row[1]
+        }
+
+
+class OrmWriter:
+    """Пакетная запись через bulk_create и bulk_update."""
+
+    def __init__(self, model, key: str, fields):
+        self.model = model
+        self.key = key
+        self.fields = fields
+
+    def write(self, rows: dict) -> tuple[int, int]:
+        existing = self.model.objects.filter(
+            **{f'{self.key}__in': rows}
+        ).values_list('id', self.key, *self.fields)
+        changed = []
+        for pk, key, *current in existing:
+            values = rows.pop(key)
+            if tuple(current) != values:
+                changed.append(self.model(
+                    id=pk, **{self.key: key}, **dict(zip(self.fields, values))
+                ))
+        self.model.objects.bulk_update(changed, self.fields)
+        # bulk_create с ignore_conflicts не сообщает, сколько строк
+        # вставлено: строки могли появиться в другой транзакции.
+        new = self.model.objects.filter(**{f'{self.key}__in': rows})
+        before = new.count()
+        self.model.objects.bulk_create(
+            (
+                self.model(
+                    **{self.key: key}, **dict(zip(self.fields, values))
+                )
+                for key, values in rows.items()
+            ),
+            ignore_conflicts=True
+        )
+        return new.count() - before, len(changed)
+
+    def finish(self) -> tuple[int, int]:
+        return 0, 0
+
+
+class CopyWriter(OrmWriter):
+    """Запись через COPY во временную таблицу и INSERT ... ON CONFLICT."""
+
+    def __init__(self, model, key: str, fields):
+        super().__init__(model, key, fields)
+        self.columns = (key, *fields)
+        self.staging = f'load_catalog_{model._meta.db_table}'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {self.staging} '
+                '(ordinal bigserial, '
+                + ', '.join(f'{column} text' for column in self.columns)
+                + ') ON COMMIT DROP'
+            )
+
+    def write(self, rows: dict) -> tuple[int, int]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for key, values in rows.items():
+            writer.writerow((key, *values))
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {self.staging} ({", ".join(self.columns)}) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+        return 0, 0
+
+    def finish(self) -> tuple[int, int]:
+        table = self.model._meta.db_table
+        # Значения по умолчанию Django задает не в схеме БД, поэтому
+        # остальные поля новых строк, например счетчики, заполняются явно.
+        defaults = [
+            (field.column, field.get_default())
+            for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.column not in self.columns
+        ]
+        insert_columns = ', '.join(
+            (*self.columns, *(column for column, _ in defaults))
+        )
+        selected = ', '.join((*self.columns, *(['%s'] * len(defaults))))
+        updates = ', '.join(
+            f'{field} = EXCLUDED.{field}' for field in self.fields
+        )
+        changed = ' OR '.join(
+            f'{table}.{field} IS DISTINCT FROM EXCLUDED.{field}'
+            for field in self.fields
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH upserted AS ('
+                f'INSERT INTO {table} ({insert_columns}) '
+                f'SELECT DISTINCT ON ({self.key}) {selected} '
+                f'FROM {self.staging} '
+                f'ORDER BY {self.key}, ordinal DESC '
+                f'ON CONFLICT ({self.key}) DO UPDATE SET {updates} '
+                f'WHERE {changed} '
+                f'RETURNING (xmax = 0) AS inserted) '
+                'SELECT count(*) FILTER (WHERE inserted), '
+                'count(*) FILTER (WHERE NOT inserted) FROM upserted',
+                [value for _, value in defaults]
+            )
+            return cursor.fetchone()
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает справочники ингредиентов и тэгов из CSV и JSON файлов. '
+        'Существующие записи обновляются, повторная загрузка безопасна.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            default=DEFAULT_FILES,
+            help='Файлы .csv (ингредиенты) или .json (фикстуры и массивы).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CATALOG_IMPORT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.'
+        )
+
+    def handle(self, *args, paths, batch_size, no_copy, **options):
+        writer_class = (
+            CopyWriter
+            if connection.vendor == 'postgresql' and not no_copy
+            else OrmWriter
+        )
+        for path in map(Path, paths):
+            if path.suffix not in ('.csv', '.json'):
+                raise CommandError(f'Неизвестный формат файла: {path}')
+            started = time.perf_counter()
+            with open(path, encoding='utf-8', newline='') as file:
+                records = (
+                    read_csv(file) if path.suffix == '.csv'
+                    else read_json(file, CATALOG_IMPORT_CHUNK_SIZE)
+                )
+                with transaction.atomic():
+                    stats = self.load(records, writer_class, batch_size)
+            elapsed = max(time.perf_counter() - started, 1e-6)
+            for label, (read, created, updated) in stats.items():
+                self.stdout.write(
+                    f'{path.name} -> {label}: прочитано {read}, '
+                    f'создано {created}, обновлено {updated} '
+                    f'за {elapsed:.2f} с ({read / elapsed:.0f} строк/с)'
+                )
+        self.invalidate()
+
+    def load(self, records, writer_class, batch_size):
+        writers = {}
+        stats = {}
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            rows_by_label = {}
+            for label, values in batch:
+                if label not in CATALOGS:
+                    raise CommandError(f'Неизвестный справочник: {label}')
+                _, key, fields = CATALOGS[label]
+                try:
+                    rows_by_label.setdefault(label, {})[values[key]] = tuple(
+                        values[field] for field in fields
+                    )
+                except KeyError as error:
+                    raise CommandError(
+                        f'{label}: нет поля {error} в {values}'
+                    )
+            for label, rows in rows_by_label.items():
+                if label not in writers:
+                    writers[label] = writer_class(*CATALOGS[label])
+                    stats[label] = [0, 0, 0]
+                stats[label][0] += len(rows)
+                created, updated = writers[label].write(rows)
+                stats[label][1] += created
+                stats[label][2] += updated
+        for label, writer in writers.items():
+            created, updated = writer.finish()
+            stats[label][1] += created
+            stats[label][2] += updated
+        return stats
+
+    def invalidate(self):
+        """Сбрасывает производные кэши: bulk-запись не вызывает сигналы.
+
+        Версии справочников, индекса названий и реестра тэгов хранятся в
+        общем кэше, поэтому сброс видят все процессы бэкенда.
+        """
+        invalidate_catalog('ingredients')
+        invalidate_catalog('tags')
+        invalidate_all_shopping_lists()
+        ingredient_index.invalidate()
+        tag_registry.invalidate()
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.3 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+from utils.counters import count_subquery
+
+
+def fill_recipes_count(apps, schema_editor):
+    Ingredient = apps.get_model('ingredients', 'Ingredient')
+    IngredientRecipe = apps.get_model('recipes', 'IngredientRecipe')
+    Ingredient.objects.update(
+        recipes_count=count_subquery(IngredientRecipe, 'ingredient')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ingredients', '0001_initial'),
+        ('recipes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов'),
+        ),
+        migrations.RunPython(fill_recipes_count, migrations.RunPython.noop),
+    ]
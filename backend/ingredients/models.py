@@ -17,6 +17,11 @@ class Ingredient(models.Model):
         verbose_name='Единица измерения',
         max_length=INGREDIENT_M_UNIT_LENGTH
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Ингредиент'
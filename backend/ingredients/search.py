@@ -0,0 +1,178 @@
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connection
+
+from foodgram_backend.constants import (INGREDIENT_INDEX_NGRAM_SIZE,
+                                        INGREDIENT_INDEX_TTL)
+from utils.cache import get_version
+from .models import Ingredient
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'ingredient_index:version'
+
+
+def normalize(value: str) -> str:
+    return value.casefold().replace('ё', 'е')
+
+
+def ngrams(value: str, size: int):
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+class IndexSnapshot(NamedTuple):
+    """Неизменяемое состояние индекса, заменяется целиком."""
+
+    version: str
+    names: list[str]
+    ids: list[int]
+    usage: list[int]
+    postings: dict[str, frozenset[int]]
+    loaded_at: float
+
+
+class IngredientIndex:
+    """Индекс названий ингредиентов для автодополнения в памяти процесса.
+
+    Названия хранятся отсортированными: совпадения по началу находятся
+    бинарным поиском, вхождения в середину - пересечением списков
+    n-грамм длиной от 1 до ngram_size. Популярность берется из хранимого
+    счетчика Ingredient.recipes_count, так что перестроение читает только
+    таблицу ингредиентов.
+
+    Изменение ингредиентов сбрасывает версию в общем кэше. Первый запрос
+    процесса строит индекс сам, а при смене версии или раз в ttl секунд
+    (чтобы подхватить новую популярность) индекс перестраивается в
+    фоновом потоке, пока запросы читают прежний снимок.
+    """
+
+    def __init__(self, ttl: int, ngram_size: int):
+        self.ttl = ttl
+        self.ngram_size = ngram_size
+        self._snapshot = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _build(self, version: str) -> IndexSnapshot:
+        rows = sorted(
+            (normalize(name), ingredient_id, usage)
+            for ingredient_id, name, usage in Ingredient.objects.values_list(
+                'id', 'name', 'recipes_count'
+            )
+        )
+        postings = {}
+        for position, (name, _, _) in enumerate(rows):
+            for size in range(1, self.ngram_size + 1):
+                for gram in ngrams(name, size):
+                    postings.setdefault(gram, []).append(position)
+        return IndexSnapshot(
+            version=version,
+            names=[name for name, _, _ in rows],
+            ids=[ingredient_id for _, ingredient_id, _ in rows],
+            usage=[usage for _, _, usage in rows],
+            postings={
+                gram: frozenset(positions)
+                for gram, positions in postings.items()
+            },
+            loaded_at=time.monotonic(),
+        )
+
+    def _refresh(self, version: str) -> None:
+        try:
+            self._snapshot = self._build(version)
+        except Exception:
+            logger.exception('Не удалось перестроить индекс названий')
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def _get_snapshot(self) -> IndexSnapshot:
+        version = get_version(VERSION_KEY)
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = self._build(version)
+        elif (
+            snapshot.version != version
+            or time.monotonic() - snapshot.loaded_at > self.ttl
+        ):
+            with self._lock:
+                if self._refreshing:
+                    return snapshot
+                self._refreshing = True
+            threading.Thread(
+                target=self._refresh,
+                args=(version,),
+                name='ingredient-index',
+                daemon=True
+            ).start()
+        return snapshot
+
+    def _prefix_positions(self, snapshot, query: str) -> range:
+        return range(
+            bisect_left(snapshot.names, query),
+            bisect_left(snapshot.names, query + chr(0x10ffff))
+        )
+
+    def _substring_positions(self, snapshot, query: str) -> set[int]:
+        size = min(len(query), self.ngram_size)
+        candidates = None
+        for gram in sorted(
+            ngrams(query, size),
+            key=lambda gram: len(snapshot.postings.get(gram, ()))
+        ):
+            positions = snapshot.postings.get(gram, frozenset())
+            candidates = (
+                set(positions) if candidates is None
+                else candidates & positions
+            )
+            if not candidates:
+                return set()
+        if size == len(query):
+            return candidates
+        return {
+            position for position in candidates
+            if query in snapshot.names[position]
+        }
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Id ингредиентов, подходящих под запрос, в порядке релевантности.
+
+        Сначала идут названия, начинающиеся с запроса, затем содержащие
+        его; внутри групп - по числу рецептов с ингредиентом.
+        """
+        query = normalize(query.strip())
+        if not query:
+            return []
+        snapshot = self._get_snapshot()
+
+        def rank(position):
+            return -snapshot.usage[position], snapshot.names[position]
+
+        prefix = self._prefix_positions(snapshot, query)
+        found = heapq.nsmallest(limit, prefix, key=rank)
+        if len(found) < limit:
+            found += heapq.nsmallest(
+                limit - len(found),
+                self._substring_positions(snapshot, query).difference(prefix),
+                key=rank
+            )
+        return [snapshot.ids[position] for position in found]
+
+    def invalidate(self) -> None:
+        cache.delete(VERSION_KEY)
+
+    def reset(self) -> None:
+        """Сбрасывает индекс текущего процесса, например в тестах."""
+        self._snapshot = None
+        self._refreshing = False
+
+
+ingredient_index = IngredientIndex(
+    INGREDIENT_INDEX_TTL, INGREDIENT_INDEX_NGRAM_SIZE
+)
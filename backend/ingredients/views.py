@@ -2,14 +2,18 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 
+from utils.catalog import PrerenderedCatalogMixin
 from .filters import IngredientFilter
 from .models import Ingredient
 from .serializers import IngredientSerializer
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(PrerenderedCatalogMixin,
+                        viewsets.ReadOnlyModelViewSet):
+    catalog_name = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
+    authentication_classes = ()
     permission_classes = (AllowAny,)
     pagination_class = None
     filter_backends = (DjangoFilterBackend,)
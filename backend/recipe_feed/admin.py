@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import FeedEntry
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'recipe',
+        'created_at'
+    )
+    list_select_related = (
+        'user',
+        'recipe',
+    )
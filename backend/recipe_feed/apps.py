@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class RecipeFeedConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'recipe_feed'
+    verbose_name = 'Лента подписок'
+    verbose_name_plural = 'Лента подписок'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe_feed.utils import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок пользователей.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            authors = rebuild_feeds()
+        self.stdout.write(f'Ленты пересобраны, авторов - {authors}')
@@ -0,0 +1,79 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+FEED_FANOUT_MAX_FOLLOWERS = 1000
+FEED_BACKFILL_SIZE = 50
+
+
+def fill_feeds(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Subscription = apps.get_model('user_subscriptions', 'Subscription')
+    FeedEntry = apps.get_model('recipe_feed', 'FeedEntry')
+    authors = User.objects.filter(
+        followers_count__gt=0,
+        followers_count__lte=FEED_FANOUT_MAX_FOLLOWERS
+    ).values_list('id', flat=True)
+    for author_id in authors.iterator():
+        recipes = list(
+            Recipe.objects.filter(author_id=author_id).order_by(
+                '-created_at', '-id'
+            ).values_list('id', 'created_at')[:FEED_BACKFILL_SIZE]
+        )
+        follower_ids = Subscription.objects.filter(
+            subscribe_target_id=author_id
+        ).values_list('subscriber_id', flat=True)
+        FeedEntry.objects.bulk_create(
+            (
+                FeedEntry(
+                    user_id=user_id,
+                    recipe_id=recipe_id,
+                    author_id=author_id,
+                    created_at=created_at
+                )
+                for user_id in follower_ids.iterator()
+                for recipe_id, created_at in recipes
+            ),
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0004_recipe_has_image_derivatives'),
+        ('user_subscriptions', '0001_initial'),
+        ('users', '0002_customuser_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(verbose_name='Дата публикации рецепта')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор рецепта')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Рецепт в ленте',
+                'verbose_name_plural': 'Рецепты в ленте',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['user', '-created_at', '-recipe'], name='feed_user_created_at_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_user_recipe_in_feed'),
+        ),
+        migrations.RunPython(fill_feeds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from foodgram_backend.constants import TRUNCATE_AMOUNT
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class FeedEntry(models.Model):
+    """Рецепт в ленте подписок пользователя.
+
+    Заполняется при публикации рецепта для подписчиков авторов, у которых
+    не больше FEED_FANOUT_MAX_FOLLOWERS подписчиков. Рецепты популярных
+    авторов добавляются в ленту при чтении.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='feed_entries'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='feed_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор рецепта',
+        related_name='+'
+    )
+    created_at = models.DateTimeField(
+        verbose_name='Дата публикации рецепта'
+    )
+
+    class Meta:
+        verbose_name = 'Рецепт в ленте'
+        verbose_name_plural = 'Рецепты в ленте'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_user_recipe_in_feed',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-created_at', '-recipe'),
+                name='feed_user_created_at_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            self.user.email[:TRUNCATE_AMOUNT] + ' '
+            + self.recipe.name[:TRUNCATE_AMOUNT]
+        )
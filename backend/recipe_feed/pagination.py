@@ -0,0 +1,69 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from foodgram_backend.constants import FEED_MAX_PAGE_SIZE
+from .utils import get_feed_page
+
+
+class FeedCursorPagination(BasePagination):
+    """Курсор ленты: дата публикации и id последнего рецепта страницы."""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK['PAGE_SIZE']
+        return min(max(page_size, 1), FEED_MAX_PAGE_SIZE)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            created_at, recipe_id = urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            return datetime.fromisoformat(created_at), int(recipe_id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position) -> str:
+        created_at, recipe_id = position
+        return urlsafe_b64encode(
+            f'{created_at.isoformat()}|{recipe_id}'.encode()
+        ).decode()
+
+    def paginate_feed(self, request) -> list[int]:
+        """Id рецептов текущей страницы ленты пользователя."""
+        self.request = request
+        recipe_ids, self.next_position = get_feed_page(
+            request.user,
+            self.decode_cursor(request),
+            self.get_page_size(request)
+        )
+        return recipe_ids
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from foodgram_backend.constants import FEED_FANOUT_MAX_FOLLOWERS
+from recipes.models import Recipe
+from user_subscriptions.models import Subscription
+from .models import FeedEntry
+from .utils import backfill_feed, fan_out_recipe, schedule_author_backfill
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        fan_out_recipe(instance)
+
+
+@receiver(post_save, sender=Subscription)
+def add_author_to_feed(sender, instance, created, **kwargs):
+    if created:
+        backfill_feed(instance.subscriber_id, instance.subscribe_target)
+
+
+@receiver(post_delete, sender=Subscription)
+def remove_author_from_feed(sender, instance, **kwargs):
+    FeedEntry.objects.filter(
+        user_id=instance.subscriber_id,
+        author_id=instance.subscribe_target_id
+    ).delete()
+    # Счетчик подписчиков к этому моменту уже уменьшен обработчиком
+    # user_subscriptions: автор, опустившийся до порога, переходит
+    # с чтения при запросе на раскладку по лентам в фоне.
+    if User.objects.filter(
+        pk=instance.subscribe_target_id,
+        followers_count=FEED_FANOUT_MAX_FOLLOWERS
+    ).exists():
+        schedule_author_backfill(instance.subscribe_target_id)
@@ -0,0 +1,16 @@
+"""Добавляет маршруты для рецептов вместе с лентой подписок."""
+
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter as Router
+
+from .views import RecipeFeedViewSet
+
+
+app_name = 'recipe_feed'
+
+router = Router()
+router.register(r'recipes', RecipeFeedViewSet, basename='recipes')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
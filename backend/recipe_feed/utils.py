@@ -0,0 +1,164 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+
+from foodgram_backend.constants import (FEED_BACKFILL_SIZE, FEED_BATCH_SIZE,
+                                        FEED_FANOUT_MAX_FOLLOWERS)
+from recipes.models import Recipe
+from user_subscriptions.models import Subscription
+from .models import FeedEntry
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='feed-backfill'
+        )
+    return _executor
+
+
+def is_popular(author) -> bool:
+    return author.followers_count > FEED_FANOUT_MAX_FOLLOWERS
+
+
+def add_to_feeds(user_ids, recipes) -> None:
+    """Добавляет рецепты (id, автор, дата) в ленты пользователей."""
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id,
+                created_at=created_at
+            )
+            for user_id in user_ids
+            for recipe_id, author_id, created_at in recipes
+        ),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def latest_recipes(author_id: int):
+    return list(
+        Recipe.objects.filter(author_id=author_id).order_by(
+            '-created_at', '-id'
+        ).values_list('id', 'author_id', 'created_at')[:FEED_BACKFILL_SIZE]
+    )
+
+
+def fan_out_recipe(recipe) -> None:
+    """Раскладывает новый рецепт по лентам подписчиков автора."""
+    if is_popular(recipe.author):
+        return
+    add_to_feeds(
+        Subscription.objects.filter(
+            subscribe_target_id=recipe.author_id
+        ).values_list('subscriber_id', flat=True).iterator(),
+        [(recipe.id, recipe.author_id, recipe.created_at)]
+    )
+
+
+def backfill_feed(user_id: int, author) -> None:
+    """Добавляет в ленту нового подписчика последние рецепты автора."""
+    if not is_popular(author):
+        add_to_feeds([user_id], latest_recipes(author.id))
+
+
+def backfill_author_feeds(author_id: int) -> None:
+    """Раскладывает последние рецепты автора по лентам всех подписчиков."""
+    recipes = latest_recipes(author_id)
+    if recipes:
+        add_to_feeds(
+            Subscription.objects.filter(
+                subscribe_target_id=author_id
+            ).values_list('subscriber_id', flat=True).iterator(),
+            recipes
+        )
+
+
+def backfill_demoted_author(author_id: int) -> None:
+    """Раскладывает рецепты автора, если он все еще не популярен."""
+    try:
+        if User.objects.filter(
+            pk=author_id, followers_count__lte=FEED_FANOUT_MAX_FOLLOWERS
+        ).exists():
+            backfill_author_feeds(author_id)
+    except Exception:
+        logger.exception('Не удалось заполнить ленты автора %s', author_id)
+    finally:
+        connection.close()
+
+
+def schedule_author_backfill(author_id: int) -> None:
+    """Ставит раскладку рецептов автора в очередь после коммита.
+
+    Подписчиков у автора на пороге популярности много, и раскладка
+    по их лентам не должна задерживать запрос отписки.
+    """
+    transaction.on_commit(
+        lambda: get_executor().submit(backfill_demoted_author, author_id)
+    )
+
+
+def rebuild_feeds() -> int:
+    """Пересобирает ленты всех пользователей, возвращает число авторов."""
+    FeedEntry.objects.all().delete()
+    author_ids = Subscription.objects.filter(
+        subscribe_target__followers_count__lte=FEED_FANOUT_MAX_FOLLOWERS
+    ).values_list('subscribe_target_id', flat=True).distinct().order_by()
+    authors = 0
+    for author_id in author_ids.iterator():
+        backfill_author_feeds(author_id)
+        authors += 1
+    return authors
+
+
+def after(position, id_field: str) -> Q:
+    """Условие keyset-пагинации: строго после позиции (дата, id)."""
+    created_at, recipe_id = position
+    return Q(created_at__lt=created_at) | Q(
+        created_at=created_at, **{f'{id_field}__lt': recipe_id}
+    )
+
+
+def get_feed_page(user, position, limit: int):
+    """Id рецептов страницы ленты и позиция для следующей страницы.
+
+    Лента - слияние двух отсортированных источников: записей FeedEntry и
+    рецептов популярных авторов, на которых подписан пользователь. Из
+    каждого берется не больше limit + 1 строк после позиции, поэтому
+    страница не зависит от числа подписок.
+    """
+    entries = FeedEntry.objects.filter(user=user)
+    popular = Recipe.objects.filter(
+        author__followers__subscriber=user,
+        author__followers_count__gt=FEED_FANOUT_MAX_FOLLOWERS
+    )
+    if position is not None:
+        entries = entries.filter(after(position, 'recipe_id'))
+        popular = popular.filter(after(position, 'id'))
+
+    candidates = set(
+        entries.order_by('-created_at', '-recipe_id').values_list(
+            'created_at', 'recipe_id'
+        )[:limit + 1]
+    )
+    candidates.update(
+        popular.order_by('-created_at', '-id').values_list(
+            'created_at', 'id'
+        )[:limit + 1]
+    )
+    page = sorted(candidates, reverse=True)[:limit + 1]
+    next_position = page[limit - 1] if len(page) > limit else None
+    return [recipe_id for _, recipe_id in page[:limit]], next_position
@@ -0,0 +1,27 @@
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+
+from shoppingcart_recipes.views import RecipeShoppingCartViewSet
+from .pagination import FeedCursorPagination
+
+
+class RecipeFeedViewSet(RecipeShoppingCartViewSet):
+    """Расширяет вьюсет рецептов лентой рецептов авторов из подписок."""
+
+    read_actions = (*RecipeShoppingCartViewSet.read_actions, 'feed')
+
+    @action(
+        ['get'],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+    )
+    def feed(self, request):
+        """Новые рецепты авторов, на которых подписан пользователь."""
+        paginator = FeedCursorPagination()
+        recipe_ids = paginator.paginate_feed(request)
+        recipes = self.get_queryset().in_bulk(recipe_ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in recipe_ids if pk in recipes],
+            many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import RecipeActivity
+
+
+@admin.register(RecipeActivity)
+class RecipeActivityAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipe',
+        'hour',
+        'favorites',
+        'shopping_carts'
+    )
+    list_select_related = (
+        'recipe',
+    )
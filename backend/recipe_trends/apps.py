@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class RecipeTrendsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'recipe_trends'
+    verbose_name = 'Популярные рецепты'
+    verbose_name_plural = 'Популярные рецепты'
+
+    def ready(self):
+        from . import signals  # noqa: F401
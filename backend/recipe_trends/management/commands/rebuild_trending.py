@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe_trends.utils import rebuild_activity, rebuild_trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает популярность рецептов за последние '
+        'TRENDING_WINDOW_HOURS часов и удаляет более старую активность.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--activity',
+            action='store_true',
+            help='Сначала собрать почасовую активность заново из '
+                 'избранного и корзин.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['activity']:
+                rebuild_activity()
+            recipes = rebuild_trending()
+        self.stdout.write(f'Популярность пересчитана, рецептов - {recipes}')
@@ -0,0 +1,45 @@
+from django.db import models
+
+from foodgram_backend.constants import TRUNCATE_AMOUNT
+from recipes.models import Recipe
+
+
+class RecipeActivity(models.Model):
+    """Добавления рецепта в избранное и корзину за один час."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='activity'
+    )
+    hour = models.DateTimeField(
+        verbose_name='Начало часа'
+    )
+    favorites = models.PositiveIntegerField(
+        verbose_name='Добавлено в избранное',
+        default=0
+    )
+    shopping_carts = models.PositiveIntegerField(
+        verbose_name='Добавлено в корзину',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Активность по рецепту'
+        verbose_name_plural = 'Активность по рецептам'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'hour'),
+                name='unique_recipe_activity_hour',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('hour',),
+                name='recipe_activity_hour_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipe.name[:TRUNCATE_AMOUNT]} {self.hour:%Y-%m-%d %H}'
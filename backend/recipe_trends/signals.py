@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from favorite_recipes.models import UserFavoriteRecipes
+from shoppingcart_recipes.models import UserRecipeShoppingCart
+from .utils import record_activity
+
+
+@receiver(post_save, sender=UserFavoriteRecipes)
+def record_favorite(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.recipe_id, instance.created_at, favorites=1)
+
+
+@receiver(post_save, sender=UserRecipeShoppingCart)
+def record_shopping_cart(sender, instance, created, **kwargs):
+    if created:
+        record_activity(
+            instance.recipe_id, instance.created_at, shopping_carts=1
+        )
@@ -0,0 +1,150 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import (Abs, Exp, Greatest, Least, Ln,
+                                        TruncHour)
+from django.utils import timezone
+
+from favorite_recipes.models import UserFavoriteRecipes
+from foodgram_backend.constants import (TRENDING_BATCH_SIZE,
+                                        TRENDING_FAVORITE_WEIGHT,
+                                        TRENDING_HALF_LIFE_HOURS,
+                                        TRENDING_SHOPPING_CART_WEIGHT,
+                                        TRENDING_WINDOW_HOURS)
+from recipes.models import Recipe
+from shoppingcart_recipes.models import UserRecipeShoppingCart
+from .models import RecipeActivity
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DECAY = math.log(2) / TRENDING_HALF_LIFE_HOURS
+LOG_ADD_CUTOFF = 40.0
+
+
+def start_of_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def window_start() -> datetime:
+    return start_of_hour(
+        timezone.now() - timedelta(hours=TRENDING_WINDOW_HOURS)
+    )
+
+
+def activity_weight(favorites: int, shopping_carts: int) -> float:
+    return (
+        favorites * TRENDING_FAVORITE_WEIGHT
+        + shopping_carts * TRENDING_SHOPPING_CART_WEIGHT
+    )
+
+
+def activity_score(hour: datetime, weight: float) -> float:
+    """Логарифм вклада активности за час в популярность рецепта.
+
+    Вклад убывает вдвое каждые TRENDING_HALF_LIFE_HOURS. Вместо того чтобы
+    уменьшать со временем все оценки, растет вклад новых событий: порядок
+    рецептов от этого тот же, а логарифм не дает оценкам переполниться.
+    """
+    hours = (hour - EPOCH).total_seconds() / 3600
+    return hours * DECAY + math.log(weight)
+
+
+def log_sum(scores) -> float:
+    top = max(scores)
+    return top + math.log(sum(math.exp(score - top) for score in scores))
+
+
+def log_add(field: str, score: float):
+    """Выражение log(exp(field) + exp(score)) для UPDATE."""
+    score = Value(score, output_field=FloatField())
+    return Greatest(F(field), score) + Ln(
+        1 + Exp(-Least(Abs(F(field) - score), Value(LOG_ADD_CUTOFF)))
+    )
+
+
+def record_activity(
+        recipe_id: int, moment: datetime, favorites: int = 0,
+        shopping_carts: int = 0
+) -> None:
+    """Учитывает добавления рецепта в почасовой активности и популярности."""
+    hour = start_of_hour(moment)
+    table = RecipeActivity._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} '
+            '(recipe_id, hour, favorites, shopping_carts) '
+            'VALUES (%s, %s, %s, %s) '
+            'ON CONFLICT (recipe_id, hour) DO UPDATE SET '
+            f'favorites = {table}.favorites + excluded.favorites, '
+            f'shopping_carts = {table}.shopping_carts '
+            '+ excluded.shopping_carts',
+            (
+                recipe_id,
+                connection.ops.adapt_datetimefield_value(hour),
+                favorites,
+                shopping_carts,
+            )
+        )
+    Recipe.objects.filter(pk=recipe_id).update(trending_score=log_add(
+        'trending_score',
+        activity_score(hour, activity_weight(favorites, shopping_carts))
+    ))
+
+
+def rebuild_activity() -> None:
+    """Собирает почасовую активность за окно из избранного и корзин."""
+    since = window_start()
+    counts = defaultdict(lambda: [0, 0])
+    for position, model in enumerate(
+        (UserFavoriteRecipes, UserRecipeShoppingCart)
+    ):
+        rows = model.objects.filter(created_at__gte=since).annotate(
+            hour=TruncHour('created_at')
+        ).values_list('recipe_id', 'hour').annotate(
+            total=Count('id')
+        ).order_by()
+        for recipe_id, hour, total in rows.iterator():
+            counts[recipe_id, hour][position] += total
+    RecipeActivity.objects.filter(hour__gte=since).delete()
+    RecipeActivity.objects.bulk_create(
+        (
+            RecipeActivity(
+                recipe_id=recipe_id,
+                hour=hour,
+                favorites=favorites,
+                shopping_carts=shopping_carts
+            )
+            for (recipe_id, hour), (favorites, shopping_carts)
+            in counts.items()
+        ),
+        batch_size=TRENDING_BATCH_SIZE
+    )
+
+
+def rebuild_trending() -> int:
+    """Пересчитывает популярность рецептов из активности за окно.
+
+    Активность старше TRENDING_WINDOW_HOURS удаляется. Возвращает число
+    рецептов с активностью.
+    """
+    RecipeActivity.objects.filter(hour__lt=window_start()).delete()
+    scores = defaultdict(list)
+    activity = RecipeActivity.objects.values_list(
+        'recipe_id', 'hour', 'favorites', 'shopping_carts'
+    )
+    for recipe_id, hour, favorites, shopping_carts in activity.iterator():
+        scores[recipe_id].append(
+            activity_score(hour, activity_weight(favorites, shopping_carts))
+        )
+    Recipe.objects.exclude(trending_score=0).update(trending_score=0)
+    Recipe.objects.bulk_update(
+        [
+            Recipe(id=recipe_id, trending_score=log_sum(recipe_scores))
+            for recipe_id, recipe_scores in scores.items()
+        ],
+        ('trending_score',),
+        batch_size=TRENDING_BATCH_SIZE
+    )
+    return len(scores)
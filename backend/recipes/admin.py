@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import IngredientRecipe, Recipe
+from .search import search_recipes
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -30,11 +31,18 @@ class RecipeAdmin(admin.ModelAdmin):
     list_filter = (
         'tags',
     )
+    list_select_related = (
+        'author',
+    )
     search_fields = (
         'name',
-        'author',
+        'author__username',
+        'text',
     )
 
     @admin.display(description='Добавлено в избранное')
     def post_in_favorites_count(self, obj):
-        return obj.recipe_favorite.count()
+        return obj.favorites_count
+
+    def get_search_results(self, request, queryset, search_term):
+        return search_recipes(queryset, search_term), False
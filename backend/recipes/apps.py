@@ -1,4 +1,12 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def repair_search_index(using, **kwargs):
+    if connections[using].vendor == 'sqlite':
+        from .search import repair_sqlite_triggers
+        repair_sqlite_triggers(connections[using])
 
 
 class RecipesConfig(AppConfig):
@@ -6,3 +14,7 @@ class RecipesConfig(AppConfig):
     name = 'recipes'
     verbose_name = 'Рецепты'
     verbose_name_plural = 'Рецепты'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(repair_search_index, sender=self)
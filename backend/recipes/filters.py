@@ -1,19 +1,66 @@
-from django_filters.rest_framework import (AllValuesMultipleFilter, Filter,
-                                           FilterSet)
+from django_filters.rest_framework import (BaseInFilter, CharFilter,
+                                           ChoiceFilter, Filter, FilterSet,
+                                           MultipleChoiceFilter, NumberFilter)
 
+from tags.registry import tag_registry
+from .ingredient_index import filter_by_ingredients
 from .models import Recipe
+from .search import search_recipes
+
+
+RECIPE_ORDERINGS = {
+    'trending': ('-trending_score', 'id'),
+    'popular': ('-favorites_count', 'id'),
+    'cooking_time': ('cooking_time', 'id'),
+}
+
+
+class NumberInFilter(BaseInFilter, NumberFilter):
+    pass
 
 
 class RecipeFilter(FilterSet):
-    """Фильтрует запросы к рецептам по тэгам, корзине покупок, избранному."""
+    """Фильтрует рецепты по тэгам, корзине покупок, избранному и тексту.
+
+    Параметр ordering меняет порядок рецептов на один из RECIPE_ORDERINGS.
+    """
 
-    tags = AllValuesMultipleFilter(field_name='tags__slug', conjoined=False)
+    tags = MultipleChoiceFilter(
+        choices=tag_registry.choices,
+        method='filter_tags'
+    )
     is_in_shopping_cart = Filter(method='filter_shopping_cart')
     is_favorited = Filter(method='filter_is_favorited')
+    search = CharFilter(method='filter_search')
+    ingredients = NumberInFilter(method='filter_ingredients')
+    ingredients_match = ChoiceFilter(
+        choices=(('all', 'Все'), ('any', 'Любой из')),
+        method='filter_ingredients'
+    )
+    exclude_ingredients = NumberInFilter(method='filter_ingredients')
+    ordering = ChoiceFilter(
+        choices=(
+            ('trending', 'Популярные сейчас'),
+            ('popular', 'Чаще всего в избранном'),
+            ('cooking_time', 'Быстрее готовить'),
+        ),
+        method='filter_ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ['author', 'tags', 'is_in_shopping_cart', 'is_favorited']
+        fields = [
+            'author', 'tags', 'is_in_shopping_cart', 'is_favorited', 'search',
+            'ingredients', 'ingredients_match', 'exclude_ingredients',
+            'ordering'
+        ]
+
+    def filter_tags(self, queryset, name, value):
+        return queryset.filter(
+            id__in=Recipe.tags.through.objects.filter(
+                tag_id__in=tag_registry.get_ids(value)
+            ).values('recipe_id')
+        )
 
     def filter_shopping_cart(self, queryset, name, value):
         user = self.request.user
@@ -34,3 +81,29 @@ class RecipeFilter(FilterSet):
             )
             return queryset.filter(id__in=favorite_recipes)
         return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def filter_ingredients(self, queryset, name, value):
+        """Применяет ingredients, ingredients_match и exclude_ingredients.
+
+        Параметры обрабатываются вместе один раз: при ingredients - в его
+        фильтре, иначе - в фильтре exclude_ingredients.
+        """
+        data = self.form.cleaned_data
+        include = [int(ingredient_id)
+                   for ingredient_id in data.get('ingredients') or ()]
+        exclude = [int(ingredient_id)
+                   for ingredient_id in data.get('exclude_ingredients') or ()]
+        if name != ('ingredients' if include else 'exclude_ingredients'):
+            return queryset
+        return filter_by_ingredients(
+            queryset,
+            include,
+            data.get('ingredients_match') != 'any',
+            exclude
+        )
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
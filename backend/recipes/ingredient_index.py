@@ -0,0 +1,263 @@
+"""Обратный индекс: ингредиент -> множество рецептов с ним.
+
+Редкие ингредиенты хранятся отсортированным массивом id рецептов,
+частые - битовой картой (bytes, бит i - рецепт с id i), смотря что
+компактнее. Запросы "любой из", "все" и "ни одного" сводятся к
+пересечениям и объединениям этих множеств в памяти процесса.
+"""
+
+import logging
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import NamedTuple, Union
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from foodgram_backend.constants import (
+    RECIPE_INGREDIENT_INDEX_COMMIT_MARGIN, RECIPE_INGREDIENT_INDEX_MAX_IDS,
+    RECIPE_INGREDIENT_INDEX_REBUILD_INTERVAL)
+from utils.cache import get_version
+from .models import IngredientRecipe, Recipe
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'recipe_ingredient_index:version'
+NONZERO_BYTE = re.compile(b'[^\x00]')
+
+Posting = Union[array, bytes]
+
+
+def contains(posting: Posting, recipe_id: int) -> bool:
+    if isinstance(posting, bytes):
+        byte = recipe_id >> 3
+        return byte < len(posting) and bool(
+            posting[byte] >> (recipe_id & 7) & 1
+        )
+    position = bisect_left(posting, recipe_id)
+    return position < len(posting) and posting[position] == recipe_id
+
+
+def to_bitmap(posting: Posting) -> int:
+    if isinstance(posting, bytes):
+        return int.from_bytes(posting, 'little')
+    bitmap = bytearray((posting[-1] >> 3) + 1 if posting else 0)
+    for recipe_id in posting:
+        bitmap[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(bitmap, 'little')
+
+
+def bitmap_ids(bitmap: int) -> set[int]:
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    return {
+        (match.start() << 3) + bit
+        for match in NONZERO_BYTE.finditer(data)
+        for bit in range(8)
+        if data[match.start()] >> bit & 1
+    }
+
+
+def cardinality(posting: Posting) -> int:
+    if isinstance(posting, bytes):
+        return bin(int.from_bytes(posting, 'little')).count('1')
+    return len(posting)
+
+
+class IndexSnapshot(NamedTuple):
+    version: str
+    postings: dict[int, Posting]
+    sizes: dict[int, int]
+    max_recipe_id: int
+    built_since: datetime
+    loaded_at: float
+
+
+class RecipeIngredientIndex:
+    """Индекс рецептов по ингредиентам в памяти процесса.
+
+    Запись рецептов сбрасывает версию в общем кэше. Первый запрос
+    процесса строит индекс сам, дальше процесс перестраивает его в
+    фоновом потоке не чаще раза в rebuild_interval секунд, а запросы тем
+    временем читают прежний снимок. Рецепты, созданные или измененные
+    после начала построения (по updated_at), проверяются запросом к БД,
+    поэтому снимок не бывает устаревшим.
+    """
+
+    def __init__(
+            self, rebuild_interval: int, max_ids: int, commit_margin: int
+    ):
+        self.rebuild_interval = rebuild_interval
+        self.max_ids = max_ids
+        self.commit_margin = commit_margin
+        self._snapshot = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _build(self, version: str) -> IndexSnapshot:
+        # Рецепты, сохраненные незадолго до начала построения, могли быть
+        # еще не закоммичены и не попасть в снимок.
+        built_since = timezone.now() - timedelta(seconds=self.commit_margin)
+        rows = IngredientRecipe.objects.order_by(
+            'ingredient_id', 'recipe_id'
+        ).values_list('ingredient_id', 'recipe_id')
+        postings = {}
+        sizes = {}
+        max_recipe_id = 0
+        for ingredient_id, group in groupby(
+            rows.iterator(), key=lambda row: row[0]
+        ):
+            recipe_ids = array('Q', (recipe_id for _, recipe_id in group))
+            postings[ingredient_id] = recipe_ids
+            sizes[ingredient_id] = len(recipe_ids)
+            max_recipe_id = max(max_recipe_id, recipe_ids[-1])
+        bitmap_size = max_recipe_id // 8 + 1
+        for ingredient_id, recipe_ids in postings.items():
+            if recipe_ids.itemsize * len(recipe_ids) > bitmap_size:
+                postings[ingredient_id] = to_bitmap(recipe_ids).to_bytes(
+                    bitmap_size, 'little'
+                )
+        return IndexSnapshot(
+            version, postings, sizes, max_recipe_id, built_since,
+            time.monotonic()
+        )
+
+    def _refresh(self, version: str) -> None:
+        try:
+            self._snapshot = self._build(version)
+        except Exception:
+            logger.exception('Не удалось перестроить индекс ингредиентов')
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def _get_snapshot(self) -> IndexSnapshot:
+        version = get_version(VERSION_KEY)
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = self._build(version)
+        elif (
+            snapshot.version != version
+            and time.monotonic() - snapshot.loaded_at > self.rebuild_interval
+        ):
+            with self._lock:
+                if self._refreshing:
+                    return snapshot
+                self._refreshing = True
+            threading.Thread(
+                target=self._refresh,
+                args=(version,),
+                name='recipe-ingredient-index',
+                daemon=True
+            ).start()
+        return snapshot
+
+    def match(self, include, match_all: bool, exclude):
+        """Id подходящих рецептов и снимок, по которому они найдены.
+
+        Возвращает (None, None), если совпадений больше max_ids: такой
+        список выгоднее отфильтровать в БД.
+        """
+        snapshot = self._get_snapshot()
+        empty = array('Q')
+        included = sorted(
+            (snapshot.postings.get(ingredient_id, empty)
+             for ingredient_id in set(include)),
+            key=cardinality
+        )
+        excluded = [
+            snapshot.postings[ingredient_id]
+            for ingredient_id in set(exclude)
+            if ingredient_id in snapshot.postings
+        ]
+
+        smallest = included[0]
+        if match_all and not isinstance(smallest, bytes):
+            found = {
+                recipe_id for recipe_id in smallest
+                if all(contains(posting, recipe_id)
+                       for posting in included[1:])
+            }
+        elif not match_all and not any(
+            isinstance(posting, bytes) for posting in included
+        ):
+            found = set().union(*included)
+        else:
+            bitmap = to_bitmap(smallest)
+            for posting in included[1:]:
+                if match_all:
+                    bitmap &= to_bitmap(posting)
+                else:
+                    bitmap |= to_bitmap(posting)
+            for posting in excluded:
+                bitmap &= ~to_bitmap(posting)
+            if bin(bitmap).count('1') > self.max_ids:
+                return None, None
+            return bitmap_ids(bitmap), snapshot
+
+        if len(found) > self.max_ids:
+            return None, None
+        return {
+            recipe_id for recipe_id in found
+            if not any(contains(posting, recipe_id) for posting in excluded)
+        }, snapshot
+
+    def invalidate(self) -> None:
+        cache.delete(VERSION_KEY)
+
+    def reset(self) -> None:
+        """Сбрасывает индекс текущего процесса, например в тестах."""
+        self._snapshot = None
+        self._refreshing = False
+
+
+def ingredients_condition(include, match_all: bool, exclude) -> Q:
+    """То же условие запросом к БД: GROUP BY/HAVING и антиджойн."""
+    condition = Q()
+    if include:
+        matching = IngredientRecipe.objects.filter(
+            ingredient_id__in=include
+        ).values('recipe_id')
+        if match_all:
+            matching = matching.annotate(
+                matched=Count('ingredient_id', distinct=True)
+            ).filter(matched=len(set(include))).values('recipe_id')
+        condition &= Q(id__in=matching)
+    if exclude:
+        condition &= ~Q(id__in=IngredientRecipe.objects.filter(
+            ingredient_id__in=exclude
+        ).values('recipe_id'))
+    return condition
+
+
+def filter_by_ingredients(queryset, include, match_all: bool, exclude):
+    """Рецепты с ингредиентами из include и без ингредиентов из exclude."""
+    condition = ingredients_condition(include, match_all, exclude)
+    if not include:
+        return queryset.filter(condition)
+    recipe_ids, snapshot = recipe_ingredient_index.match(
+        include, match_all, exclude
+    )
+    if recipe_ids is None:
+        return queryset.filter(condition)
+    changed = Q(id__gt=snapshot.max_recipe_id) | Q(
+        id__in=Recipe.objects.filter(
+            updated_at__gte=snapshot.built_since
+        ).values('id')
+    )
+    return queryset.filter(
+        Q(id__in=recipe_ids) & ~changed | changed & condition
+    )
+
+
+recipe_ingredient_index = RecipeIngredientIndex(
+    RECIPE_INGREDIENT_INDEX_REBUILD_INTERVAL,
+    RECIPE_INGREDIENT_INDEX_MAX_IDS,
+    RECIPE_INGREDIENT_INDEX_COMMIT_MARGIN
+)
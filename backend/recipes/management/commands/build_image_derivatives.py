@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from utils.images import build_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии изображений рецептов, у которых их нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить копии для всех рецептов.'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Recipe.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(has_image_derivatives=False)
+        processed = failed = 0
+        for recipe_id, name in queryset.values_list('id', 'image').iterator():
+            try:
+                build_derivatives(name)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'Рецепт {recipe_id}: {error}')
+                continue
+            Recipe.objects.filter(pk=recipe_id, image=name).update(
+                has_image_derivatives=True
+            )
+            processed += 1
+        self.stdout.write(
+            f'Обработано изображений: {processed}, с ошибками: {failed}'
+        )
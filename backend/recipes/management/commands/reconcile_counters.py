@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from favorite_recipes.models import UserFavoriteRecipes
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe, Recipe
+from user_subscriptions.models import Subscription
+from utils.counters import reconcile_counter
+
+User = get_user_model()
+
+COUNTERS = (
+    (Recipe, 'favorites_count', UserFavoriteRecipes, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Subscription, 'subscribe_target'),
+    (Ingredient, 'recipes_count', IngredientRecipe, 'ingredient'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает хранимые счетчики избранного, рецептов, подписчиков '
+        'и рецептов с ингредиентом.'
+    )
+
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in COUNTERS:
+            with transaction.atomic():
+                drifted = reconcile_counter(
+                    model, field, related_model, related_field
+                )
+            self.stdout.write(
+                f'{model._meta.label}.{field}: исправлено строк - {drifted}'
+            )
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.3 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+from utils.counters import count_subquery
+
+
+def fill_favorites_count(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    UserFavoriteRecipes = apps.get_model(
+        'favorite_recipes', 'UserFavoriteRecipes'
+    )
+    Recipe.objects.update(
+        favorites_count=count_subquery(UserFavoriteRecipes, 'recipe')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+        ('favorite_recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Добавлено в избранное'),
+        ),
+        migrations.RunPython(fill_favorites_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from recipes.search import install_search_index, remove_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove(apps, schema_editor):
+    remove_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_has_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
@@ -27,10 +27,19 @@ class Recipe(models.Model):
         verbose_name='Изображение',
         upload_to='recipe_images',
     )
+    has_image_derivatives = models.BooleanField(
+        verbose_name='Уменьшенные копии изображения готовы',
+        default=False,
+        editable=False
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Создано'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -46,11 +55,43 @@ class Recipe(models.Model):
         through='IngredientRecipe',
         verbose_name='Ингредиенты'
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Добавлено в избранное',
+        default=0,
+        editable=False
+    )
+    trending_score = models.FloatField(
+        verbose_name='Популярность за последнее время',
+        default=0,
+        editable=False
+    )
 
     class Meta:
-        ordering = ('-created_at',)
+        ordering = ('-created_at', 'id')
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=('-created_at', 'id'),
+                name='recipe_created_at_id_idx',
+            ),
+            models.Index(
+                fields=('-trending_score', 'id'),
+                name='recipe_trending_id_idx',
+            ),
+            models.Index(
+                fields=('-favorites_count', 'id'),
+                name='recipe_favorites_count_id_idx',
+            ),
+            models.Index(
+                fields=('cooking_time', 'id'),
+                name='recipe_cooking_time_id_idx',
+            ),
+            models.Index(
+                fields=('updated_at',),
+                name='recipe_updated_at_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=('name', 'author'),
@@ -0,0 +1,111 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import RECIPE_ORDERINGS
+
+
+class RecipeCursorPagination(BasePagination):
+    """Постраничный вывод рецептов по курсору, без COUNT и OFFSET.
+
+    Курсор хранит значение поля сортировки и id последнего рецепта
+    страницы, следующая страница выбирается по паре (поле, id), так что
+    рецепты с одинаковым значением поля не мешают листать дальше. Без
+    параметра ordering результаты поиска идут по релевантности, и в
+    курсор попадает ее значение.
+    """
+
+    ordering = ('-created_at', 'id')
+    search_ordering = ('-search_rank', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def get_ordering(self, request, queryset) -> tuple:
+        """Порядок из ordering, при поиске - по релевантности, иначе - дата."""
+        ordering = request.query_params.get('ordering')
+        if ordering in RECIPE_ORDERINGS:
+            return RECIPE_ORDERINGS[ordering]
+        if 'search_rank' in queryset.query.annotations:
+            return self.search_ordering
+        return self.ordering
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK['PAGE_SIZE']
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, queryset, field: str):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        annotation = queryset.query.annotations.get(field)
+        model_field = (
+            annotation.output_field if annotation is not None
+            else queryset.model._meta.get_field(field)
+        )
+        try:
+            value, recipe_id = urlsafe_b64decode(
+                encoded.encode()
+            ).decode().rsplit('|', 1)
+            return model_field.to_python(value), int(recipe_id)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position) -> str:
+        value, recipe_id = position
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return urlsafe_b64encode(f'{value}|{recipe_id}'.encode()).decode()
+
+    @staticmethod
+    def after(position, ordering) -> Q:
+        """Рецепты, идущие в порядке ordering после позиции курсора."""
+        (field, id_field), (value, recipe_id) = ordering, position
+        field_lookup = 'lt' if field.startswith('-') else 'gt'
+        id_lookup = 'lt' if id_field.startswith('-') else 'gt'
+        field = field.lstrip('-')
+        return Q(**{f'{field}__{field_lookup}': value}) | Q(
+            **{field: value, f'id__{id_lookup}': recipe_id}
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = self.get_ordering(request, queryset)
+        self.field = ordering[0].lstrip('-')
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset, self.field)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, ordering))
+        recipes = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(recipes) > page_size:
+            recipes = recipes[:page_size]
+            last = recipes[-1]
+            self.next_position = (getattr(last, self.field), last.id)
+        return recipes
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,157 @@
+"""Полнотекстовый поиск рецептов по названию и описанию.
+
+На PostgreSQL используется хранимая колонка tsvector с GIN-индексом и
+русским стеммингом, на SQLite - таблица FTS5, которую поддерживают
+триггеры. Колонка и таблица создаются миграцией и в модели не описаны.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+FTS_WEIGHTS = (10.0, 1.0)
+
+POSTGRESQL_INSTALL = (
+    f"""
+    ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX recipe_search_vector_idx ON recipes_recipe '
+    'USING GIN (search_vector)',
+)
+POSTGRESQL_REMOVE = (
+    'DROP INDEX IF EXISTS recipe_search_vector_idx',
+    'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, text, content='recipes_recipe', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON recipes_recipe BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON recipes_recipe BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, text)
+            VALUES ('delete', old.id, old.name, old.text);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF name, text ON recipes_recipe BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, name, text)
+            VALUES ('delete', old.id, old.name, old.text);
+            INSERT INTO {FTS_TABLE} (rowid, name, text)
+            VALUES (new.id, new.name, new.text);
+        END
+    """,
+}
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_search_index(connection) -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_INSTALL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(SQLITE_TABLE)
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute(SQLITE_REBUILD)
+
+
+def remove_search_index(connection) -> None:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_REMOVE:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def repair_sqlite_triggers(connection) -> None:
+    """Восстанавливает триггеры FTS5 после пересоздания таблицы рецептов.
+
+    Схема-редактор SQLite пересоздает таблицу при изменении полей, и
+    триггеры на ней пропадают; тогда индекс пересобирается целиком.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name FROM sqlite_master '
+            "WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            (f'{FTS_TABLE}%',)
+        )
+        existing = {name for name, in cursor.fetchall()}
+        if FTS_TABLE not in existing or existing.issuperset(SQLITE_TRIGGERS):
+            return
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(SQLITE_REBUILD)
+
+
+def fts_match_query(query: str) -> str:
+    """Запрос FTS5: все слова запроса, каждое как префикс."""
+    return ' '.join(
+        f'"{word}"*' for word in re.findall(r'\w+', query.casefold())
+    )
+
+
+def search_recipes(queryset, query: str):
+    """Рецепты, подходящие под запрос, по убыванию релевантности."""
+    query = query.strip()
+    if not query:
+        return queryset
+    connection = connections[queryset.db]
+    table = connection.ops.quote_name(Recipe._meta.db_table)
+
+    if connection.vendor == 'postgresql':
+        tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        queryset = queryset.filter(RawSQL(
+            f'{table}.search_vector @@ {tsquery}',
+            (query,),
+            output_field=BooleanField()
+        )).annotate(search_rank=RawSQL(
+            # float8, чтобы ранг из курсора сравнивался без потери точности.
+            f'ts_rank_cd({table}.search_vector, {tsquery})::float8',
+            (query,),
+            output_field=FloatField()
+        ))
+    elif connection.vendor == 'sqlite':
+        match = fts_match_query(query)
+        if not match:
+            return queryset.none()
+        weights = ', '.join(map(str, FTS_WEIGHTS))
+        queryset = queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)
+        )).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}."id"',
+            (match,),
+            output_field=FloatField()
+        ))
+    else:
+        queryset = queryset.filter(
+            Q(name__icontains=query) | Q(text__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by('-search_rank', *Recipe._meta.ordering)
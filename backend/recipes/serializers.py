@@ -1,16 +1,25 @@
+import json
+
+from django.db import models, transaction
+from django.http import QueryDict
 from rest_framework import serializers
 
 from favorite_recipes.models import UserFavoriteRecipes
-from foodgram_backend.constants import RECIPE_NAME_LENGTH
+from foodgram_backend.constants import (IMAGE_DERIVATIVE_SIZES,
+                                        RECIPE_NAME_LENGTH)
 from ingredients.models import Ingredient
 from ingredients.serializers import IngredientSerializer
 from shoppingcart_recipes.models import UserRecipeShoppingCart
+from shoppingcart_recipes.utils import update_shopping_lists_with_recipe
 from tags.models import Tag
 from tags.serializers import TagSerializer
-from users.serializers import UserSerializer
+from users.serializers import UserSerializer, get_subscribed_ids
+from utils.images import (recipe_image_url, schedule_derivatives_deletion,
+                          schedule_recipe_image)
 from utils.serializer_fields import Base64ImageField
 from .models import IngredientRecipe, Recipe
-from .utils import add_tags_to_recipe, create_recipe_ingredient
+from .utils import (add_tags_to_recipe, create_recipe_ingredient,
+                    update_recipe_ingredients, update_recipe_tags)
 
 
 class IngredientRecipeSerializer(serializers.ModelSerializer):
@@ -34,7 +43,9 @@ class RecipeShortInfoSerializer(serializers.ModelSerializer):
         )
 
     def get_image(self, obj):
-        return self.context.get('request').build_absolute_uri(obj.image.url)
+        return recipe_image_url(
+            self.context.get('request'), obj, 'thumbnail'
+        )
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
@@ -55,6 +66,29 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
+    def to_internal_value(self, data):
+        if isinstance(data, QueryDict):
+            data = self.parse_multipart(data)
+        return super().to_internal_value(data)
+
+    def parse_multipart(self, data):
+        """Приводит multipart-форму к виду JSON-запроса.
+
+        Тэги передаются повторяющимся полем tags, ингредиенты - строкой
+        JSON в поле ingredients.
+        """
+        parsed = data.dict()
+        if 'tags' in data:
+            parsed['tags'] = data.getlist('tags')
+        if isinstance(parsed.get('ingredients'), str):
+            try:
+                parsed['ingredients'] = json.loads(parsed['ingredients'])
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'ingredients': 'Ожидается список ингредиентов в JSON.'}
+                )
+        return parsed
+
     def validate_name(self, value):
         if Recipe.objects.filter(
             name=value,
@@ -76,15 +110,20 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     'Количество ингредиентов не должно быть меньше 1.'
                 )
+            ingredient_ids.append(ingredient['id'])
 
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredient_ids:
-                raise serializers.ValidationError(
-                    'Не должно быть повторяющихся ингредиентов.'
-                )
-            ingredient_ids.append(ingredient_id)
+        if len(ingredient_ids) != len(set(ingredient_ids)):
+            raise serializers.ValidationError(
+                'Не должно быть повторяющихся ингредиентов.'
+            )
 
-            if not Ingredient.objects.filter(pk=ingredient_id).exists():
+        existing_ids = set(
+            Ingredient.objects.filter(
+                pk__in=ingredient_ids
+            ).values_list('pk', flat=True)
+        )
+        for ingredient_id in ingredient_ids:
+            if ingredient_id not in existing_ids:
                 raise serializers.ValidationError(
                     f'Ингредиента с id {ingredient_id} не существует.'
                 )
@@ -101,8 +140,11 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 'Не должно быть повторяющихся тэгов.'
             )
 
+        existing_ids = set(
+            Tag.objects.filter(pk__in=value).values_list('pk', flat=True)
+        )
         for tag in value:
-            if not Tag.objects.filter(pk=tag).exists():
+            if tag not in existing_ids:
                 raise serializers.ValidationError(
                     f'Тэга с id {tag} не существует.'
                 )
@@ -115,23 +157,32 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         create_recipe_ingredient(recipe, ingredients_data)
         add_tags_to_recipe(recipe, tags_data)
+        schedule_recipe_image(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop('ingredients')
-        instance.ingredients.clear()
-        create_recipe_ingredient(instance, ingredients_data)
-
-        tags_data = validated_data.pop('tags')
-        instance.tags.clear()
-        add_tags_to_recipe(instance, tags_data)
-        return super().update(instance, validated_data)
+        deltas = update_recipe_ingredients(
+            instance, validated_data.pop('ingredients')
+        )
+        if deltas:
+            update_shopping_lists_with_recipe(instance, deltas)
+        update_recipe_tags(instance, validated_data.pop('tags'))
+        old_image = instance.image.name
+        if 'image' in validated_data:
+            validated_data['has_image_derivatives'] = False
+        instance = super().update(instance, validated_data)
+        if 'image' in validated_data:
+            schedule_recipe_image(instance)
+            schedule_derivatives_deletion(old_image)
+        return instance
 
     def to_representation(self, instance):
         serializer = RecipeReadSerializer(
@@ -141,10 +192,45 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return serializer.data
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """Определяет избранное, корзину и подписки сразу для всей страницы."""
+
+    def to_representation(self, data):
+        recipes = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        user = self.context['request'].user
+        favorited_ids = set()
+        in_shopping_cart_ids = set()
+        if user.is_authenticated and recipes:
+            recipe_ids = [recipe.id for recipe in recipes]
+            favorited_ids = set(
+                UserFavoriteRecipes.objects.filter(
+                    user=user,
+                    recipe__in=recipe_ids
+                ).values_list('recipe_id', flat=True)
+            )
+            in_shopping_cart_ids = set(
+                UserRecipeShoppingCart.objects.filter(
+                    user=user,
+                    recipe__in=recipe_ids
+                ).values_list('recipe_id', flat=True)
+            )
+        self.context['favorited_ids'] = favorited_ids
+        self.context['in_shopping_cart_ids'] = in_shopping_cart_ids
+        self.context['subscribed_ids'] = get_subscribed_ids(
+            user,
+            {recipe.author_id for recipe in recipes}
+        )
+        return super().to_representation(recipes)
+
+
 class RecipeReadSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     ingredients = serializers.SerializerMethodField()
     tags = TagSerializer(many=True)
+    image = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -159,12 +245,27 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'images',
             'text',
             'cooking_time'
         )
+        list_serializer_class = RecipeListSerializer
+
+    def get_image(self, obj):
+        return recipe_image_url(self.context['request'], obj, 'card')
+
+    def get_images(self, obj):
+        return {
+            size: recipe_image_url(self.context['request'], obj, size)
+            for size in IMAGE_DERIVATIVE_SIZES
+        }
 
     def get_ingredients(self, obj):
-        recipe_ingredients = IngredientRecipe.objects.filter(recipe=obj)
+        recipe_ingredients = getattr(obj, 'recipe_ingredients', None)
+        if recipe_ingredients is None:
+            recipe_ingredients = obj.ingredientrecipe_set.select_related(
+                'ingredient'
+            )
         result = []
         for recipe_ingredient in recipe_ingredients:
             ingredient_data = IngredientSerializer(
@@ -175,6 +276,9 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         return result
 
     def get_is_favorited(self, obj):
+        favorited_ids = self.context.get('favorited_ids')
+        if favorited_ids is not None:
+            return obj.id in favorited_ids
         return (
             self.context['request'].user.is_authenticated
             and UserFavoriteRecipes.objects.filter(
@@ -184,6 +288,9 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         )
 
     def get_is_in_shopping_cart(self, obj):
+        in_shopping_cart_ids = self.context.get('in_shopping_cart_ids')
+        if in_shopping_cart_ids is not None:
+            return obj.id in in_shopping_cart_ids
         return (
             self.context['request'].user.is_authenticated
             and UserRecipeShoppingCart.objects.filter(
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from ingredients.models import Ingredient
+from utils.counters import change_counter, change_counters
+from utils.images import schedule_derivatives_deletion
+from .ingredient_index import recipe_ingredient_index
+from .models import IngredientRecipe, Recipe
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Recipe)
+def increase_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def decrease_ingredients_recipes_count(sender, instance, **kwargs):
+    """Строки состава удаляются каскадом без сигналов, поэтому до них."""
+    change_counters(
+        Ingredient,
+        IngredientRecipe.objects.filter(recipe=instance).values(
+            'ingredient_id'
+        ),
+        'recipes_count',
+        -1
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrease_recipes_count(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+    transaction.on_commit(recipe_ingredient_index.invalidate)
+    schedule_derivatives_deletion(instance.image.name)
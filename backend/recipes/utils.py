@@ -1,29 +1,105 @@
+from django.db import transaction
+
 from ingredients.models import Ingredient
-from tags.models import Tag
+from utils.counters import change_counters
+from .ingredient_index import recipe_ingredient_index
 from .models import IngredientRecipe, Recipe
 
 
 def create_recipe_ingredient(
         recipe: Recipe, ingredients_data: list[dict[str, int]]
 ) -> None:
-    """Добавляет ингредиенты к полученному рецепту."""
+    """Добавляет ингредиенты к полученному рецепту одним запросом."""
     if not recipe or not ingredients_data:
         return
-    for ingredient in ingredients_data:
-        IngredientRecipe.objects.create(
-            ingredient=Ingredient.objects.get(
-                pk=ingredient['id']
-            ),
+    IngredientRecipe.objects.bulk_create(
+        IngredientRecipe(
+            ingredient_id=ingredient['id'],
             recipe=recipe,
             amount=ingredient['amount']
         )
+        for ingredient in ingredients_data
+    )
+    change_counters(
+        Ingredient,
+        [ingredient['id'] for ingredient in ingredients_data],
+        'recipes_count',
+        1
+    )
+    transaction.on_commit(recipe_ingredient_index.invalidate)
 
 
 def add_tags_to_recipe(recipe: Recipe, tags_data: list[int]) -> None:
-    """Добавляет тэги к полученному рецепту."""
+    """Добавляет тэги к полученному рецепту одним запросом."""
     if not recipe or not tags_data:
         return
-    for tag_id in tags_data:
-        recipe.tags.add(
-            Tag.objects.get(pk=tag_id)
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe=recipe, tag_id=tag_id)
+        for tag_id in tags_data
+    )
+
+
+def update_recipe_ingredients(
+        recipe: Recipe, ingredients_data: list[dict[str, int]]
+) -> dict[int, int]:
+    """Приводит ингредиенты рецепта к переданным, меняя только отличия.
+
+    Возвращает изменение количества по каждому затронутому ингредиенту.
+    """
+    current = {
+        recipe_ingredient.ingredient_id: recipe_ingredient
+        for recipe_ingredient in recipe.ingredientrecipe_set.all()
+    }
+    submitted = {
+        ingredient['id']: ingredient['amount']
+        for ingredient in ingredients_data
+    }
+    deltas = {}
+
+    removed_ids = current.keys() - submitted.keys()
+    if removed_ids:
+        IngredientRecipe.objects.filter(
+            recipe=recipe,
+            ingredient_id__in=removed_ids
+        ).delete()
+        change_counters(Ingredient, removed_ids, 'recipes_count', -1)
+        for ingredient_id in removed_ids:
+            deltas[ingredient_id] = -current[ingredient_id].amount
+
+    changed = []
+    added = []
+    for ingredient_id, amount in submitted.items():
+        recipe_ingredient = current.get(ingredient_id)
+        if recipe_ingredient is None:
+            added.append({'id': ingredient_id, 'amount': amount})
+            deltas[ingredient_id] = amount
+        elif recipe_ingredient.amount != amount:
+            deltas[ingredient_id] = amount - recipe_ingredient.amount
+            recipe_ingredient.amount = amount
+            changed.append(recipe_ingredient)
+    if changed:
+        IngredientRecipe.objects.bulk_update(changed, ('amount',))
+    create_recipe_ingredient(recipe, added)
+    if deltas:
+        transaction.on_commit(recipe_ingredient_index.invalidate)
+    return deltas
+
+
+def update_recipe_tags(recipe: Recipe, tags_data: list[int]) -> None:
+    """Приводит тэги рецепта к переданным, меняя только отличия."""
+    RecipeTag = Recipe.tags.through
+    current_ids = set(
+        RecipeTag.objects.filter(recipe=recipe).values_list(
+            'tag_id', flat=True
         )
+    )
+    removed_ids = current_ids - set(tags_data)
+    if removed_ids:
+        RecipeTag.objects.filter(
+            recipe=recipe,
+            tag_id__in=removed_ids
+        ).delete()
+    add_tags_to_recipe(
+        recipe,
+        [tag_id for tag_id in tags_data if tag_id not in current_ids]
+    )
@@ -1,13 +1,16 @@
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from urlshortner.utils import shorten_url
 
 from .filters import RecipeFilter
 from .mixins import PatchModelMixin
-from .models import Recipe
+from .models import IngredientRecipe, Recipe
+from .pagination import RecipeCursorPagination
 from .permissions import IsAuthorOrAdmin
 from .serializers import RecipeCreateSerializer, RecipeReadSerializer
 
@@ -21,9 +24,40 @@ class RecipeViewSet(
     viewsets.GenericViewSet
 ):
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrAdmin,)
+    parser_classes = (JSONParser, MultiPartParser)
     filter_backends = (DjangoFilterBackend,)
     queryset = Recipe.objects.all()
     filterset_class = RecipeFilter
+    read_actions = ('list', 'retrieve')
+
+    @property
+    def paginator(self):
+        """Включает курсорную пагинацию по ?pagination=cursor."""
+        if not hasattr(self, '_paginator'):
+            query_params = self.request.query_params
+            if (
+                query_params.get('pagination') == 'cursor'
+                or RecipeCursorPagination.cursor_query_param in query_params
+            ):
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.read_actions:
+            queryset = queryset.select_related('author').prefetch_related(
+                'tags',
+                Prefetch(
+                    'ingredientrecipe_set',
+                    queryset=IngredientRecipe.objects.select_related(
+                        'ingredient'
+                    ),
+                    to_attr='recipe_ingredients'
+                )
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create', 'partial_update'):
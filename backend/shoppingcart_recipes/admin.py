@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import UserRecipeShoppingCart
+from .models import ShoppingListItem, UserRecipeShoppingCart
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -18,3 +18,19 @@ class UserRecipeShoppingCartAdmin(admin.ModelAdmin):
     search_fields = (
         'user',
     )
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'ingredient',
+        'amount'
+    )
+    list_select_related = (
+        'user',
+        'ingredient',
+    )
+    readonly_fields = (
+        'amount',
+    )
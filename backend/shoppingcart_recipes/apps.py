@@ -6,3 +6,6 @@ class ShoppingcartRecipesConfig(AppConfig):
     name = 'shoppingcart_recipes'
     verbose_name = 'Рецепты пользователя в корзине'
     verbose_name_plural = 'Рецепты пользователя в корзине'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from shoppingcart_recipes.utils import rebuild_shopping_lists
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает списки покупок пользователей из их корзин.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_shopping_lists()
+        self.stdout.write(f'Списки покупок пересобраны, позиций - {created}')
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from ingredients.models import Ingredient
 from recipes.models import Recipe
 from foodgram_backend.constants import TRUNCATE_AMOUNT
 
@@ -22,6 +23,10 @@ class UserRecipeShoppingCart(models.Model):
         verbose_name='Рецепт',
         related_name='shopping_cart_recipes'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
 
     class Meta:
         verbose_name = 'Рецепт пользователя в корзине'
@@ -38,3 +43,43 @@ class UserRecipeShoppingCart(models.Model):
             self.user.email[:TRUNCATE_AMOUNT] + ' '
             + self.recipe.name[:TRUNCATE_AMOUNT]
         )
+
+
+class ShoppingListItem(models.Model):
+    """Суммарное количество ингредиента в корзине покупок пользователя.
+
+    Поддерживается сигналами корзины и правками рецептов, пересобирается
+    командой rebuild_shopping_lists.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='shopping_list_items'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name='Ингредиент',
+        related_name='shopping_list_items'
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name='Количество'
+    )
+
+    class Meta:
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Ингредиенты в списке покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='unique_user_ingredient_in_shopping_list',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            self.user.email[:TRUNCATE_AMOUNT] + ' '
+            + self.ingredient.name[:TRUNCATE_AMOUNT]
+        )
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from ingredients.models import Ingredient
+from .models import UserRecipeShoppingCart
+from .utils import (change_shopping_lists, get_recipe_amounts,
+                    invalidate_all_shopping_lists, invalidate_shopping_lists)
+
+
+@receiver(post_save, sender=UserRecipeShoppingCart)
+def add_recipe_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        change_shopping_lists(
+            [instance.user_id], get_recipe_amounts(instance.recipe_id)
+        )
+
+
+@receiver(pre_delete, sender=UserRecipeShoppingCart)
+def remove_recipe_from_shopping_list(sender, instance, **kwargs):
+    change_shopping_lists(
+        [instance.user_id],
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount
+            in get_recipe_amounts(instance.recipe_id).items()
+        }
+    )
+
+
+@receiver(post_save, sender=UserRecipeShoppingCart)
+@receiver(post_delete, sender=UserRecipeShoppingCart)
+def invalidate_user_shopping_list(sender, instance, **kwargs):
+    invalidate_shopping_lists([instance.user_id])
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_shopping_lists_on_ingredient_change(sender, **kwargs):
+    invalidate_all_shopping_lists()
@@ -0,0 +1,237 @@
+import csv
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from PIL import Image, ImageDraw, ImageFont
+
+from foodgram_backend.constants import (SHOPPING_LIST_CACHE_TIMEOUT,
+                                        SHOPPING_LIST_PDF_FONT_SIZE,
+                                        SHOPPING_LIST_PDF_PAGE_SIZE,
+                                        SHOPPING_LIST_PDF_RESOLUTION,
+                                        SHOPPING_LIST_REBUILD_BATCH_SIZE,
+                                        SHOPPING_LIST_UPSERT_BATCH_SIZE)
+from recipes.models import IngredientRecipe
+from utils.cache import get_version
+from .models import ShoppingListItem, UserRecipeShoppingCart
+
+CATALOG_VERSION_KEY = 'shopping_list:catalog_version'
+PDF_MARGIN = 120
+PDF_LINE_SPACING = 1.6
+
+
+def cart_version_key(user_id: int) -> str:
+    return f'shopping_list:cart_version:{user_id}'
+
+
+def invalidate_shopping_lists(user_ids) -> None:
+    """Сбрасывает версии корзин, чтобы списки покупок собрались заново."""
+    cache.delete_many([cart_version_key(user_id) for user_id in user_ids])
+
+
+def invalidate_all_shopping_lists() -> None:
+    cache.delete(CATALOG_VERSION_KEY)
+
+
+def get_recipe_amounts(recipe_id: int) -> dict[int, int]:
+    """Количество каждого ингредиента в рецепте."""
+    return dict(
+        IngredientRecipe.objects.filter(recipe_id=recipe_id).values_list(
+            'ingredient_id', 'amount'
+        )
+    )
+
+
+def add_to_shopping_lists(user_ids, additions: dict[int, int]) -> None:
+    """Прибавляет количества одним INSERT ... ON CONFLICT DO UPDATE.
+
+    Сумма увеличивается в самой БД, поэтому одновременные добавления
+    рецептов в корзину не теряют количества друг друга.
+    """
+    table = ShoppingListItem._meta.db_table
+    rows = [
+        (user_id, ingredient_id, amount)
+        for user_id in user_ids
+        for ingredient_id, amount in additions.items()
+    ]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), SHOPPING_LIST_UPSERT_BATCH_SIZE):
+            batch = rows[start:start + SHOPPING_LIST_UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, ingredient_id, amount) '
+                'VALUES ' + ', '.join(['(%s, %s, %s)'] * len(batch))
+                + ' ON CONFLICT (user_id, ingredient_id) DO UPDATE SET '
+                f'amount = {table}.amount + excluded.amount',
+                [value for row in batch for value in row]
+            )
+
+
+def change_shopping_lists(user_ids, deltas: dict[int, int]) -> None:
+    """Прибавляет deltas к суммам ингредиентов в списках покупок.
+
+    Недостающие позиции создаются, обнуленные удаляются. Вычитание
+    затрагивает только существующие позиции и выполняется одним UPDATE.
+    """
+    user_ids = list(user_ids)
+    additions = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta > 0
+    }
+    subtractions = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta < 0
+    }
+    if not user_ids:
+        return
+    if additions:
+        add_to_shopping_lists(user_ids, additions)
+    if subtractions:
+        items = ShoppingListItem.objects.filter(
+            user_id__in=user_ids,
+            ingredient_id__in=subtractions
+        )
+        items.update(amount=Greatest(
+            F('amount') + Case(
+                *(
+                    When(ingredient_id=ingredient_id, then=Value(delta))
+                    for ingredient_id, delta in subtractions.items()
+                ),
+                output_field=IntegerField()
+            ),
+            0
+        ))
+        items.filter(amount=0).delete()
+
+
+def update_shopping_lists_with_recipe(recipe, deltas: dict[int, int]):
+    """Переносит изменения состава рецепта в списки покупок с ним."""
+    user_ids = list(
+        UserRecipeShoppingCart.objects.filter(recipe=recipe).values_list(
+            'user_id', flat=True
+        )
+    )
+    change_shopping_lists(user_ids, deltas)
+    invalidate_shopping_lists(user_ids)
+
+
+def rebuild_shopping_lists() -> int:
+    """Заново собирает списки покупок из корзин, возвращает число позиций."""
+    ShoppingListItem.objects.all().delete()
+    totals = IngredientRecipe.objects.filter(
+        recipe__shopping_cart_recipes__isnull=False
+    ).values_list(
+        'recipe__shopping_cart_recipes__user', 'ingredient'
+    ).annotate(Sum('amount')).order_by()
+    items = ShoppingListItem.objects.bulk_create(
+        (
+            ShoppingListItem(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for user_id, ingredient_id, amount in totals.iterator()
+        ),
+        batch_size=SHOPPING_LIST_REBUILD_BATCH_SIZE
+    )
+    invalidate_all_shopping_lists()
+    return len(items)
+
+
+def get_shopping_list(user):
+    """Суммарное количество каждого ингредиента из корзины покупок."""
+    return ShoppingListItem.objects.filter(user=user).values_list(
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'amount',
+    ).order_by('ingredient__name')
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    for name, measurement_unit, amount in rows:
+        yield writer.writerow((name, measurement_unit, amount)).encode()
+
+
+def render_txt(rows):
+    for name, measurement_unit, amount in rows:
+        yield f'{name} ({measurement_unit}) - {amount}\n'.encode()
+
+
+def render_pdf(rows):
+    try:
+        font = ImageFont.truetype(
+            settings.SHOPPING_LIST_PDF_FONT, SHOPPING_LIST_PDF_FONT_SIZE
+        )
+    except OSError:
+        font = ImageFont.load_default(size=SHOPPING_LIST_PDF_FONT_SIZE)
+    width, height = SHOPPING_LIST_PDF_PAGE_SIZE
+    line_height = int(SHOPPING_LIST_PDF_FONT_SIZE * PDF_LINE_SPACING)
+    lines_per_page = (height - 2 * PDF_MARGIN) // line_height
+
+    pages = []
+    draw = None
+    for number, (name, measurement_unit, amount) in enumerate(rows):
+        line = number % lines_per_page
+        if line == 0:
+            pages.append(Image.new('1', (width, height), 1))
+            draw = ImageDraw.Draw(pages[-1])
+        draw.text(
+            (PDF_MARGIN, PDF_MARGIN + line * line_height),
+            f'{name} ({measurement_unit}) - {amount}',
+            font=font,
+            fill=0
+        )
+    if not pages:
+        pages.append(Image.new('1', (width, height), 1))
+
+    buffer = BytesIO()
+    pages[0].save(
+        buffer,
+        'PDF',
+        save_all=True,
+        append_images=pages[1:],
+        resolution=SHOPPING_LIST_PDF_RESOLUTION
+    )
+    yield buffer.getvalue()
+
+
+SHOPPING_LIST_FORMATS = {
+    'csv': (render_csv, 'text/csv; charset=utf-8'),
+    'txt': (render_txt, 'text/plain; charset=utf-8'),
+    'pdf': (render_pdf, 'application/pdf'),
+}
+
+
+def export_shopping_list(user, export_format: str):
+    """Отдает файл списка покупок по частям и кэширует его целиком.
+
+    Ключ кэша зависит от версии корзины пользователя, поэтому повторное
+    скачивание неизменной корзины не выполняет агрегацию в БД.
+    """
+    key = 'shopping_list:{}:{}:{}:{}'.format(
+        user.id,
+        get_version(cart_version_key(user.id)),
+        get_version(CATALOG_VERSION_KEY),
+        export_format,
+    )
+    content = cache.get(key)
+    if content is not None:
+        yield content
+        return
+
+    render, _ = SHOPPING_LIST_FORMATS[export_format]
+    chunks = []
+    for chunk in render(get_shopping_list(user).iterator()):
+        chunks.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(chunks), SHOPPING_LIST_CACHE_TIMEOUT)
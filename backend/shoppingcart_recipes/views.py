@@ -1,17 +1,14 @@
-import csv
-
-from django.http import HttpResponse
-from django.db.models import Sum
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from recipes.models import IngredientRecipe
 from favorite_recipes.views import FavoriteRecipeViewSet
 from .models import UserRecipeShoppingCart
 from .serializers import (RecipeShoppingCartCreateSerializer,
                           RecipeShoppingCartDeleteSerializer)
+from .utils import SHOPPING_LIST_FORMATS, export_shopping_list
 
 
 class RecipeShoppingCartViewSet(FavoriteRecipeViewSet):
@@ -74,23 +71,26 @@ class RecipeShoppingCartViewSet(FavoriteRecipeViewSet):
         permission_classes=[IsAuthenticated],
     )
     def download_shopping_cart(self, request):
-        """Скачать список ингредиентов из корзины покупок."""
-        ingredient_list = IngredientRecipe.objects.filter(
-            recipe__shopping_cart_recipes__user=request.user
-        ).values_list(
-            'ingredient__name',
-            'ingredient__measurement_unit',
-        ).annotate(Sum('amount'))
+        """Скачать список ингредиентов из корзины покупок.
+
+        Формат файла задается параметром type: csv (по умолчанию), txt, pdf.
+        """
+        export_format = request.query_params.get('type', 'csv')
+        if export_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {
+                    'type': 'Доступные форматы: '
+                    + ', '.join(SHOPPING_LIST_FORMATS)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        response = HttpResponse(
-            content_type='text/csv',
+        _, content_type = SHOPPING_LIST_FORMATS[export_format]
+        return StreamingHttpResponse(
+            export_shopping_list(request.user, export_format),
+            content_type=content_type,
             headers={
                 'Content-Disposition':
-                'attachment; filename="shopping_list.csv"'
+                f'attachment; filename="shopping_list.{export_format}"'
             },
         )
-
-        writer = csv.writer(response)
-        for name, measurement_unit, sum in ingredient_list:
-            writer.writerow((name, measurement_unit, sum))
-        return response
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import SimilarRecipe
+
+
+@admin.register(SimilarRecipe)
+class SimilarRecipeAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipe',
+        'similar',
+        'score',
+        'computed_at'
+    )
+    list_select_related = (
+        'recipe',
+        'similar',
+    )
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class SimilarRecipesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'similar_recipes'
+    verbose_name = 'Похожие рецепты'
+    verbose_name_plural = 'Похожие рецепты'
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from similar_recipes.utils import compute_similar_recipes
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие рецепты по ингредиентам и тэгам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Пересчитать только рецепты, измененные после прошлого '
+                 'расчета, и рецепты, на которые эти изменения влияют.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recipes = compute_similar_recipes(options['incremental'])
+        self.stdout.write(f'Похожие рецепты пересчитаны, рецептов - {recipes}')
@@ -0,0 +1,52 @@
+from django.db import models
+
+from foodgram_backend.constants import TRUNCATE_AMOUNT
+from recipes.models import Recipe
+
+
+class SimilarRecipe(models.Model):
+    """Рецепт, похожий на данный по ингредиентам и тэгам.
+
+    Заполняется командой compute_similar_recipes.
+    """
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='similar_recipes'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Похожий рецепт',
+        related_name='+'
+    )
+    score = models.FloatField(
+        verbose_name='Косинусная близость'
+    )
+    computed_at = models.DateTimeField(
+        verbose_name='Дата расчета'
+    )
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'similar'),
+                name='unique_recipe_similar',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('recipe', '-score', 'similar'),
+                name='similar_recipe_score_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            self.recipe.name[:TRUNCATE_AMOUNT] + ' '
+            + self.similar.name[:TRUNCATE_AMOUNT]
+        )
@@ -0,0 +1,16 @@
+"""Добавляет маршруты для рецептов вместе с похожими рецептами."""
+
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter as Router
+
+from .views import SimilarRecipeViewSet
+
+
+app_name = 'similar_recipes'
+
+router = Router()
+router.register(r'recipes', SimilarRecipeViewSet, basename='recipes')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,272 @@
+from itertools import chain
+
+import numpy as np
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from foodgram_backend.constants import (SIMILAR_RECIPES_BATCH_SIZE,
+                                        SIMILAR_RECIPES_CANDIDATES,
+                                        SIMILAR_RECIPES_COUNT,
+                                        SIMILAR_RECIPES_TAG_WEIGHT)
+from recipes.models import IngredientRecipe, Recipe
+from .models import SimilarRecipe
+
+SCORE_PRECISION = 6
+
+
+def read_ids(queryset) -> np.ndarray:
+    return np.fromiter(queryset.iterator(), dtype=np.int64)
+
+
+def read_pairs(queryset) -> np.ndarray:
+    """Пары (id рецепта, id признака) массивом n x 2."""
+    values = np.fromiter(
+        chain.from_iterable(queryset.iterator()), dtype=np.int64
+    )
+    return values.reshape(-1, 2)
+
+
+def pointers(keys: np.ndarray, size: int) -> np.ndarray:
+    """Границы групп отсортированных ключей 0..size-1, как в формате CSR."""
+    return np.concatenate(
+        ([0], np.cumsum(np.bincount(keys, minlength=size)))
+    )
+
+
+def expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Склеивает диапазоны [start, start + length) в один массив индексов."""
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(lengths.sum()) - offsets
+
+
+class RecipeVectors:
+    """Нормированные разреженные векторы рецептов.
+
+    Признаки - ингредиенты с весом 1 и тэги с весом
+    SIMILAR_RECIPES_TAG_WEIGHT. Веса не зависят от остального каталога,
+    поэтому изменение одного рецепта не меняет векторы других и
+    инкрементальный пересчет дает тот же результат, что и полный.
+    Векторы хранятся и по строкам (рецепт -> признаки), и по столбцам
+    (признак -> рецепты): по столбцам отбираются кандидаты с общими
+    признаками, и оценки считаются только для них, а не для всех пар.
+    """
+
+    def __init__(self):
+        self.recipe_ids = read_ids(
+            Recipe.objects.order_by('id').values_list('id', flat=True)
+        )
+        self.size = len(self.recipe_ids)
+        ingredients = read_pairs(
+            IngredientRecipe.objects.values_list('recipe_id', 'ingredient_id')
+        )
+        ingredients = ingredients[self.known(ingredients[:, 0])]
+        tags = read_pairs(
+            Recipe.tags.through.objects.values_list('recipe_id', 'tag_id')
+        )
+        tags = tags[self.known(tags[:, 0])]
+        ingredient_ids, ingredient_columns = np.unique(
+            ingredients[:, 1], return_inverse=True
+        )
+        tag_ids, tag_columns = np.unique(tags[:, 1], return_inverse=True)
+        features = len(ingredient_ids) + len(tag_ids)
+
+        rows = self.rows(np.concatenate((ingredients[:, 0], tags[:, 0])))
+        columns = np.concatenate(
+            (ingredient_columns, tag_columns + len(ingredient_ids))
+        )
+        weights = np.concatenate((
+            np.ones(len(ingredients)),
+            np.full(len(tags), SIMILAR_RECIPES_TAG_WEIGHT),
+        ))
+        norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=self.size))
+        weights /= norms[rows]
+
+        order = np.argsort(rows, kind='stable')
+        self.row_columns = columns[order]
+        self.row_weights = weights[order]
+        self.row_pointers = pointers(rows, self.size)
+        order = np.argsort(columns, kind='stable')
+        self.column_rows = rows[order]
+        self.column_weights = weights[order]
+        self.column_pointers = pointers(columns, features)
+
+    def rows(self, recipe_ids) -> np.ndarray:
+        return np.searchsorted(
+            self.recipe_ids, np.asarray(recipe_ids, dtype=np.int64)
+        )
+
+    def known(self, recipe_ids: np.ndarray) -> np.ndarray:
+        """Маска id рецептов, попавших в векторы.
+
+        Отсекает рецепты, созданные после чтения списка рецептов.
+        """
+        if not self.size:
+            return np.zeros(len(recipe_ids), dtype=bool)
+        positions = np.minimum(self.rows(recipe_ids), self.size - 1)
+        return self.recipe_ids[positions] == recipe_ids
+
+    def entries(self, rows: np.ndarray):
+        """Элементы строк rows: (номер строки в rows, признак, вес)."""
+        starts = self.row_pointers[rows]
+        lengths = self.row_pointers[rows + 1] - starts
+        entries = expand_ranges(starts, lengths)
+        return (
+            np.repeat(np.arange(len(rows)), lengths),
+            self.row_columns[entries],
+            self.row_weights[entries],
+        )
+
+    def candidates(self, batch: np.ndarray):
+        """Пары (номер строки в batch, кандидат) с общим признаком.
+
+        Признаки каждого рецепта обходятся от редких к частым, и из их
+        списков берется не больше SIMILAR_RECIPES_CANDIDATES рецептов:
+        частые тэги и ингредиенты есть у большой доли каталога, и полный
+        обход их списков снова сделал бы расчет квадратичным.
+        """
+        owners, columns, _ = self.entries(batch)
+        starts = self.column_pointers[columns]
+        lengths = self.column_pointers[columns + 1] - starts
+        order = np.lexsort((lengths, owners))
+        owners, starts, lengths = owners[order], starts[order], lengths[order]
+        taken = np.cumsum(lengths) - lengths
+        taken -= taken[np.searchsorted(owners, owners)]
+        lengths = np.clip(SIMILAR_RECIPES_CANDIDATES - taken, 0, lengths)
+        pairs = np.unique(
+            np.repeat(owners, lengths) * self.size
+            + self.column_rows[expand_ranges(starts, lengths)]
+        )
+        owners, candidates = pairs // self.size, pairs % self.size
+        other = candidates != batch[owners]
+        return owners[other], candidates[other]
+
+    def scores(self, batch: np.ndarray):
+        """Косинусная близость рецептов batch с их кандидатами.
+
+        Возвращает массивы (номер строки в batch, кандидат, оценка) для
+        ненулевых оценок. Оценка считается по всем общим признакам пары,
+        в том числе по тем, списки которых не обходились при отборе.
+        """
+        owners, candidates = self.candidates(batch)
+        batch_owners, batch_columns, batch_weights = self.entries(batch)
+        columns, positions = np.unique(batch_columns, return_inverse=True)
+        weights = np.zeros((len(batch), len(columns)))
+        weights[batch_owners, positions] = batch_weights
+
+        pairs, pair_columns, pair_weights = self.entries(candidates)
+        positions = np.minimum(
+            np.searchsorted(columns, pair_columns), max(len(columns) - 1, 0)
+        )
+        shared = columns[positions] == pair_columns
+        pairs, positions = pairs[shared], positions[shared]
+        values = np.bincount(
+            pairs,
+            weights[owners[pairs], positions] * pair_weights[shared],
+            minlength=len(candidates)
+        )
+        values = np.round(values, SCORE_PRECISION)
+        keep = values > 0
+        return owners[keep], candidates[keep], values[keep]
+
+
+def top_neighbours(owners, neighbours, values, count: int):
+    """Для каждой строки - до count соседей с наибольшей оценкой.
+
+    Возвращает массивы (строка, сосед, оценка), упорядоченные по строке,
+    убыванию оценки и соседу.
+    """
+    order = np.lexsort((neighbours, -values, owners))
+    owners = owners[order]
+    neighbours = neighbours[order]
+    values = values[order]
+    keep = np.arange(len(owners)) - np.searchsorted(owners, owners) < count
+    return owners[keep], neighbours[keep], values[keep]
+
+
+def store_similar_recipes(vectors: RecipeVectors, rows, computed_at):
+    """Пересчитывает похожие рецепты для строк rows пачками.
+
+    Возвращает наибольшую близость каждого рецепта к rows.
+    """
+    closest = np.zeros(vectors.size)
+    for start in range(0, len(rows), SIMILAR_RECIPES_BATCH_SIZE):
+        batch = rows[start:start + SIMILAR_RECIPES_BATCH_SIZE]
+        owners, neighbours, values = vectors.scores(batch)
+        np.maximum.at(closest, neighbours, values)
+        owners, neighbours, values = top_neighbours(
+            owners, neighbours, values, SIMILAR_RECIPES_COUNT
+        )
+        recipe_ids = vectors.recipe_ids
+        SimilarRecipe.objects.filter(
+            recipe_id__in=recipe_ids[batch].tolist()
+        ).delete()
+        SimilarRecipe.objects.bulk_create(
+            SimilarRecipe(
+                recipe_id=recipe_id,
+                similar_id=similar_id,
+                score=score,
+                computed_at=computed_at
+            )
+            for recipe_id, similar_id, score in zip(
+                recipe_ids[batch[owners]].tolist(),
+                recipe_ids[neighbours].tolist(),
+                values.tolist()
+            )
+        )
+    return closest
+
+
+def affected_rows(vectors: RecipeVectors, changed, closest) -> np.ndarray:
+    """Строки рецептов, чьи списки похожих могли измениться из-за changed.
+
+    Это рецепты, в списке которых есть измененный рецепт, рецепты с
+    неполным списком (например, после удаления соседа) и рецепты, для
+    которых измененный рецепт не хуже последнего в их списке.
+    """
+    complete = SimilarRecipe.objects.values('recipe_id').annotate(
+        total=Count('id'), lowest=Min('score')
+    ).filter(total__gte=SIMILAR_RECIPES_COUNT).values_list(
+        'recipe_id', 'lowest'
+    ).order_by()
+    stats = np.array(list(complete.iterator()), dtype=np.float64)
+    stats = stats.reshape(-1, 2)
+    recipe_ids, scores = stats[:, 0].astype(np.int64), stats[:, 1]
+    lowest = np.full(vectors.size, np.inf)
+    known = vectors.known(recipe_ids)
+    lowest[vectors.rows(recipe_ids[known])] = scores[known]
+    affected = ((closest > 0) & (closest >= lowest)) | np.isinf(lowest)
+    listed = read_ids(
+        SimilarRecipe.objects.filter(
+            similar_id__in=vectors.recipe_ids[changed].tolist()
+        ).values_list('recipe_id', flat=True).distinct()
+    )
+    affected[vectors.rows(listed[vectors.known(listed)])] = True
+    affected[changed] = False
+    return np.flatnonzero(affected)
+
+
+def compute_similar_recipes(incremental: bool = False) -> int:
+    """Пересчитывает похожие рецепты, возвращает число пересчитанных.
+
+    В инкрементальном режиме пересчитываются рецепты, измененные после
+    прошлого расчета, и рецепты, на списки которых эти изменения влияют.
+    """
+    computed_at = timezone.now()
+    since = SimilarRecipe.objects.aggregate(
+        Max('computed_at')
+    )['computed_at__max'] if incremental else None
+    vectors = RecipeVectors()
+    if since is None:
+        store_similar_recipes(vectors, np.arange(vectors.size), computed_at)
+        return vectors.size
+
+    changed = read_ids(
+        Recipe.objects.filter(updated_at__gte=since).values_list(
+            'id', flat=True
+        )
+    )
+    changed = vectors.rows(changed[vectors.known(changed)])
+    closest = store_similar_recipes(vectors, changed, computed_at)
+    affected = affected_rows(vectors, changed, closest)
+    store_similar_recipes(vectors, affected, computed_at)
+    return len(changed) + len(affected)
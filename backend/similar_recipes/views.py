@@ -0,0 +1,26 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from foodgram_backend.constants import SIMILAR_RECIPES_COUNT
+from recipe_feed.views import RecipeFeedViewSet
+from recipes.serializers import RecipeShortInfoSerializer
+from .models import SimilarRecipe
+
+
+class SimilarRecipeViewSet(RecipeFeedViewSet):
+    """Расширяет вьюсет рецептов списком похожих рецептов."""
+
+    @action(['get'], detail=True, url_path='similar')
+    def similar(self, request, pk):
+        """Похожие рецепты, заранее рассчитанные compute_similar_recipes."""
+        recipe = self.get_object()
+        similar = SimilarRecipe.objects.filter(recipe=recipe).select_related(
+            'similar'
+        ).order_by('-score', 'similar_id')[:SIMILAR_RECIPES_COUNT]
+        recipes = [item.similar for item in similar]
+        serializer = RecipeShortInfoSerializer(
+            recipes,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
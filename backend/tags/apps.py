@@ -6,3 +6,6 @@ class TagsConfig(AppConfig):
     name = 'tags'
     verbose_name = 'Тэги'
     verbose_name_plural = 'Тэги'
+
+    def ready(self):
+        from . import signals  # noqa: F401
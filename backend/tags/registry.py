@@ -0,0 +1,51 @@
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from utils.cache import get_version
+from .models import Tag
+
+VERSION_KEY = 'tag_registry:version'
+
+
+class Registry(NamedTuple):
+    version: str
+    ids_by_slug: dict[str, int]
+
+
+class TagRegistry:
+    """Соответствие slug -> id тэгов, закэшированное в памяти процесса.
+
+    Изменение тэгов сбрасывает версию в общем кэше, и каждый процесс
+    перечитывает тэги при первом обращении после смены версии, как и
+    справочники в utils.catalog.
+    """
+
+    def __init__(self):
+        self._registry = None
+
+    def _get_ids_by_slug(self) -> dict[str, int]:
+        version = get_version(VERSION_KEY)
+        registry = self._registry
+        if registry is None or registry.version != version:
+            registry = self._registry = Registry(
+                version, dict(Tag.objects.values_list('slug', 'id'))
+            )
+        return registry.ids_by_slug
+
+    def choices(self) -> list[tuple[str, str]]:
+        return [(slug, slug) for slug in self._get_ids_by_slug()]
+
+    def get_ids(self, slugs) -> list[int]:
+        ids_by_slug = self._get_ids_by_slug()
+        return [ids_by_slug[slug] for slug in slugs if slug in ids_by_slug]
+
+    def invalidate(self) -> None:
+        cache.delete(VERSION_KEY)
+
+    def reset(self) -> None:
+        """Сбрасывает реестр текущего процесса, например в тестах."""
+        self._registry = None
+
+
+tag_registry = TagRegistry()
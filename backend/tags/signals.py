@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.catalog import invalidate_catalog
+from .models import Tag
+from .registry import tag_registry
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_registry(sender, **kwargs):
+    tag_registry.invalidate()
+    invalidate_catalog('tags')
@@ -1,12 +1,15 @@
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 
+from utils.catalog import PrerenderedCatalogMixin
 from .models import Tag
 from .serializers import TagSerializer
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(PrerenderedCatalogMixin, viewsets.ReadOnlyModelViewSet):
+    catalog_name = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    authentication_classes = ()
     permission_classes = (AllowAny,)
     pagination_class = None
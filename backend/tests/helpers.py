@@ -0,0 +1,216 @@
+"""Общие данные и файлы для тестов."""
+
+import base64
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from favorite_recipes.models import UserFavoriteRecipes
+from ingredients.models import Ingredient
+from ingredients.search import ingredient_index
+from recipe_feed.utils import rebuild_feeds
+from recipes.ingredient_index import recipe_ingredient_index
+from recipes.models import IngredientRecipe, Recipe
+from shoppingcart_recipes.models import UserRecipeShoppingCart
+from shoppingcart_recipes.utils import rebuild_shopping_lists
+from similar_recipes.utils import compute_similar_recipes
+from tags.models import Tag
+from tags.registry import tag_registry
+from user_subscriptions.models import Subscription
+from users.authentication import token_cache
+
+User = get_user_model()
+
+RECIPE_IMAGE = 'recipe_images/image.png'
+USER_PASSWORD = 'Pa55word-budget'
+MEDIA_ROOT = tempfile.mkdtemp()
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': f'{MEDIA_ROOT}/cache',
+    }
+}
+
+
+def make_image(name='image.png', size=(8, 8)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=(200, 120, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type='image/png'
+    )
+
+
+def make_base64_image():
+    return 'data:image/png;base64,' + base64.b64encode(
+        make_image().read()
+    ).decode()
+
+
+def create_user(username, first_name='Имя', last_name='Фамилия', **fields):
+    return User.objects.create_user(
+        email=f'{username}@foodgram.ru',
+        username=username,
+        first_name=first_name,
+        last_name=last_name,
+        **fields
+    )
+
+
+def create_author(username='author', **fields):
+    return create_user(
+        username, first_name='Автор', last_name='Рецептов', **fields
+    )
+
+
+def build_recipe(author, name='Рецепт', **fields):
+    """Несохраненный рецепт, например для bulk_create."""
+    fields.setdefault('text', 'Описание рецепта')
+    fields.setdefault('cooking_time', 10)
+    fields.setdefault('image', RECIPE_IMAGE)
+    return Recipe(name=name, author=author, **fields)
+
+
+def create_recipe(author, name='Рецепт', **fields):
+    recipe = build_recipe(author, name, **fields)
+    recipe.save()
+    return recipe
+
+
+class SampleDataMixin:
+    """Наполняет базу авторами, рецептами, подписками и корзиной объема SCALE.
+
+    Классам с этими данными нужен override_settings(MEDIA_ROOT=MEDIA_ROOT).
+    """
+
+    SCALE = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        scale = cls.SCALE
+        cls.tags = [
+            Tag.objects.create(name=f'Тэг {number}', slug=f'tag-{number}')
+            for number in range(4)
+        ]
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(20 * scale)
+        )
+        cls.ingredients = list(Ingredient.objects.order_by('id'))
+        cls.user = create_user(
+            'user',
+            first_name='Пользователь',
+            last_name='Основной',
+            password=USER_PASSWORD,
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.authors = [
+            create_user(
+                f'author{number}',
+                first_name='Автор',
+                last_name=str(number),
+                avatar=make_image(f'avatar{number}.png'),
+            )
+            for number in range(4 * scale)
+        ]
+        cls.recipes = []
+        for author in cls.authors:
+            for number in range(scale):
+                recipe = create_recipe(
+                    author,
+                    f'Рецепт {number}',
+                    cooking_time=10 + number,
+                    image=make_image(),
+                )
+                recipe.tags.set(cls.tags[:2])
+                IngredientRecipe.objects.bulk_create(
+                    IngredientRecipe(
+                        recipe=recipe,
+                        ingredient=ingredient,
+                        amount=number + 1,
+                    )
+                    for ingredient in cls.ingredients[:3 * scale]
+                )
+                cls.recipes.append(recipe)
+        cls.own_recipe = create_recipe(
+            cls.user, 'Свой рецепт', cooking_time=5, image=make_image()
+        )
+        cls.own_recipe.tags.set(cls.tags[:1])
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=cls.own_recipe, ingredient=ingredient, amount=2
+            )
+            for ingredient in cls.ingredients[:3 * scale]
+        )
+        UserFavoriteRecipes.objects.bulk_create(
+            UserFavoriteRecipes(user=cls.user, recipe=recipe)
+            for recipe in cls.recipes[::2]
+        )
+        UserRecipeShoppingCart.objects.bulk_create(
+            UserRecipeShoppingCart(user=cls.user, recipe=recipe)
+            for recipe in cls.recipes
+        )
+        Subscription.objects.bulk_create(
+            Subscription(subscriber=cls.user, subscribe_target=author)
+            for author in cls.authors
+        )
+        cls.stranger = create_user(
+            'stranger', first_name='Незнакомец', last_name='Новый'
+        )
+        cls.lonely_recipe = create_recipe(
+            cls.stranger, 'Рецепт незнакомца', cooking_time=3,
+            image=make_image()
+        )
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=cls.lonely_recipe, ingredient=ingredient, amount=4
+            )
+            for ingredient in cls.ingredients[:3 * scale]
+        )
+        call_command('reconcile_counters', stdout=StringIO())
+        rebuild_shopping_lists()
+        rebuild_feeds()
+        compute_similar_recipes()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        tag_registry.reset()
+        ingredient_index.reset()
+        recipe_ingredient_index.reset()
+        # Данные теста созданы только что: без запаса на коммит рецепты
+        # попадают в индекс, а не проверяются запросом к БД.
+        patcher = mock.patch.object(
+            recipe_ingredient_index, 'commit_margin', 0
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.anonymous_client = APIClient()
+
+    def recipe_payload(self, name):
+        return {
+            'name': name,
+            'text': 'Новое описание',
+            'cooking_time': 15,
+            'image': make_base64_image(),
+            'tags': [tag.id for tag in self.tags[:1 + self.SCALE % 4]],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 5}
+                for ingredient in self.ingredients[-3 * self.SCALE:]
+            ],
+        }
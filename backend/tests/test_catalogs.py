@@ -0,0 +1,48 @@
+"""Кэширование справочников ингредиентов и тегов."""
+
+import gzip
+import json
+
+from django.test import TestCase, override_settings
+
+from tags.models import Tag
+from .helpers import MEDIA_ROOT, SampleDataMixin
+
+CATALOG_URLS = ('/api/ingredients/', '/api/tags/')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CatalogCacheTest(SampleDataMixin, TestCase):
+
+    def test_gzip_matches_identity(self):
+        for url in CATALOG_URLS:
+            with self.subTest(url=url):
+                first = self.anonymous_client.get(url)
+                response = self.anonymous_client.get(
+                    url, HTTP_ACCEPT_ENCODING='gzip'
+                )
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(
+                    gzip.decompress(response.content), first.content
+                )
+
+    def test_not_modified_with_etag(self):
+        for url in CATALOG_URLS:
+            with self.subTest(url=url):
+                etag = self.anonymous_client.get(url)['ETag']
+                response = self.anonymous_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+
+    def test_invalidated_on_change(self):
+        etag = self.anonymous_client.get('/api/tags/')['ETag']
+        Tag.objects.create(name='Новый тэг', slug='new-tag')
+        response = self.anonymous_client.get(
+            '/api/tags/', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'new-tag', [tag['slug'] for tag in json.loads(response.content)]
+        )
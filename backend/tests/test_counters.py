@@ -0,0 +1,117 @@
+"""Хранимые счетчики избранного, подписчиков и рецептов."""
+
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe, Recipe
+from recipes.utils import create_recipe_ingredient, update_recipe_ingredients
+from users.authentication import token_cache
+from .helpers import create_author, create_recipe, create_user
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
+            'user', first_name='Пользователь', last_name='Основной'
+        )
+        cls.author = create_author()
+        cls.recipe = create_recipe(cls.author)
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.author_client = APIClient()
+        self.author_client.force_authenticate(self.author)
+
+    def counters(self):
+        self.recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        return (
+            self.recipe.favorites_count,
+            self.author.followers_count,
+            self.author.recipes_count,
+        )
+
+    def test_favorite_and_unfavorite(self):
+        url = f'/api/recipes/{self.recipe.id}/favorite/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.counters(), (1, 0, 1))
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.counters(), (1, 0, 1))
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.counters(), (0, 0, 1))
+
+    def test_subscribe_and_unsubscribe(self):
+        url = f'/api/users/{self.author.id}/subscribe/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.counters(), (0, 1, 1))
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.counters(), (0, 0, 1))
+
+    def test_recipe_delete(self):
+        self.client.post(f'/api/recipes/{self.recipe.id}/favorite/')
+        response = self.author_client.delete(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
+
+    def ingredient_counts(self):
+        return list(Ingredient.objects.order_by('id').values_list(
+            'recipes_count', flat=True
+        ))
+
+    def test_ingredient_recipes_count(self):
+        first, second, third = self.ingredients
+        recipe = create_recipe(self.author, 'Новый рецепт')
+        create_recipe_ingredient(recipe, [
+            {'id': first.id, 'amount': 1},
+            {'id': second.id, 'amount': 1},
+        ])
+        self.assertEqual(self.ingredient_counts(), [1, 1, 0])
+        update_recipe_ingredients(recipe, [
+            {'id': second.id, 'amount': 2},
+            {'id': third.id, 'amount': 1},
+        ])
+        self.assertEqual(self.ingredient_counts(), [0, 1, 1])
+        response = self.author_client.delete(f'/api/recipes/{recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.ingredient_counts(), [0, 0, 0])
+
+    def test_reconcile_counters_repairs_drift(self):
+        self.client.post(f'/api/recipes/{self.recipe.id}/favorite/')
+        self.client.post(f'/api/users/{self.author.id}/subscribe/')
+        Recipe.objects.filter(pk=self.recipe.pk).update(favorites_count=7)
+        User.objects.filter(pk=self.author.pk).update(
+            followers_count=0, recipes_count=3
+        )
+        IngredientRecipe.objects.create(
+            recipe=self.recipe, ingredient=self.ingredients[0], amount=1
+        )
+        output = io.StringIO()
+        call_command('reconcile_counters', stdout=output)
+        self.assertEqual(self.counters(), (1, 1, 1))
+        self.assertEqual(self.ingredient_counts(), [1, 0, 0])
+        self.assertIn('recipes.Recipe.favorites_count: исправлено строк - 1',
+                      output.getvalue())
+
+        output = io.StringIO()
+        call_command('reconcile_counters', stdout=output)
+        self.assertEqual(output.getvalue().count('исправлено строк - 0'), 4)
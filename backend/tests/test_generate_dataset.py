@@ -0,0 +1,142 @@
+"""Синтетический набор данных командой generate_dataset."""
+
+import io
+import shutil
+import tempfile
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+
+from benchmarks.dataset import (USERNAME_PREFIX, power_law_cdf, sample_ranks,
+                                unique_pairs)
+from favorite_recipes.models import UserFavoriteRecipes
+from ingredients.models import Ingredient
+from recipes.models import Recipe
+from similar_recipes.models import SimilarRecipe
+from tags.models import Tag
+from user_subscriptions.models import Subscription
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class GenerateDatasetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            Tag.objects.create(name=f'Тэг {number}', slug=f'tag-{number}')
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(30)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def generate(self, *args):
+        output = io.StringIO()
+        call_command(
+            'generate_dataset', '--users', '40', '--recipes', '150',
+            '--images', '2', '--chunk-size', '50', *args,
+            stdout=output
+        )
+        return output.getvalue()
+
+    def snapshot(self):
+        """Связи набора относительно первых id пользователей и рецептов."""
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        user_start = min(users.values_list('id', flat=True))
+        recipe_start = min(Recipe.objects.values_list('id', flat=True))
+        return (
+            sorted(
+                (user - user_start, target - user_start)
+                for user, target in Subscription.objects.values_list(
+                    'subscriber_id', 'subscribe_target_id'
+                )
+            ),
+            sorted(
+                (user - user_start, recipe - recipe_start)
+                for user, recipe in UserFavoriteRecipes.objects.values_list(
+                    'user_id', 'recipe_id'
+                )
+            ),
+        )
+
+    def test_dataset_with_derived_data(self):
+        self.generate('--similar')
+        self.assertEqual(
+            User.objects.filter(username__startswith=USERNAME_PREFIX).count(),
+            40
+        )
+        self.assertEqual(Recipe.objects.count(), 150)
+        self.assertFalse(
+            Recipe.objects.annotate(
+                total=Count('ingredients', distinct=True)
+            ).filter(total=0).exists()
+        )
+        self.assertFalse(
+            Subscription.objects.filter(
+                subscriber=F('subscribe_target')
+            ).exists()
+        )
+        self.assertFalse(
+            UserFavoriteRecipes.objects.filter(
+                created_at__lt=F('recipe__created_at')
+            ).exists()
+        )
+        self.assertEqual(
+            sum(Recipe.objects.values_list('favorites_count', flat=True)),
+            UserFavoriteRecipes.objects.count()
+        )
+        self.assertTrue(SimilarRecipe.objects.exists())
+        self.assertEqual(
+            Recipe.objects.values('image').distinct().count(), 2
+        )
+        self.assertTrue(
+            self.client.login(
+                email=User.objects.filter(
+                    username__startswith=USERNAME_PREFIX
+                ).first().email,
+                password='foodgram-dataset'
+            )
+        )
+
+    def test_similar_recipes_are_opt_in(self):
+        output = self.generate()
+        self.assertIn(
+            'compute_similar_recipes: пропущено, включите --similar', output
+        )
+        self.assertFalse(SimilarRecipe.objects.exists())
+        self.assertTrue(
+            Recipe.objects.filter(favorites_count__gt=0).exists()
+        )
+
+    def test_same_seed_gives_same_dataset(self):
+        self.generate('--seed', '7', '--skip-rebuild')
+        first = self.snapshot()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        self.generate('--seed', '7', '--skip-rebuild')
+        self.assertEqual(self.snapshot(), first)
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        self.generate('--seed', '8', '--skip-rebuild')
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_power_law_sampling(self):
+        rng = np.random.default_rng(0)
+        ranks = sample_ranks(rng, power_law_cdf(1000, 1.0), 100_000)
+        counts = np.bincount(ranks, minlength=1000)
+        self.assertGreater(counts[0], 10 * counts[99])
+        self.assertGreater(counts[0], 100_000 // 1000 * 50)
+        left, right = unique_pairs(
+            np.array([2, 1, 2, 1]), np.array([5, 3, 5, 4])
+        )
+        self.assertEqual(left.tolist(), [1, 1, 2])
+        self.assertEqual(right.tolist(), [3, 4, 5])
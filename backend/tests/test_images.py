@@ -0,0 +1,183 @@
+"""Уменьшенные копии изображений рецептов."""
+
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from foodgram_backend.constants import (IMAGE_DERIVATIVE_FORMAT,
+                                        IMAGE_DERIVATIVE_SIZES)
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe, Recipe
+from tags.models import Tag
+from utils.images import (build_derivatives, derivative_name,
+                          process_recipe_image, recipe_image_url)
+from .helpers import create_author, create_recipe, make_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+IMAGE_SIZE = (2000, 1000)
+
+
+def derivatives_exist(name):
+    return [
+        default_storage.exists(derivative_name(name, size))
+        for size in IMAGE_DERIVATIVE_SIZES
+    ]
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageDerivativesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.tag = Tag.objects.create(name='Тэг', slug='tag')
+        cls.ingredient = Ingredient.objects.create(
+            name='ингредиент', measurement_unit='г'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_recipe(self, name='Рецепт', image=None):
+        recipe = create_recipe(
+            self.author, name, image=image or make_image(size=IMAGE_SIZE)
+        )
+        recipe.tags.set([self.tag])
+        IngredientRecipe.objects.create(
+            recipe=recipe, ingredient=self.ingredient, amount=1
+        )
+        return recipe
+
+    def test_build_derivatives(self):
+        recipe = self.create_recipe()
+        build_derivatives(recipe.image.name)
+        for size, max_side in IMAGE_DERIVATIVE_SIZES.items():
+            with self.subTest(size=size):
+                with default_storage.open(
+                    derivative_name(recipe.image.name, size)
+                ) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.format, IMAGE_DERIVATIVE_FORMAT)
+                    self.assertEqual(
+                        image.size, (max_side, max_side // 2)
+                    )
+
+    def test_schedule_recipe_image_after_commit(self):
+        with mock.patch('utils.images.get_executor') as get_executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(
+                    '/api/recipes/',
+                    {
+                        'name': 'Новый рецепт',
+                        'text': 'Описание рецепта',
+                        'cooking_time': 10,
+                        'image': make_image(size=IMAGE_SIZE),
+                        'tags': [self.tag.id],
+                        'ingredients': (
+                            f'[{{"id": {self.ingredient.id}, "amount": 1}}]'
+                        ),
+                    },
+                    format='multipart'
+                )
+            self.assertEqual(response.status_code, 201)
+            get_executor().submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+        recipe = Recipe.objects.get(pk=response.data['id'])
+        get_executor().submit.assert_called_once_with(
+            process_recipe_image, recipe.id, recipe.image.name
+        )
+        self.assertFalse(recipe.has_image_derivatives)
+
+    def test_recipe_image_url_falls_back_to_original(self):
+        recipe = self.create_recipe()
+        request = RequestFactory().get('/')
+        self.assertEqual(
+            recipe_image_url(request, recipe, 'card'),
+            request.build_absolute_uri(recipe.image.url)
+        )
+        recipe.has_image_derivatives = True
+        self.assertEqual(
+            recipe_image_url(request, recipe, 'card'),
+            request.build_absolute_uri(
+                default_storage.url(derivative_name(recipe.image.name, 'card'))
+            )
+        )
+
+    def test_build_image_derivatives_command(self):
+        recipe = self.create_recipe()
+        missing = self.create_recipe('Без файла')
+        default_storage.delete(missing.image.name)
+        output, errors = io.StringIO(), io.StringIO()
+        call_command(
+            'build_image_derivatives', stdout=output, stderr=errors
+        )
+        self.assertIn('Обработано изображений: 1, с ошибками: 1',
+                      output.getvalue())
+        self.assertIn(f'Рецепт {missing.id}', errors.getvalue())
+        recipe.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertTrue(recipe.has_image_derivatives)
+        self.assertFalse(missing.has_image_derivatives)
+        self.assertEqual(derivatives_exist(recipe.image.name), [True] * 3)
+
+        output = io.StringIO()
+        call_command('build_image_derivatives', stdout=output, stderr=errors)
+        self.assertIn('Обработано изображений: 0', output.getvalue())
+
+    def test_derivatives_deleted_when_image_changes(self):
+        recipe = self.create_recipe()
+        old_image = recipe.image.name
+        build_derivatives(old_image)
+        with mock.patch('utils.images.get_executor'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f'/api/recipes/{recipe.id}/',
+                    {
+                        'name': recipe.name,
+                        'text': recipe.text,
+                        'cooking_time': recipe.cooking_time,
+                        'image': make_image('new.png', (1000, 1000)),
+                        'tags': [self.tag.id],
+                        'ingredients': (
+                            f'[{{"id": {self.ingredient.id}, "amount": 2}}]'
+                        ),
+                    },
+                    format='multipart'
+                )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(derivatives_exist(old_image), [False] * 3)
+
+    def test_derivatives_deleted_with_recipe(self):
+        recipe = self.create_recipe()
+        shared = self.create_recipe('Та же картинка', recipe.image.name)
+        build_derivatives(recipe.image.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertEqual(derivatives_exist(shared.image.name), [True] * 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            shared.delete()
+        self.assertEqual(derivatives_exist(shared.image.name), [False] * 3)
+
+    def test_stale_derivatives_deleted_after_processing(self):
+        recipe = self.create_recipe()
+        old_image = recipe.image.name
+        Recipe.objects.filter(pk=recipe.pk).update(image='recipe_images/x.png')
+        with mock.patch('utils.images.connection'):
+            process_recipe_image(recipe.id, old_image)
+        self.assertEqual(derivatives_exist(old_image), [False] * 3)
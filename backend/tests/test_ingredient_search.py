@@ -0,0 +1,60 @@
+"""Индекс названий ингредиентов для автодополнения."""
+
+from unittest import mock
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ingredients.models import Ingredient
+from ingredients.search import ingredient_index
+
+
+class IngredientIndexTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('абрикосы', 'айва', 'груши')
+        ]
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.reset()
+        self.addCleanup(ingredient_index.reset)
+
+    def test_change_is_picked_up_in_background(self):
+        self.assertEqual(ingredient_index.search('а', 10), [
+            ingredient.id for ingredient in self.ingredients[:2]
+        ])
+        snapshot = ingredient_index._snapshot
+        with mock.patch('ingredients.search.threading.Thread') as thread:
+            added = Ingredient.objects.create(
+                name='ананас', measurement_unit='г'
+            )
+            self.assertEqual(len(ingredient_index.search('а', 10)), 2)
+            self.assertIs(ingredient_index._get_snapshot(), snapshot)
+        thread.assert_called_once()
+        self.assertEqual(
+            thread.call_args.kwargs['target'], ingredient_index._refresh
+        )
+        with mock.patch('ingredients.search.connection'):
+            ingredient_index._refresh(*thread.call_args.kwargs['args'])
+        self.assertIn(added.id, ingredient_index.search('ана', 10))
+
+    def test_snapshot_expires_after_ttl(self):
+        ingredient_index.search('а', 10)
+        with mock.patch.object(ingredient_index, 'ttl', -1), mock.patch(
+            'ingredients.search.threading.Thread'
+        ) as thread:
+            ingredient_index.search('а', 10)
+        thread.return_value.start.assert_called_once_with()
+
+    def test_substring_search_ignores_case(self):
+        response = self.client.get(
+            f'/api/ingredients/?name={quote("РУШ")}'
+        )
+        self.assertEqual(
+            [ingredient['name'] for ingredient in response.data], ['груши']
+        )
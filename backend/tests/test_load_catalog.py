@@ -0,0 +1,115 @@
+"""Загрузка справочников командой load_catalog."""
+
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ingredients.management.commands.load_catalog import iter_json_array
+from ingredients.models import Ingredient
+from ingredients.search import VERSION_KEY as INGREDIENT_INDEX_VERSION
+from tags.models import Tag
+from tags.registry import VERSION_KEY as TAG_REGISTRY_VERSION
+from utils.cache import get_version
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+class LoadCatalogTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def load(self, *paths, options=()):
+        output = io.StringIO()
+        call_command(
+            'load_catalog', *map(str, paths), *options, stdout=output
+        )
+        return output.getvalue()
+
+    def load_fruits(self, *options):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as file:
+            json.dump(
+                [
+                    {'name': 'абрикосы', 'measurement_unit': 'г'},
+                    {'name': 'груши', 'measurement_unit': 'г'},
+                    {'slug': 'fruits', 'name': 'Фрукты'},
+                ],
+                file,
+                ensure_ascii=False
+            )
+            file.flush()
+            return self.load(file.name, options=options)
+
+    def test_load_is_idempotent(self):
+        paths = (
+            DATA_DIR / 'ingredients.csv',
+            DATA_DIR / 'ingredients_raw.json',
+            DATA_DIR / 'tags.json',
+        )
+        self.load(*paths)
+        ingredients = set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+        tags = set(Tag.objects.values_list('slug', 'name'))
+        self.load(*paths)
+        self.assertEqual(
+            set(Ingredient.objects.values_list('name', 'measurement_unit')),
+            ingredients
+        )
+        self.assertEqual(set(Tag.objects.values_list('slug', 'name')), tags)
+        self.assertEqual(len(tags), 4)
+
+    def test_load_updates_existing_rows(self):
+        Ingredient.objects.create(name='абрикосы', measurement_unit='шт')
+        output = self.load_fruits('--no-copy')
+        self.assertIn('прочитано 2, создано 1, обновлено 1', output)
+        self.assertEqual(
+            dict(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {'абрикосы': 'г', 'груши': 'г'}
+        )
+        output = self.load_fruits('--no-copy')
+        self.assertIn('прочитано 2, создано 0, обновлено 0', output)
+
+    def test_load_invalidates_shared_versions(self):
+        versions = [
+            get_version(key)
+            for key in (INGREDIENT_INDEX_VERSION, TAG_REGISTRY_VERSION)
+        ]
+        self.load_fruits()
+        for key, version in zip(
+            (INGREDIENT_INDEX_VERSION, TAG_REGISTRY_VERSION), versions
+        ):
+            self.assertNotEqual(get_version(key), version)
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY есть в PostgreSQL')
+    def test_copy_writer(self):
+        Ingredient.objects.create(name='абрикосы', measurement_unit='шт')
+        output = self.load_fruits()
+        self.assertIn('прочитано 2, создано 1, обновлено 1', output)
+        self.assertIn('прочитано 1, создано 1, обновлено 0', output)
+        self.assertEqual(
+            set(Ingredient.objects.values_list(
+                'name', 'measurement_unit', 'recipes_count'
+            )),
+            {('абрикосы', 'г', 0), ('груши', 'г', 0)}
+        )
+        self.assertEqual(
+            dict(Tag.objects.values_list('slug', 'name')),
+            {'fruits': 'Фрукты'}
+        )
+        output = self.load_fruits()
+        self.assertIn('прочитано 2, создано 0, обновлено 0', output)
+
+    def test_json_array_is_read_in_chunks(self):
+        data = '[ {"a": "x,]"}, {"b": [1, 2]} ,{"c": {}}]'
+        self.assertEqual(
+            list(iter_json_array(io.StringIO(data), 3)),
+            [{'a': 'x,]'}, {'b': [1, 2]}, {'c': {}}]
+        )
@@ -0,0 +1,136 @@
+"""Нагрузочный тест по Postman-коллекции командой load_test."""
+
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from benchmarks.collection import (DEFAULT_WEIGHTS, load_collection,
+                                   unique_variables, weighted_steps)
+from benchmarks.management.commands.load_test import DEFAULT_COLLECTION
+from benchmarks.runner import percentile
+from ingredients.models import Ingredient
+from tags.models import Tag
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class CollectionTest(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.variables, cls.setup, cls.steps = load_collection(
+            DEFAULT_COLLECTION
+        )
+
+    def test_bad_requests_are_skipped(self):
+        self.assertEqual(
+            [step.name for step in self.setup][:3],
+            ['create_first_user', 'create_second_user', 'create_third_user']
+        )
+        for step in self.setup + self.steps:
+            self.assertIsNotNone(step.expected_status, step.name)
+            self.assertLess(step.expected_status, 400, step.name)
+
+    def test_variables_are_captured_from_responses(self):
+        captures = {
+            capture.variable: capture
+            for step in self.setup + self.steps
+            for capture in step.captures
+        }
+        self.assertEqual(captures['firstRecipeId'].path, ('id',))
+        self.assertEqual(captures['secondTagSlug'].path, (1, 'slug'))
+        ingredient = captures['ingredientNameFirstLatter']
+        self.assertEqual(
+            ingredient.extract([{'name': 'абрикосы'}]), 'а'
+        )
+
+    def test_folder_auth_is_inherited(self):
+        create = next(
+            step for step in self.steps
+            if step.name.startswith('create_first_recipe')
+        )
+        self.assertEqual(create.token, 'secondUserToken')
+        self.assertEqual(create.route, 'POST /api/recipes/ [token]')
+
+    def test_weights_repeat_only_reads(self):
+        steps = weighted_steps(self.steps, DEFAULT_WEIGHTS)
+        names = [step.name for step in steps]
+        self.assertEqual(
+            names.count('get_recipes_list // No Auth'),
+            DEFAULT_WEIGHTS['get_recipes']
+        )
+        self.assertEqual(names.count('update_recipe // Second User'), 1)
+
+    def test_unique_variables(self):
+        variables = unique_variables(self.variables, 'loadtest-1-')
+        self.assertEqual(variables['username'], '"loadtest-1-vasya.ivanov"')
+        self.assertEqual(
+            variables['secondUserEmail'], '"loadtest-1-second_user@email.org"'
+        )
+        self.assertEqual(
+            variables['tooLongEmail'], self.variables['tooLongEmail']
+        )
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+)
+class LoadTestCommandTest(LiveServerTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        for number in range(3):
+            Tag.objects.create(name=f'Тэг {number}', slug=f'tag-{number}')
+        for name in ('абрикосы', 'бананы'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def load_test(self, *args):
+        output = io.StringIO()
+        call_command(
+            'load_test', '--url', self.live_server_url, '--users', '1',
+            '--iterations', '1', *args, stdout=output, stderr=output
+        )
+        return output.getvalue()
+
+    def test_scenario_runs_without_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'baseline.json'
+            output = self.load_test('--save', str(path))
+            results = json.loads(path.read_text())
+            self.assertEqual(results['total']['errors'], 0, output)
+            self.assertEqual(
+                results['total']['requests'],
+                results['meta']['steps_per_iteration']
+            )
+            routes = results['routes']
+            self.assertEqual(routes['POST /api/recipes/ [token]']['requests'], 5)
+            for name in ('p50', 'p95', 'p99'):
+                self.assertIsNotNone(results['total'][name])
+
+            output = self.load_test('--baseline', str(path))
+            self.assertIn('Δp95', output)
+        self.assertFalse(
+            get_user_model().objects.filter(
+                username__startswith='loadtest-'
+            ).exists()
+        )
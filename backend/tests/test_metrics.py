@@ -0,0 +1,201 @@
+"""Метрики запросов: Server-Timing, /metrics/ и отчеты о N+1."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from foodgram_backend.metrics import registry
+from foodgram_backend.nplusone import fingerprint_sql
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe
+from recipe_feed.views import RecipeFeedViewSet
+from tags.models import Tag
+from .helpers import create_recipe, create_user
+
+
+class MetricsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
+            'user', first_name='Пользователь', last_name='Обычный'
+        )
+        cls.staff = create_user(
+            'staff', first_name='Сотрудник', last_name='Сайта', is_staff=True
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        for name, value in (('directory', self.directory), ('_values', {})):
+            patcher = mock.patch.object(registry, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get(self, url, user=None, **extra):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get(url, **extra)
+
+    def metrics(self, **extra):
+        response = self.client.get('/metrics/', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_server_timing_only_for_staff(self):
+        response = self.get('/api/users/me/', self.staff)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, '
+            r'render;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+        self.assertNotIn('Server-Timing', self.get('/api/users/me/', self.user))
+        self.assertNotIn('Server-Timing', self.get('/api/users/'))
+
+    def test_metrics_sum_all_workers(self):
+        self.get('/api/users/me/', self.user)
+        response = self.get('/api/users/me/', self.user)
+        size = len(response.content)
+        worker = registry._values.copy()
+        (self.directory / '1.json').write_text(json.dumps(worker))
+        labels = 'route="users-me",method="GET",status="200"'
+
+        metrics = self.metrics()
+        self.assertIn(f'foodgram_http_requests_total{{{labels}}} 4', metrics)
+        self.assertIn(
+            f'foodgram_response_bytes_total{{{labels}}} {size * 4}', metrics
+        )
+        self.assertIn(
+            'foodgram_http_request_duration_seconds_bucket'
+            f'{{{labels},le="+Inf"}} 4',
+            metrics
+        )
+        self.assertIn(
+            f'foodgram_http_request_duration_seconds_count{{{labels}}} 4',
+            metrics
+        )
+        self.assertRegex(
+            metrics, rf'foodgram_sql_queries_total{{{labels}}} [1-9]'
+        )
+
+    def test_finished_workers_archived(self):
+        self.get('/api/users/me/', self.user)
+        worker = json.dumps(registry._values)
+        for name in ('999999999-5.json', f'{os.getpid()}-1.json'):
+            (self.directory / name).write_text(worker)
+        labels = 'route="users-me",method="GET",status="200"'
+
+        for _ in range(2):
+            self.assertIn(
+                f'foodgram_http_requests_total{{{labels}}} 3', self.metrics()
+            )
+        self.assertEqual(
+            sorted(path.name for path in self.directory.glob('*.json')),
+            sorted(('archive.json', registry._name))
+        )
+
+    def test_streamed_response_size(self):
+        recipe = create_recipe(self.staff)
+        IngredientRecipe.objects.create(
+            recipe=recipe,
+            ingredient=Ingredient.objects.create(
+                name='ингредиент', measurement_unit='г'
+            ),
+            amount=1
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        registry._values.clear()
+        response = self.get(
+            '/api/recipes/download_shopping_cart/', self.user
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(registry._values, {})
+        size = len(b''.join(response.streaming_content))
+        self.assertGreater(size, 0)
+        values = registry._values['recipes-download-shopping-cart GET 200']
+        self.assertEqual((values[0], values[6]), (1, size))
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.metrics(HTTP_AUTHORIZATION='Bearer secret')
+
+
+@override_settings(NPLUSONE_SAMPLE_RATE=1, NPLUSONE_THRESHOLD=2)
+class NPlusOneTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user(
+            'staff', first_name='Сотрудник', last_name='Сайта', is_staff=True
+        )
+        tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        for number in range(4):
+            recipe = create_recipe(cls.staff, f'Рецепт {number}')
+            recipe.tags.set([tag])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def reports(self):
+        response = self.client.get('/api/query-reports/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_fingerprint_ignores_values(self):
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            fingerprint_sql("SELECT *  FROM t WHERE id IN (%s) LIMIT 'x'")
+        )
+
+    def test_repeated_queries_reported_with_field_and_stack(self):
+        self.client.get('/api/recipes/')
+        self.assertEqual(self.reports(), [])
+        with mock.patch.object(
+            RecipeFeedViewSet, 'read_actions', ()
+        ), self.assertLogs('foodgram_backend.nplusone', 'WARNING') as logs:
+            self.client.get('/api/recipes/')
+            self.client.get('/api/recipes/')
+        self.assertIn('"field": "RecipeReadSerializer.tags"', logs.output[0])
+        reports = self.reports()
+        fields = {report['field'] for report in reports}
+        self.assertIn('RecipeReadSerializer.tags', fields)
+        report = next(
+            report for report in reports
+            if report['field'] == 'RecipeReadSerializer.tags'
+        )
+        self.assertEqual(report['count'], 4)
+        self.assertEqual(report['occurrences'], 2)
+        self.assertEqual(report['method'], 'GET')
+        self.assertTrue(report['stack'][0].startswith('recipes/'))
+
+        self.client.delete('/api/query-reports/')
+        self.assertEqual(self.reports(), [])
+
+    @override_settings(NPLUSONE_SAMPLE_RATE=0)
+    def test_unsampled_requests_not_tracked(self):
+        with mock.patch(
+            'foodgram_backend.middleware.QueryRepeatDetector'
+        ) as detector, mock.patch.object(RecipeFeedViewSet, 'read_actions', ()):
+            self.client.get('/api/recipes/')
+        detector.assert_not_called()
+        self.assertEqual(self.reports(), [])
+
+    def test_reports_only_for_staff(self):
+        self.client.force_authenticate(create_user(
+            'user', first_name='Пользователь', last_name='Обычный'
+        ))
+        response = self.client.get('/api/query-reports/')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,575 @@
+"""Бюджеты SQL-запросов для маршрутов API.
+
+Каждый маршрут вызывается на двух объемах данных с одним и тем же бюджетом:
+если число запросов растет вместе с размером страницы или объемом данных,
+тест на большом наборе выйдет за бюджет.
+"""
+
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from foodgram_backend.constants import (INGREDIENT_SEARCH_LIMIT,
+                                        RECIPE_INGREDIENT_INDEX_MAX_IDS)
+from recipes.ingredient_index import recipe_ingredient_index
+from recipes.models import IngredientRecipe, Recipe
+from users.authentication import token_cache
+from .helpers import (MEDIA_ROOT, SHARED_CACHES, USER_PASSWORD,
+                      SampleDataMixin, create_recipe, make_base64_image,
+                      make_image)
+
+QUERY_BUDGETS = {
+    'auth-token-login': 3,
+    'auth-token-logout': 3,
+    'recipes-list': 8,
+    'recipes-list-anonymous': 4,
+    'recipes-list-filtered': 11,
+    'recipes-list-cursor': 7,
+    'recipes-list-ordered': 8,
+    'recipes-list-ordered-cursor': 7,
+    'recipes-search': 8,
+    'recipes-list-ingredients': 9,
+    'recipes-detail': 8,
+    'recipes-get-link': 5,
+    'recipes-feed': 9,
+    'recipes-similar': 3,
+    'recipes-create': 17,
+    'recipes-create-multipart': 17,
+    'recipes-partial-update': 22,
+    'recipes-partial-update-unchanged': 16,
+    'recipes-delete': 13,
+    'recipes-favorite': 7,
+    'recipes-delete-favorite': 7,
+    'recipes-shopping-cart': 9,
+    'recipes-delete-shopping-cart': 8,
+    'recipes-download-shopping-cart': 2,
+    'recipes-download-shopping-cart-cached': 1,
+    'users-list': 4,
+    'users-detail': 3,
+    'users-me': 2,
+    'users-me-cached': 1,
+    'users-me-shared-cache': 1,
+    'users-create': 5,
+    'users-set-password': 3,
+    'users-avatar': 3,
+    'users-avatar-multipart': 3,
+    'users-subscriptions': 4,
+    'users-subscribe': 8,
+    'users-delete-subscribe': 8,
+    'ingredients-list': 1,
+    'ingredients-list-cached': 0,
+    'ingredients-search': 1,
+    'ingredients-detail': 1,
+    'tags-list': 1,
+    'tags-list-cached': 0,
+    'tags-detail': 1,
+}
+
+
+class QueryBudgetTestMixin(SampleDataMixin):
+    """Проверяет бюджеты запросов на данных объема SCALE."""
+
+    def assertWithinBudget(
+        self, route, method, url, data=None, client=None, status_code=200,
+        format='json', **extra
+    ):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(
+                url, data, format=format, **extra
+            )
+            if response.streaming:
+                response.content_bytes = b''.join(response.streaming_content)
+        self.assertEqual(
+            response.status_code,
+            status_code,
+            f'{route}: {getattr(response, "data", response)}'
+        )
+        queries = len(context.captured_queries)
+        self.assertLessEqual(
+            queries,
+            QUERY_BUDGETS[route],
+            f'{route} при SCALE={self.SCALE} выполнил {queries} запросов '
+            f'при бюджете {QUERY_BUDGETS[route]}:\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+        return response
+
+    def test_auth_token_login(self):
+        self.assertWithinBudget(
+            'auth-token-login',
+            'post',
+            '/api/auth/token/login/',
+            {'email': 'user@foodgram.ru', 'password': USER_PASSWORD},
+            client=self.anonymous_client,
+        )
+
+    def test_auth_token_logout(self):
+        self.assertWithinBudget(
+            'auth-token-logout',
+            'post',
+            '/api/auth/token/logout/',
+            status_code=204,
+        )
+
+    def test_recipes_list(self):
+        response = self.assertWithinBudget(
+            'recipes-list', 'get', '/api/recipes/'
+        )
+        self.assertTrue(response.data['results'])
+
+    def test_recipes_list_ordered(self):
+        for ordering, key in (
+            ('trending', lambda recipe: (-recipe.trending_score, recipe.id)),
+            ('popular', lambda recipe: (-recipe.favorites_count, recipe.id)),
+            ('cooking_time', lambda recipe: (recipe.cooking_time, recipe.id)),
+        ):
+            with self.subTest(ordering=ordering):
+                expected = [
+                    recipe.id
+                    for recipe in sorted(Recipe.objects.all(), key=key)
+                ]
+                response = self.assertWithinBudget(
+                    'recipes-list-ordered',
+                    'get',
+                    f'/api/recipes/?ordering={ordering}'
+                )
+                self.assertEqual(
+                    [recipe['id'] for recipe in response.data['results']],
+                    expected[:len(response.data['results'])]
+                )
+                recipe_ids = []
+                url = f'/api/recipes/?ordering={ordering}&pagination=cursor'
+                while url:
+                    response = self.assertWithinBudget(
+                        'recipes-list-ordered-cursor', 'get', url
+                    )
+                    recipe_ids += [
+                        recipe['id'] for recipe in response.data['results']
+                    ]
+                    url = response.data['next']
+                self.assertEqual(recipe_ids, expected)
+
+    def test_recipes_list_anonymous(self):
+        self.assertWithinBudget(
+            'recipes-list-anonymous',
+            'get',
+            '/api/recipes/',
+            client=self.anonymous_client,
+        )
+
+    def test_recipes_list_filtered(self):
+        tags = '&'.join(f'tags={tag.slug}' for tag in self.tags)
+        self.assertWithinBudget(
+            'recipes-list-filtered',
+            'get',
+            f'/api/recipes/?{tags}&is_favorited=1&is_in_shopping_cart=1'
+            f'&author={self.authors[0].id}',
+        )
+
+    def test_recipes_search(self):
+        in_text = create_recipe(
+            self.stranger,
+            'Щи',
+            text='Почти как борщ, только с капустой',
+            cooking_time=3,
+            image=make_image(),
+        )
+        in_name = create_recipe(
+            self.stranger,
+            'Борщ украинский',
+            cooking_time=3,
+            image=make_image(),
+        )
+        response = self.assertWithinBudget(
+            'recipes-search', 'get', '/api/recipes/?search=БОРЩ&limit=50'
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [in_name.id, in_text.id]
+        )
+
+    def test_recipes_list_ingredients(self):
+        first, second, common = (
+            self.ingredients[-1], self.ingredients[-2], self.ingredients[0]
+        )
+        for number, ingredients in enumerate(
+            ((first, second), (first,), (second, common))
+        ):
+            recipe = create_recipe(
+                self.stranger,
+                f'Рецепт с ингредиентами {number}',
+                cooking_time=3,
+                image=make_image(),
+            )
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in ingredients
+            )
+        cases = (
+            ([first.id, second.id], True, []),
+            ([first.id, second.id], False, []),
+            ([second.id], True, [common.id]),
+            ([common.id, self.ingredients[1].id], True, [first.id]),
+            ([common.id, second.id], False, [self.ingredients[2].id]),
+            ([], True, [first.id]),
+        )
+        for max_ids in (RECIPE_INGREDIENT_INDEX_MAX_IDS, 0):
+            for include, match_all, exclude in cases:
+                with self.subTest(
+                    max_ids=max_ids, include=include, match_all=match_all,
+                    exclude=exclude
+                ), mock.patch.object(
+                    recipe_ingredient_index, 'max_ids', max_ids
+                ):
+                    params = []
+                    if include:
+                        params.append(
+                            'ingredients=' + ','.join(map(str, include))
+                        )
+                    if not match_all:
+                        params.append('ingredients_match=any')
+                    if exclude:
+                        params.append(
+                            'exclude_ingredients='
+                            + ','.join(map(str, exclude))
+                        )
+                    self.assertWithinBudget(
+                        'recipes-list-ingredients',
+                        'get',
+                        '/api/recipes/?' + '&'.join(params),
+                    )
+
+    def test_recipes_list_cursor(self):
+        response = self.client.get('/api/recipes/?pagination=cursor&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        response = self.assertWithinBudget(
+            'recipes-list-cursor', 'get', response.data['next']
+        )
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_recipes_detail(self):
+        self.assertWithinBudget(
+            'recipes-detail', 'get', f'/api/recipes/{self.recipes[0].id}/'
+        )
+
+    def read_feed(self):
+        recipe_ids = []
+        url = '/api/recipes/feed/?limit=10'
+        while url:
+            response = self.assertWithinBudget('recipes-feed', 'get', url)
+            recipe_ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        return recipe_ids
+
+    def test_recipes_feed(self):
+        self.assertTrue(self.read_feed())
+
+    def test_recipes_similar(self):
+        recipe = self.recipes[0]
+        response = self.assertWithinBudget(
+            'recipes-similar', 'get', f'/api/recipes/{recipe.id}/similar/'
+        )
+        similar_ids = [item['id'] for item in response.data]
+        self.assertTrue(similar_ids)
+        self.assertNotIn(recipe.id, similar_ids)
+        self.assertEqual(
+            set(response.data[0]), {'id', 'name', 'image', 'cooking_time'}
+        )
+        self.assertWithinBudget(
+            'recipes-similar',
+            'get',
+            '/api/recipes/0/similar/',
+            client=self.anonymous_client,
+            status_code=404
+        )
+
+    def test_recipes_get_link(self):
+        self.assertWithinBudget(
+            'recipes-get-link',
+            'get',
+            f'/api/recipes/{self.recipes[0].id}/get-link/',
+        )
+
+    def test_recipes_create(self):
+        self.assertWithinBudget(
+            'recipes-create',
+            'post',
+            '/api/recipes/',
+            self.recipe_payload('Созданный рецепт'),
+            status_code=201,
+        )
+
+    def test_recipes_create_multipart(self):
+        payload = self.recipe_payload('Рецепт из формы')
+        payload['image'] = make_image()
+        payload['ingredients'] = json.dumps(payload['ingredients'])
+        self.assertWithinBudget(
+            'recipes-create-multipart',
+            'post',
+            '/api/recipes/',
+            payload,
+            status_code=201,
+            format='multipart',
+        )
+
+    def test_recipes_partial_update(self):
+        self.assertWithinBudget(
+            'recipes-partial-update',
+            'patch',
+            f'/api/recipes/{self.own_recipe.id}/',
+            self.recipe_payload('Измененный рецепт'),
+        )
+
+    def test_recipes_partial_update_unchanged(self):
+        recipe_url = f'/api/recipes/{self.own_recipe.id}/'
+        payload = self.client.get(recipe_url).data
+        payload['cooking_time'] += 1
+        payload['tags'] = [tag['id'] for tag in payload['tags']]
+        response = self.assertWithinBudget(
+            'recipes-partial-update-unchanged',
+            'patch',
+            recipe_url,
+            payload,
+        )
+        self.assertEqual(response.data['image'], payload['image'])
+
+    def test_recipes_delete(self):
+        self.assertWithinBudget(
+            'recipes-delete',
+            'delete',
+            f'/api/recipes/{self.own_recipe.id}/',
+            status_code=204,
+        )
+
+    def test_recipes_favorite(self):
+        self.assertWithinBudget(
+            'recipes-favorite',
+            'post',
+            f'/api/recipes/{self.lonely_recipe.id}/favorite/',
+            status_code=201,
+        )
+
+    def test_recipes_delete_favorite(self):
+        self.assertWithinBudget(
+            'recipes-delete-favorite',
+            'delete',
+            f'/api/recipes/{self.recipes[0].id}/favorite/',
+            status_code=204,
+        )
+
+    def test_recipes_shopping_cart(self):
+        self.assertWithinBudget(
+            'recipes-shopping-cart',
+            'post',
+            f'/api/recipes/{self.lonely_recipe.id}/shopping_cart/',
+            status_code=201,
+        )
+
+    def test_recipes_delete_shopping_cart(self):
+        self.assertWithinBudget(
+            'recipes-delete-shopping-cart',
+            'delete',
+            f'/api/recipes/{self.recipes[0].id}/shopping_cart/',
+            status_code=204,
+        )
+
+    def test_recipes_download_shopping_cart(self):
+        self.assertWithinBudget(
+            'recipes-download-shopping-cart',
+            'get',
+            '/api/recipes/download_shopping_cart/',
+        )
+
+    def test_recipes_download_shopping_cart_formats(self):
+        for export_format in ('txt', 'pdf'):
+            with self.subTest(export_format=export_format):
+                self.assertWithinBudget(
+                    'recipes-download-shopping-cart',
+                    'get',
+                    f'/api/recipes/download_shopping_cart/'
+                    f'?type={export_format}',
+                )
+
+    def test_recipes_download_shopping_cart_cached(self):
+        url = '/api/recipes/download_shopping_cart/'
+        b''.join(self.client.get(url).streaming_content)
+        self.assertWithinBudget(
+            'recipes-download-shopping-cart-cached', 'get', url
+        )
+
+    def test_users_list(self):
+        self.assertWithinBudget('users-list', 'get', '/api/users/?limit=50')
+
+    def test_users_detail(self):
+        self.assertWithinBudget(
+            'users-detail', 'get', f'/api/users/{self.authors[0].id}/'
+        )
+
+    def test_users_me(self):
+        self.assertWithinBudget('users-me', 'get', '/api/users/me/')
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_users_me_cached(self):
+        self.client.get('/api/users/me/')
+        token_cache.clear()
+        self.assertWithinBudget(
+            'users-me-shared-cache', 'get', '/api/users/me/'
+        )
+        self.assertWithinBudget('users-me-cached', 'get', '/api/users/me/')
+
+    def test_users_create(self):
+        self.assertWithinBudget(
+            'users-create',
+            'post',
+            '/api/users/',
+            {
+                'email': 'new@foodgram.ru',
+                'username': 'newcomer',
+                'first_name': 'Новый',
+                'last_name': 'Пользователь',
+                'password': 'Pa55word-newcomer',
+            },
+            client=self.anonymous_client,
+            status_code=201,
+        )
+
+    def test_users_set_password(self):
+        self.assertWithinBudget(
+            'users-set-password',
+            'post',
+            '/api/users/set_password/',
+            {
+                'current_password': USER_PASSWORD,
+                'new_password': 'Pa55word-changed',
+            },
+            status_code=204,
+        )
+
+    def test_users_avatar(self):
+        self.assertWithinBudget(
+            'users-avatar',
+            'put',
+            '/api/users/me/avatar/',
+            {'avatar': make_base64_image()},
+        )
+
+    def test_users_avatar_multipart(self):
+        self.assertWithinBudget(
+            'users-avatar-multipart',
+            'put',
+            '/api/users/me/avatar/',
+            {'avatar': make_image()},
+            format='multipart',
+        )
+
+    def test_users_subscriptions(self):
+        response = self.assertWithinBudget(
+            'users-subscriptions',
+            'get',
+            '/api/users/subscriptions/?limit=50&recipes_limit=3',
+        )
+        self.assertTrue(response.data['results'])
+        for author in response.data['results']:
+            self.assertEqual(
+                len(author['recipes']), min(3, author['recipes_count'])
+            )
+
+    def test_users_subscribe(self):
+        self.assertWithinBudget(
+            'users-subscribe',
+            'post',
+            f'/api/users/{self.stranger.id}/subscribe/',
+            status_code=201,
+        )
+
+    def test_users_delete_subscribe(self):
+        self.assertWithinBudget(
+            'users-delete-subscribe',
+            'delete',
+            f'/api/users/{self.authors[0].id}/subscribe/',
+            status_code=204,
+        )
+
+    def test_ingredients_list(self):
+        self.assertWithinBudget(
+            'ingredients-list',
+            'get',
+            '/api/ingredients/',
+            client=self.anonymous_client,
+        )
+
+    def test_ingredients_search(self):
+        self.anonymous_client.get('/api/ingredients/?name=ингр')
+        response = self.assertWithinBudget(
+            'ingredients-search',
+            'get',
+            '/api/ingredients/?name=ингр',
+            client=self.anonymous_client,
+        )
+        used = self.ingredients[:3 * self.SCALE]
+        self.assertLessEqual(len(response.data), INGREDIENT_SEARCH_LIMIT)
+        self.assertEqual(
+            {ingredient['id'] for ingredient in response.data[:len(used)]},
+            {ingredient.id for ingredient in used}
+        )
+
+    def test_ingredients_detail(self):
+        self.assertWithinBudget(
+            'ingredients-detail',
+            'get',
+            f'/api/ingredients/{self.ingredients[0].id}/',
+            client=self.anonymous_client,
+        )
+
+    def test_tags_list(self):
+        self.assertWithinBudget(
+            'tags-list', 'get', '/api/tags/', client=self.anonymous_client
+        )
+
+    def test_catalogs_cached(self):
+        for route, url in (
+            ('ingredients-list-cached', '/api/ingredients/'),
+            ('tags-list-cached', '/api/tags/'),
+        ):
+            with self.subTest(url=url):
+                first = self.anonymous_client.get(url)
+                self.assertWithinBudget(
+                    route, 'get', url,
+                    client=self.anonymous_client,
+                    HTTP_ACCEPT_ENCODING='gzip',
+                )
+                self.assertWithinBudget(
+                    route, 'get', url,
+                    client=self.anonymous_client,
+                    status_code=304,
+                    HTTP_IF_NONE_MATCH=first['ETag'],
+                )
+
+    def test_tags_detail(self):
+        self.assertWithinBudget(
+            'tags-detail',
+            'get',
+            f'/api/tags/{self.tags[0].id}/',
+            client=self.anonymous_client,
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SmallDatasetQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """Данных меньше, чем помещается на одну страницу."""
+
+    SCALE = 1
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class LargeDatasetQueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    """Данных на несколько страниц, в рецептах больше ингредиентов."""
+
+    SCALE = 4
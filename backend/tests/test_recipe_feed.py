@@ -0,0 +1,106 @@
+"""Ленты рецептов авторов из подписок."""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from recipe_feed.models import FeedEntry
+from recipe_feed.utils import backfill_demoted_author
+from recipes.models import Recipe
+from user_subscriptions.models import Subscription
+from .helpers import (MEDIA_ROOT, SampleDataMixin, create_author,
+                      create_recipe, create_user, make_image)
+
+User = get_user_model()
+
+
+class RecipeFeedTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.first = create_user('first')
+        cls.second = create_user('second')
+        cls.recipe = create_recipe(cls.author)
+
+    def setUp(self):
+        for target in ('recipe_feed.signals', 'recipe_feed.utils'):
+            patcher = mock.patch(f'{target}.FEED_FANOUT_MAX_FOLLOWERS', 1)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_demoted_author_backfilled_after_commit(self):
+        for user in (self.first, self.second):
+            Subscription.objects.create(
+                subscriber=user, subscribe_target=self.author
+            )
+        FeedEntry.objects.all().delete()
+        with mock.patch('recipe_feed.utils.get_executor') as get_executor:
+            with self.captureOnCommitCallbacks() as callbacks:
+                Subscription.objects.filter(subscriber=self.first).delete()
+            get_executor().submit.assert_not_called()
+            for callback in callbacks:
+                callback()
+        get_executor().submit.assert_called_once_with(
+            backfill_demoted_author, self.author.id
+        )
+        self.assertFalse(FeedEntry.objects.exists())
+
+        with mock.patch('recipe_feed.utils.connection'):
+            backfill_demoted_author(self.author.id)
+        self.assertEqual(
+            list(FeedEntry.objects.values_list('user_id', 'recipe_id')),
+            [(self.second.id, self.recipe.id)]
+        )
+
+    def test_backfill_skipped_if_author_popular_again(self):
+        for user in (self.first, self.second):
+            Subscription.objects.create(
+                subscriber=user, subscribe_target=self.author
+            )
+        FeedEntry.objects.all().delete()
+        with mock.patch('recipe_feed.utils.connection'):
+            backfill_demoted_author(self.author.id)
+        self.assertFalse(FeedEntry.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeFeedApiTest(SampleDataMixin, TestCase):
+
+    def read_feed(self):
+        recipe_ids = []
+        url = '/api/recipes/feed/?limit=10'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            recipe_ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        return recipe_ids
+
+    def test_lists_followed_authors(self):
+        followed = Recipe.objects.filter(
+            author__in=self.authors
+        ).order_by('-created_at', '-id')
+        self.assertEqual(
+            self.read_feed(), list(followed.values_list('id', flat=True))
+        )
+
+    def test_merges_popular_authors(self):
+        expected = self.read_feed()
+        with mock.patch('recipe_feed.utils.FEED_FANOUT_MAX_FOLLOWERS', 0):
+            self.assertEqual(self.read_feed(), expected)
+            recipe = create_recipe(
+                User.objects.get(pk=self.authors[0].pk),
+                'Новый рецепт популярного автора',
+                cooking_time=3,
+                image=make_image(),
+            )
+            self.assertFalse(FeedEntry.objects.filter(recipe=recipe).exists())
+            self.assertEqual(self.read_feed(), [recipe.id, *expected])
+
+    def test_follows_subscriptions(self):
+        self.client.post(f'/api/users/{self.stranger.id}/subscribe/')
+        self.assertIn(self.lonely_recipe.id, self.read_feed())
+        self.client.delete(f'/api/users/{self.stranger.id}/subscribe/')
+        self.assertNotIn(self.lonely_recipe.id, self.read_feed())
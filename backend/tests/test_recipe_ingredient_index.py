@@ -0,0 +1,127 @@
+"""Фильтр рецептов по ингредиентам через индекс в памяти."""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from foodgram_backend.constants import RECIPE_INGREDIENT_INDEX_MAX_IDS
+from recipes.ingredient_index import (ingredients_condition,
+                                      recipe_ingredient_index)
+from recipes.models import IngredientRecipe, Recipe
+from .helpers import MEDIA_ROOT, SampleDataMixin, create_recipe, make_image
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeIngredientIndexTest(SampleDataMixin, TestCase):
+
+    def recipe_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['count'], {
+            recipe['id'] for recipe in response.data['results']
+        }
+
+    def test_matches_database_condition(self):
+        first, second, common = (
+            self.ingredients[-1], self.ingredients[-2], self.ingredients[0]
+        )
+        for number, ingredients in enumerate(
+            ((first, second), (first,), (second, common))
+        ):
+            recipe = create_recipe(
+                self.stranger,
+                f'Рецепт с ингредиентами {number}',
+                cooking_time=3,
+                image=make_image(),
+            )
+            IngredientRecipe.objects.bulk_create(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in ingredients
+            )
+        cases = (
+            ([first.id, second.id], True, []),
+            ([first.id, second.id], False, []),
+            ([second.id], True, [common.id]),
+            ([common.id, self.ingredients[1].id], True, [first.id]),
+            ([common.id, second.id], False, [self.ingredients[2].id]),
+            ([], True, [first.id]),
+        )
+        for max_ids in (RECIPE_INGREDIENT_INDEX_MAX_IDS, 0):
+            for include, match_all, exclude in cases:
+                with self.subTest(
+                    max_ids=max_ids, include=include, match_all=match_all,
+                    exclude=exclude
+                ), mock.patch.object(
+                    recipe_ingredient_index, 'max_ids', max_ids
+                ):
+                    params = []
+                    if include:
+                        params.append(
+                            'ingredients=' + ','.join(map(str, include))
+                        )
+                    if not match_all:
+                        params.append('ingredients_match=any')
+                    if exclude:
+                        params.append(
+                            'exclude_ingredients='
+                            + ','.join(map(str, exclude))
+                        )
+                    count, recipe_ids = self.recipe_ids(
+                        '/api/recipes/?' + '&'.join(params)
+                    )
+                    expected = set(Recipe.objects.filter(ingredients_condition(
+                        include, match_all, exclude
+                    )).values_list('id', flat=True))
+                    self.assertEqual(count, len(expected))
+                    self.assertLessEqual(recipe_ids, expected)
+
+    def test_new_recipe(self):
+        ingredient = self.ingredients[-1]
+        url = f'/api/recipes/?ingredients={ingredient.id}'
+        self.assertEqual(self.recipe_ids(url), (0, set()))
+        recipe = create_recipe(
+            self.stranger,
+            'Новый рецепт',
+            cooking_time=3,
+            image=make_image(),
+        )
+        IngredientRecipe.objects.create(
+            recipe=recipe, ingredient=ingredient, amount=1
+        )
+        self.assertEqual(self.recipe_ids(url), (1, {recipe.id}))
+
+    def test_edited_recipe(self):
+        removed = self.ingredients[0]
+        added = self.ingredients[-1]
+        url = '/api/recipes/?ingredients={}'
+        self.assertEqual(self.recipe_ids(url.format(added.id)), (0, set()))
+        self.client.patch(
+            f'/api/recipes/{self.own_recipe.id}/',
+            self.recipe_payload('Измененный рецепт'),
+            format='json',
+        )
+        self.assertEqual(
+            self.recipe_ids(url.format(added.id)), (1, {self.own_recipe.id})
+        )
+        self.assertEqual(
+            self.recipe_ids(url.format(removed.id))[0],
+            Recipe.objects.filter(ingredients=removed).count()
+        )
+
+    def test_refreshes_in_background(self):
+        self.client.get(f'/api/recipes/?ingredients={self.ingredients[0].id}')
+        snapshot = recipe_ingredient_index._snapshot
+        recipe_ingredient_index.invalidate()
+        with mock.patch.object(
+            recipe_ingredient_index, 'rebuild_interval', -1
+        ), mock.patch('recipes.ingredient_index.threading.Thread') as thread:
+            self.assertIs(recipe_ingredient_index._get_snapshot(), snapshot)
+            self.assertIs(recipe_ingredient_index._get_snapshot(), snapshot)
+        thread.assert_called_once()
+        self.assertEqual(
+            thread.call_args.kwargs['target'],
+            recipe_ingredient_index._refresh
+        )
+        thread.return_value.start.assert_called_once_with()
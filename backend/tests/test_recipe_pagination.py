@@ -0,0 +1,86 @@
+"""Курсорная пагинация рецептов при совпадающих значениях сортировки."""
+
+from base64 import urlsafe_b64encode
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from recipes.search import search_recipes
+from .helpers import build_recipe, create_author
+
+TIED_RECIPES = 1150
+
+
+class RecipeCursorPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        Recipe.objects.bulk_create(
+            build_recipe(cls.author, f'Рецепт {number}')
+            for number in range(TIED_RECIPES)
+        )
+        cls.recipe_ids = list(
+            Recipe.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def read_all(self, url):
+        recipe_ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            recipe_ids += [recipe['id'] for recipe in response.data['results']]
+            url = response.data['next']
+        return recipe_ids
+
+    def test_tied_values_past_offset_cutoff(self):
+        recipe_ids = self.read_all(
+            '/api/recipes/?pagination=cursor&ordering=cooking_time&limit=100'
+        )
+        self.assertEqual(len(recipe_ids), len(set(recipe_ids)))
+        self.assertEqual(recipe_ids, self.recipe_ids)
+
+    def test_tied_favorites_count(self):
+        recipe_ids = self.read_all(
+            '/api/recipes/?pagination=cursor&ordering=popular&limit=100'
+        )
+        self.assertEqual(recipe_ids, self.recipe_ids)
+
+    def test_search_keeps_relevance_order(self):
+        Recipe.objects.bulk_create(
+            build_recipe(self.author, name, text=text)
+            for number in range(3)
+            for name, text in (
+                (f'Борщ {number}', 'Описание рецепта'),
+                (f'Суп {number}', 'Почти как борщ'),
+                (f'Борщ с борщом {number}', 'Борщ'),
+            )
+        )
+        expected = list(
+            search_recipes(Recipe.objects.all(), 'борщ').order_by(
+                '-search_rank', 'id'
+            ).values_list('id', flat=True)
+        )
+        self.assertEqual(len(expected), 9)
+        self.assertEqual(
+            self.read_all(
+                '/api/recipes/?pagination=cursor&limit=2'
+                f'&search={quote("борщ")}'
+            ),
+            expected
+        )
+
+    def test_invalid_cursor(self):
+        for cursor in ('broken', urlsafe_b64encode(b'soon|1').decode()):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    f'/api/recipes/?ordering=cooking_time&cursor={cursor}'
+                )
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,106 @@
+"""Популярность рецептов за последнее время и сортировка ordering=trending."""
+
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from favorite_recipes.models import UserFavoriteRecipes
+from foodgram_backend.constants import TRENDING_WINDOW_HOURS
+from recipe_trends.models import RecipeActivity
+from recipe_trends.utils import record_activity
+from recipes.models import Recipe
+from .helpers import create_author, create_recipe, create_user
+
+
+class RecipeTrendsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.users = [
+            create_user(
+                f'user{number}',
+                first_name='Пользователь',
+                last_name=str(number)
+            )
+            for number in range(3)
+        ]
+        cls.recipes = [
+            create_recipe(cls.author, f'Рецепт {number}')
+            for number in range(3)
+        ]
+
+    def post(self, user, recipe, action):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(f'/api/recipes/{recipe.id}/{action}/')
+        self.assertEqual(response.status_code, 201)
+
+    def trending(self):
+        response = APIClient().get('/api/recipes/?ordering=trending')
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def scores(self):
+        return dict(Recipe.objects.values_list('id', 'trending_score'))
+
+    def rebuild(self, *args):
+        call_command('rebuild_trending', *args, stdout=io.StringIO())
+
+    def test_recent_activity_ranks_first(self):
+        first, second, third = self.recipes
+        self.post(self.users[0], third, 'shopping_cart')
+        for user in self.users[:2]:
+            self.post(user, second, 'favorite')
+        self.post(self.users[2], first, 'favorite')
+        self.assertEqual(self.trending(), [second.id, first.id, third.id])
+        self.assertEqual(
+            RecipeActivity.objects.get(recipe=second).favorites, 2
+        )
+
+    def test_older_activity_decays(self):
+        first, second, _ = self.recipes
+        record_activity(
+            first.id, timezone.now() - timedelta(hours=48), favorites=3
+        )
+        record_activity(second.id, timezone.now(), favorites=1)
+        self.assertEqual(self.trending()[:2], [second.id, first.id])
+
+    def test_rebuild_matches_incremental_scores(self):
+        for user in self.users:
+            self.post(user, self.recipes[0], 'favorite')
+        self.post(self.users[0], self.recipes[1], 'shopping_cart')
+        record_activity(
+            self.recipes[2].id,
+            timezone.now() - timedelta(hours=5),
+            favorites=2
+        )
+        incremental = self.scores()
+        self.rebuild()
+        for recipe_id, score in self.scores().items():
+            self.assertAlmostEqual(score, incremental[recipe_id], places=9)
+
+    def test_rebuild_drops_activity_outside_window(self):
+        recipe = self.recipes[0]
+        record_activity(
+            recipe.id,
+            timezone.now() - timedelta(hours=TRENDING_WINDOW_HOURS + 2),
+            favorites=1
+        )
+        self.rebuild()
+        self.assertFalse(RecipeActivity.objects.exists())
+        self.assertEqual(self.scores()[recipe.id], 0)
+
+    def test_rebuild_activity_from_favorites(self):
+        UserFavoriteRecipes.objects.bulk_create(
+            UserFavoriteRecipes(user=user, recipe=self.recipes[1])
+            for user in self.users
+        )
+        self.rebuild('--activity')
+        self.assertEqual(
+            RecipeActivity.objects.get(recipe=self.recipes[1]).favorites, 3
+        )
+        self.assertEqual(self.trending()[0], self.recipes[1].id)
@@ -0,0 +1,68 @@
+"""Списки покупок: поддержка при изменениях и выгрузка."""
+
+from django.test import TestCase, override_settings
+
+from shoppingcart_recipes.models import ShoppingListItem
+from shoppingcart_recipes.utils import (change_shopping_lists,
+                                        rebuild_shopping_lists)
+from .helpers import MEDIA_ROOT, SampleDataMixin
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ShoppingListTest(SampleDataMixin, TestCase):
+
+    def download(self, url=DOWNLOAD_URL):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def shopping_lists(self):
+        return set(ShoppingListItem.objects.values_list(
+            'user_id', 'ingredient_id', 'amount'
+        ))
+
+    def test_follows_cart_and_recipe_edits(self):
+        for recipe in (self.lonely_recipe, self.own_recipe):
+            self.client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        self.client.patch(
+            f'/api/recipes/{self.own_recipe.id}/',
+            self.recipe_payload('Измененный рецепт'),
+            format='json',
+        )
+        self.client.delete(f'/api/recipes/{self.recipes[0].id}/shopping_cart/')
+        maintained = self.shopping_lists()
+        rebuild_shopping_lists()
+        self.assertEqual(maintained, self.shopping_lists())
+
+    def test_change_shopping_lists_adds_in_database(self):
+        first, second = self.ingredients[-2:]
+        ShoppingListItem.objects.create(
+            user=self.stranger, ingredient=first, amount=5
+        )
+        change_shopping_lists(
+            [self.user.id, self.stranger.id], {first.id: 3, second.id: 2}
+        )
+        change_shopping_lists([self.stranger.id], {first.id: 4})
+        change_shopping_lists([self.user.id], {first.id: -3, second.id: 1})
+        self.assertEqual(
+            set(ShoppingListItem.objects.filter(
+                ingredient__in=(first, second)
+            ).values_list('user_id', 'ingredient_id', 'amount')),
+            {
+                (self.stranger.id, first.id, 12),
+                (self.stranger.id, second.id, 2),
+                (self.user.id, second.id, 3),
+            }
+        )
+
+    def test_download_formats(self):
+        for export_format in ('txt', 'pdf'):
+            with self.subTest(export_format=export_format):
+                self.assertTrue(
+                    self.download(f'{DOWNLOAD_URL}?type={export_format}')
+                )
+
+    def test_cached_download_matches_first(self):
+        self.assertEqual(self.download(), self.download())
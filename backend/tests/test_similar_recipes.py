@@ -0,0 +1,167 @@
+"""Расчет похожих рецептов командой compute_similar_recipes."""
+
+import io
+from itertools import combinations
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+
+from foodgram_backend.constants import (SIMILAR_RECIPES_COUNT,
+                                        SIMILAR_RECIPES_TAG_WEIGHT)
+from ingredients.models import Ingredient
+from recipes.models import IngredientRecipe, Recipe
+from similar_recipes.models import SimilarRecipe
+from tags.models import Tag
+from .helpers import create_author, create_recipe
+
+
+class SimilarRecipesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_author()
+        cls.tags = [
+            Tag.objects.create(name=f'Тэг {number}', slug=f'tag-{number}')
+            for number in range(3)
+        ]
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(8)
+        )
+        cls.ingredients = list(Ingredient.objects.order_by('id'))
+        for number, ingredients in enumerate(
+            combinations(cls.ingredients[:6], 3)
+        ):
+            cls.create_recipe(
+                f'Рецепт {number}',
+                ingredients,
+                cls.tags[number % len(cls.tags):][:1]
+            )
+
+    @classmethod
+    def create_recipe(cls, name, ingredients, tags):
+        recipe = create_recipe(cls.author, name)
+        recipe.tags.set(tags)
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        return recipe
+
+    def compute(self, *args):
+        call_command('compute_similar_recipes', *args, stdout=io.StringIO())
+        return {
+            recipe_id: [
+                (similar_id, score)
+                for similar_id, score in SimilarRecipe.objects.filter(
+                    recipe_id=recipe_id
+                ).order_by('-score', 'similar_id').values_list(
+                    'similar_id', 'score'
+                )
+            ]
+            for recipe_id in Recipe.objects.values_list('id', flat=True)
+        }
+
+    def dense_scores(self):
+        """Id рецептов и их попарная близость по плотным векторам."""
+        recipes = list(
+            Recipe.objects.order_by('id').prefetch_related(
+                'tags', 'ingredients'
+            )
+        )
+        vectors = np.zeros((len(recipes), len(self.ingredients) + 3))
+        columns = {
+            ingredient.id: column
+            for column, ingredient in enumerate(self.ingredients)
+        }
+        for row, recipe in enumerate(recipes):
+            for ingredient in recipe.ingredients.all():
+                vectors[row, columns[ingredient.id]] = 1
+            for tag in recipe.tags.all():
+                vectors[row, len(self.ingredients) + self.tags.index(tag)] = (
+                    SIMILAR_RECIPES_TAG_WEIGHT
+                )
+        norms = np.linalg.norm(vectors, axis=1)
+        vectors[norms > 0] /= norms[norms > 0, np.newaxis]
+        return [recipe.id for recipe in recipes], np.round(
+            vectors @ vectors.T, 6
+        )
+
+    def expected(self):
+        """Похожие рецепты, посчитанные плотными векторами."""
+        recipe_ids, scores = self.dense_scores()
+        expected = {}
+        for row, recipe_id in enumerate(recipe_ids):
+            neighbours = sorted(
+                (
+                    (-scores[row, column], other_id)
+                    for column, other_id in enumerate(recipe_ids)
+                    if column != row and scores[row, column] > 0
+                ),
+            )[:SIMILAR_RECIPES_COUNT]
+            expected[recipe_id] = [
+                (recipe_id, -score) for score, recipe_id in neighbours
+            ]
+        return expected
+
+    def assertSimilar(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for recipe_id, neighbours in expected.items():
+            self.assertEqual(
+                [similar_id for similar_id, _ in actual[recipe_id]],
+                [similar_id for similar_id, _ in neighbours],
+                recipe_id
+            )
+            np.testing.assert_allclose(
+                [score for _, score in actual[recipe_id]],
+                [score for _, score in neighbours],
+                atol=1e-6
+            )
+
+    def test_full_computation_matches_dense_cosine(self):
+        self.assertSimilar(self.compute(), self.expected())
+
+    def test_incremental_computation_matches_full(self):
+        self.compute()
+        changed = Recipe.objects.order_by('id')[3]
+        IngredientRecipe.objects.filter(recipe=changed).delete()
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=changed, ingredient=ingredient, amount=1)
+            for ingredient in self.ingredients[5:]
+        )
+        changed.save()
+        Recipe.objects.order_by('id')[7].delete()
+        self.create_recipe('Новый рецепт', self.ingredients[:2], self.tags)
+
+        incremental = self.compute('--incremental')
+        self.assertSimilar(incremental, self.expected())
+        SimilarRecipe.objects.all().delete()
+        self.assertSimilar(self.compute(), incremental)
+
+    def test_incremental_computation_skips_unchanged_recipes(self):
+        self.compute()
+        computed_at = dict(
+            SimilarRecipe.objects.values_list('id', 'computed_at')
+        )
+        self.compute('--incremental')
+        self.assertEqual(
+            dict(SimilarRecipe.objects.values_list('id', 'computed_at')),
+            computed_at
+        )
+
+    def test_candidate_limit_keeps_exact_scores(self):
+        recipe_ids, scores = self.dense_scores()
+        rows = {recipe_id: row for row, recipe_id in enumerate(recipe_ids)}
+        with mock.patch('similar_recipes.utils.SIMILAR_RECIPES_CANDIDATES', 5):
+            with mock.patch(
+                'similar_recipes.utils.SIMILAR_RECIPES_BATCH_SIZE', 3
+            ):
+                actual = self.compute()
+        for recipe_id, neighbours in actual.items():
+            self.assertTrue(neighbours, recipe_id)
+            for similar_id, score in neighbours:
+                self.assertAlmostEqual(
+                    score, scores[rows[recipe_id], rows[similar_id]], places=6
+                )
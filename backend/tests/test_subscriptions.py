@@ -0,0 +1,34 @@
+"""Подписки на авторов."""
+
+from urllib.parse import quote
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from user_subscriptions.models import Subscription
+from .helpers import create_author, create_recipe, create_user
+
+
+class SubscriptionsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.author = create_author()
+        create_recipe(cls.author)
+        Subscription.objects.create(
+            subscriber=cls.user, subscribe_target=cls.author
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_invalid_recipes_limit(self):
+        for recipes_limit in ('много', '-1'):
+            with self.subTest(recipes_limit=recipes_limit):
+                response = self.client.get(
+                    '/api/users/subscriptions/'
+                    f'?recipes_limit={quote(recipes_limit)}'
+                )
+                self.assertEqual(response.status_code, 400)
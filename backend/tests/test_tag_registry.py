@@ -0,0 +1,28 @@
+"""Реестр slug -> id тэгов для фильтрации рецептов."""
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from tags.models import Tag
+from tags.registry import TagRegistry
+
+
+class TagRegistryTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_new_tag_is_visible_to_other_processes(self):
+        breakfast = Tag.objects.create(name='Завтрак', slug='breakfast')
+        # Отдельный экземпляр - реестр другого процесса бэкенда.
+        registry = TagRegistry()
+        self.assertEqual(registry.get_ids(['breakfast', 'lunch']), [
+            breakfast.id
+        ])
+        lunch = Tag.objects.create(name='Обед', slug='lunch')
+        self.assertEqual(registry.get_ids(['breakfast', 'lunch']), [
+            breakfast.id, lunch.id
+        ])
+        self.assertIn(('lunch', 'lunch'), registry.choices())
+        lunch.delete()
+        self.assertEqual(registry.get_ids(['lunch']), [])
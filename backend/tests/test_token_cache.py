@@ -0,0 +1,67 @@
+"""Кэш токенов авторизации."""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from users.authentication import token_cache, token_cache_key
+from .helpers import (MEDIA_ROOT, SHARED_CACHES, USER_PASSWORD,
+                      SampleDataMixin, make_base64_image)
+
+User = get_user_model()
+ME_URL = '/api/users/me/'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TokenCacheTest(SampleDataMixin, TestCase):
+
+    def test_not_cached_with_local_cache(self):
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(ME_URL)
+            self.assertIn('authtoken_token', context.captured_queries[0]['sql'])
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_deactivation_without_signals_expires(self):
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        token_cache.clear()
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        cache.delete(token_cache_key(self.token.key))
+        token_cache.clear()
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_invalidation(self):
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        self.client.post(f'/api/users/{self.stranger.id}/subscribe/')
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        self.client.put(
+            '/api/users/me/avatar/',
+            {'avatar': make_base64_image()},
+            format='json'
+        )
+        self.assertTrue(self.client.get(ME_URL).data['avatar'])
+        self.client.post(
+            '/api/users/set_password/',
+            {
+                'current_password': USER_PASSWORD,
+                'new_password': 'Pa55word-changed',
+            },
+        )
+        self.assertTrue(
+            self.client.get(ME_URL).wsgi_request.user.check_password(
+                'Pa55word-changed'
+            )
+        )
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+        user.is_active = True
+        user.save()
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        self.client.post('/api/auth/token/logout/')
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
@@ -6,3 +6,6 @@ class UserSubscriptionsConfig(AppConfig):
     name = 'user_subscriptions'
     verbose_name = 'Подписки'
     verbose_name_plural = 'Подписки'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
 
 from recipes.models import Recipe
@@ -8,6 +10,57 @@ from .models import Subscription
 User = get_user_model()
 
 
+def get_recipes_limit(request):
+    """Значение параметра recipes_limit; None, если он не передан."""
+    value = request.query_params.get('recipes_limit')
+    if not value:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = -1
+    if limit < 0:
+        raise serializers.ValidationError(
+            {'recipes_limit': 'Ожидается неотрицательное целое число.'}
+        )
+    return limit
+
+
+def get_recipe_previews(author_ids, limit) -> dict[int, list[Recipe]]:
+    """Первые limit рецептов каждого автора одним запросом.
+
+    Django 3.2 не умеет фильтровать по оконной функции, поэтому запрос
+    с ROW_NUMBER() собирается ORM и оборачивается в raw-запрос.
+    """
+    previews = {author_id: [] for author_id in author_ids}
+    if not author_ids or limit == 0:
+        return previews
+    queryset = Recipe.objects.filter(author_id__in=author_ids).only(
+        'id', 'name', 'image', 'cooking_time', 'has_image_derivatives',
+        'author_id'
+    )
+    if limit is not None:
+        ranked = queryset.annotate(
+            row_number=models.Window(
+                RowNumber(),
+                partition_by=models.F('author_id'),
+                order_by=(
+                    models.F('created_at').desc(), models.F('id').asc()
+                )
+            )
+        ).order_by()
+        sql, params = ranked.query.sql_with_params()
+        queryset = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) ranked '
+            'WHERE ranked.row_number <= %s '
+            'ORDER BY ranked.author_id, ranked.row_number',
+            (*params, limit)
+        )
+    for recipe in queryset:
+        previews[recipe.author_id].append(recipe)
+    return previews
+
+
 class UserSubscriptionActionSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField()
 
@@ -51,8 +104,21 @@ class UserSubscriptionDeleteSerializer(UserSubscriptionActionSerializer):
         return value
 
 
+class UserSubscriptionListSerializer(serializers.ListSerializer):
+    """Получает превью рецептов сразу для всех авторов страницы."""
+
+    def to_representation(self, data):
+        authors = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        self.context['recipe_previews'] = get_recipe_previews(
+            [author.id for author in authors],
+            get_recipes_limit(self.context['request'])
+        )
+        return super().to_representation(authors)
+
+
 class UserSubscriptionSerializer(serializers.ModelSerializer):
-    recipes_count = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
     is_subscribed = serializers.BooleanField(default=True)
 
@@ -69,19 +135,18 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
             'recipes',
             'recipes_count'
         )
-
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        list_serializer_class = UserSubscriptionListSerializer
 
     def get_recipes(self, obj):
-        recipes_limit = self.context['request'].query_params.get(
-            'recipes_limit'
-        )
-        queryset = Recipe.objects.filter(author=obj)
-        if recipes_limit:
-            queryset = queryset[:int(recipes_limit)]
+        previews = self.context.get('recipe_previews')
+        if previews is None:
+            recipes = get_recipe_previews(
+                [obj.id], get_recipes_limit(self.context['request'])
+            )[obj.id]
+        else:
+            recipes = previews[obj.id]
         serializer = RecipeShortInfoSerializer(
-            queryset,
+            recipes,
             context={'request': self.context['request']},
             many=True
         )
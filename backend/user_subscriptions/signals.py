@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.counters import change_counter
+from .models import Subscription
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Subscription)
+def increase_followers_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            User, instance.subscribe_target_id, 'followers_count', 1
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def decrease_followers_count(sender, instance, **kwargs):
+    change_counter(
+        User, instance.subscribe_target_id, 'followers_count', -1
+    )
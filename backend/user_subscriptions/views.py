@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -9,6 +10,8 @@ from .serializers import (UserSubscriptionCreationSerializer,
                           UserSubscriptionDeleteSerializer,
                           UserSubscriptionSerializer)
 
+User = get_user_model()
+
 
 class UserSubscriptionViewSet(UserViewSet):
     """Добавляет вьюсету Юзеров функционал подписок."""
@@ -24,8 +27,9 @@ class UserSubscriptionViewSet(UserViewSet):
 
     def get_queryset(self):
         if self.action == 'subscriptions':
-            queryset = self.request.user.subscriptions.all()
-            return [sub.subscribe_target for sub in queryset]
+            return User.objects.filter(
+                followers__subscriber=self.request.user
+            ).order_by('followers__id')
         return super().get_queryset()
 
     @action(
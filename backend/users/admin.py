@@ -12,7 +12,9 @@ class UserAdmin(BaseUserAdmin):
     list_display = (
         'email',
         'first_name',
-        'last_name'
+        'last_name',
+        'recipes_count',
+        'followers_count'
     )
     search_fields = (
         'email',
@@ -0,0 +1,105 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import SAFE_METHODS
+
+from foodgram_backend.constants import (AUTH_TOKEN_CACHE_SIZE,
+                                        AUTH_TOKEN_CACHE_TTL,
+                                        AUTH_TOKEN_LOCAL_TTL)
+from utils.cache import is_shared_cache
+
+
+def token_cache_key(key: str) -> str:
+    return 'auth_token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+class TokenCache:
+    """Токены вместе с пользователями в LRU процесса и в общем кэше.
+
+    В памяти процесса хранится не больше max_size токенов, каждый не
+    дольше local_ttl секунд; в общем кэше - shared_ttl секунд. Сброс
+    удаляет токен из общего кэша сразу, а из памяти других процессов
+    он уходит не позже чем через local_ttl. Изменения пользователя в
+    обход сигналов, например QuerySet.update(is_active=False), кэш не
+    сбрасывают и вступают в силу не позже чем через shared_ttl +
+    local_ttl.
+    """
+
+    def __init__(self, max_size: int, local_ttl: int, shared_ttl: int):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._tokens = OrderedDict()
+        self._lock = Lock()
+
+    def _remember(self, key: str, token) -> None:
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + self.local_ttl)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            token, expires_at = self._tokens.get(key, (None, 0.0))
+            if token is not None and expires_at > time.monotonic():
+                self._tokens.move_to_end(key)
+                return token
+            self._tokens.pop(key, None)
+        token = cache.get(token_cache_key(key))
+        if token is not None:
+            self._remember(key, token)
+        return token
+
+    def set(self, key: str, token) -> None:
+        cache.set(token_cache_key(key), token, self.shared_ttl)
+        self._remember(key, token)
+
+    def invalidate(self, keys) -> None:
+        keys = list(keys)
+        cache.delete_many([token_cache_key(key) for key in keys])
+        with self._lock:
+            for key in keys:
+                self._tokens.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+token_cache = TokenCache(
+    AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_LOCAL_TTL, AUTH_TOKEN_CACHE_TTL
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Аутентификация по токену без запроса к БД на каждый вызов API.
+
+    Читающие запросы берут токен и пользователя из token_cache. Изменяющие
+    запросы всегда проверяют токен по БД и обновляют кэш: они сохраняют
+    пользователя, и его данные не должны быть устаревшими.
+
+    Сброс кэша при выходе или блокировке пользователя виден другим
+    процессам только через общий кэш, поэтому с кэшем в памяти процесса
+    (LocMemCache) токен каждый раз проверяется по БД.
+    """
+
+    use_cache = True
+
+    def authenticate(self, request):
+        self.use_cache = (
+            request.method in SAFE_METHODS and is_shared_cache()
+        )
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key) if self.use_cache else None
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            if self.use_cache:
+                token_cache.set(key, token)
+        return token.user, token
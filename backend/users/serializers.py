@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import models
 from rest_framework import serializers
 
 from user_subscriptions.models import Subscription
@@ -7,6 +8,18 @@ from utils.serializer_fields import Base64ImageField
 User = get_user_model()
 
 
+def get_subscribed_ids(user, author_ids) -> set[int]:
+    """Возвращает id авторов из списка, на которых подписан пользователь."""
+    if not user.is_authenticated or not author_ids:
+        return set()
+    return set(
+        Subscription.objects.filter(
+            subscriber=user,
+            subscribe_target__in=author_ids
+        ).values_list('subscribe_target_id', flat=True)
+    )
+
+
 class UserAvatarSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField()
 
@@ -17,6 +30,20 @@ class UserAvatarSerializer(serializers.ModelSerializer):
         )
 
 
+class UserListSerializer(serializers.ListSerializer):
+    """Определяет подписки сразу для всей страницы пользователей."""
+
+    def to_representation(self, data):
+        users = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        self.context['subscribed_ids'] = get_subscribed_ids(
+            self.context['request'].user,
+            [user.id for user in users]
+        )
+        return super().to_representation(users)
+
+
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
@@ -31,8 +58,12 @@ class UserSerializer(serializers.ModelSerializer):
             'is_subscribed',
             'avatar'
         )
+        list_serializer_class = UserListSerializer
 
     def get_is_subscribed(self, obj):
+        subscribed_ids = self.context.get('subscribed_ids')
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
         return (
             self.context['request'].user.is_authenticated
             and Subscription.objects.filter(
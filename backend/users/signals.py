@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields,
+                           **kwargs):
+    """Сбрасывает токен пользователя при смене пароля, активности, профиля.
+
+    Обновление только last_login при входе кэш не сбрасывает.
+    """
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    token_cache.invalidate(
+        Token.objects.filter(user_id=instance.pk).values_list(
+            'key', flat=True
+        )
+    )
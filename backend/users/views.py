@@ -3,6 +3,7 @@ from djoser.serializers import SetPasswordSerializer, UserCreateSerializer
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
@@ -20,6 +21,7 @@ class UserViewSet(
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     pagination_class = LimitOffsetPagination
+    parser_classes = (JSONParser, MultiPartParser)
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -73,7 +75,7 @@ class UserViewSet(
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(
-            serializer.validated_data
+            serializer.data
         )
 
     @avatar.mapping.delete
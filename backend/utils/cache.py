@@ -0,0 +1,23 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache() -> bool:
+    """Общий ли кэш по умолчанию для всех процессов бэкенда."""
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def get_version(key: str) -> str:
+    """Текущая версия из кэша; если ее нет, заводит новую."""
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(key, version, None)
+    return version
@@ -0,0 +1,117 @@
+import gzip
+import hashlib
+import time
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.renderers import JSONRenderer
+
+from foodgram_backend.constants import CATALOG_CACHE_TIMEOUT
+from .cache import get_version
+
+_local_catalogs = {}
+
+
+class Catalog(NamedTuple):
+    """Готовое тело ответа справочника для одной версии данных."""
+
+    version: str
+    etag: str
+    last_modified: int
+    body: bytes
+    compressed: bytes
+
+
+def catalog_version_key(name: str) -> str:
+    return f'catalog:{name}:version'
+
+
+def invalidate_catalog(name: str) -> None:
+    cache.delete(catalog_version_key(name))
+
+
+def get_catalog(name: str, render) -> Catalog:
+    """Справочник текущей версии: из памяти процесса, из кэша или заново.
+
+    render вызывается только при смене версии и должен вернуть тело
+    ответа в байтах.
+    """
+    version = get_version(catalog_version_key(name))
+    catalog = _local_catalogs.get(name)
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    key = f'catalog:{name}:{version}'
+    catalog = cache.get(key)
+    if catalog is None:
+        body = render()
+        catalog = Catalog(
+            version=version,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            last_modified=int(time.time()),
+            body=body,
+            compressed=gzip.compress(body, mtime=0),
+        )
+        cache.set(key, catalog, CATALOG_CACHE_TIMEOUT)
+    _local_catalogs[name] = catalog
+    return catalog
+
+
+def is_not_modified(request, etags, last_modified: int) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or any(
+            tag.strip().removeprefix('W/') in etags
+            for tag in if_none_match.split(',')
+        )
+    if_modified_since = parse_http_date_safe(
+        request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+    )
+    return (
+        if_modified_since is not None
+        and last_modified <= if_modified_since
+    )
+
+
+class PrerenderedCatalogMixin:
+    """Отдает список справочника готовыми байтами с ETag и Last-Modified.
+
+    Список рендерится один раз на версию справочника и хранится как есть
+    и в gzip. Запросы с параметрами фильтрации обрабатываются обычным
+    образом. Версию сбрасывает invalidate_catalog(catalog_name).
+    """
+
+    catalog_name = None
+
+    def render_catalog(self) -> bytes:
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return JSONRenderer().render(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        catalog = get_catalog(self.catalog_name, self.render_catalog)
+        identity_etag = f'"{catalog.etag}"'
+        gzip_etag = f'"{catalog.etag}-gzip"'
+        use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        etag = gzip_etag if use_gzip else identity_etag
+
+        if is_not_modified(
+            request, (identity_etag, gzip_etag), catalog.last_modified
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                catalog.compressed if use_gzip else catalog.body,
+                content_type='application/json'
+            )
+            if use_gzip:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(catalog.last_modified)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
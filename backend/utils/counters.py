@@ -0,0 +1,47 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def change_counter(model, pk, field: str, delta: int) -> None:
+    """Атомарно изменяет хранимый счетчик, не опуская его ниже нуля."""
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def change_counters(model, pks, field: str, delta: int) -> None:
+    """То же для нескольких объектов одним UPDATE.
+
+    pks - список id или подзапрос values('...') с ними.
+    """
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def count_subquery(model, field: str):
+    """Подзапрос с количеством строк model, ссылающихся на объект."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def reconcile_counter(model, field: str, related_model, related_field: str):
+    """Пересчитывает хранимый счетчик, возвращает число исправленных строк."""
+    actual = count_subquery(related_model, related_field)
+    drifted = model.objects.annotate(actual=actual).exclude(
+        **{field: F('actual')}
+    ).count()
+    if drifted:
+        model.objects.update(**{field: actual})
+    return drifted
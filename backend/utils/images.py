@@ -0,0 +1,111 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from foodgram_backend.constants import (IMAGE_DERIVATIVE_FORMAT,
+                                        IMAGE_DERIVATIVE_QUALITY,
+                                        IMAGE_DERIVATIVE_SIZES)
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+            thread_name_prefix='image-derivatives'
+        )
+    return _executor
+
+
+def derivative_name(name: str, size: str) -> str:
+    """Путь уменьшенной копии изображения в хранилище."""
+    directory, filename = posixpath.split(name)
+    extension = IMAGE_DERIVATIVE_FORMAT.lower()
+    return posixpath.join(
+        directory, 'derivatives', f'{filename}.{size}.{extension}'
+    )
+
+
+def build_derivatives(name: str) -> None:
+    """Сохраняет уменьшенные копии изображения всех размеров."""
+    with default_storage.open(name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA')
+    for size, max_side in IMAGE_DERIVATIVE_SIZES.items():
+        image = original.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(
+            buffer,
+            IMAGE_DERIVATIVE_FORMAT,
+            quality=IMAGE_DERIVATIVE_QUALITY,
+            method=4
+        )
+        target = derivative_name(name, size)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def delete_derivatives(name: str) -> None:
+    """Удаляет копии изображения, если на него не ссылается ни один рецепт."""
+    if not name or Recipe.objects.filter(image=name).exists():
+        return
+    for size in IMAGE_DERIVATIVE_SIZES:
+        default_storage.delete(derivative_name(name, size))
+
+
+def process_recipe_image(recipe_id: int, name: str) -> None:
+    """Строит копии изображения и отмечает рецепт как обработанный.
+
+    Если пока строились копии, изображение рецепта сменилось или рецепт
+    удалили, копии сразу удаляются.
+    """
+    try:
+        build_derivatives(name)
+        if not Recipe.objects.filter(pk=recipe_id, image=name).update(
+            has_image_derivatives=True
+        ):
+            delete_derivatives(name)
+    except Exception:
+        logger.exception(
+            'Не удалось обработать изображение рецепта %s', recipe_id
+        )
+    finally:
+        connection.close()
+
+
+def schedule_recipe_image(recipe) -> None:
+    """Ставит обработку изображения рецепта в очередь после коммита."""
+    recipe_id, name = recipe.pk, recipe.image.name
+    transaction.on_commit(
+        lambda: get_executor().submit(process_recipe_image, recipe_id, name)
+    )
+
+
+def schedule_derivatives_deletion(name: str) -> None:
+    """Удаляет копии прежнего изображения рецепта после коммита."""
+    transaction.on_commit(lambda: delete_derivatives(name))
+
+
+def recipe_image_url(request, recipe, size: str) -> str:
+    """Абсолютная ссылка на копию нужного размера или на оригинал."""
+    if recipe.has_image_derivatives:
+        url = default_storage.url(derivative_name(recipe.image.name, size))
+    else:
+        url = recipe.image.url
+    return request.build_absolute_uri(url)
@@ -1,16 +1,129 @@
-import base64
+import binascii
+import os
+import posixpath
+import tempfile
+import weakref
+from contextlib import suppress
+from urllib.parse import urlparse
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+from foodgram_backend.constants import (BASE64_DECODE_CHUNK_SIZE,
+                                        IMAGE_UPLOAD_MAX_SIZE)
+
+BASE64_SEPARATOR = ';base64,'
+
+
+def remove_file(path: str) -> None:
+    with suppress(FileNotFoundError):
+        os.remove(path)
+
+
+class DecodedTemporaryFile(UploadedFile):
+    """Временный файл на диске для декодированного изображения.
+
+    Хранилище может переместить файл при сохранении, поэтому удаление
+    оставшегося файла выполняется при сборке мусора и не падает,
+    если файла уже нет.
+    """
+
+    def __init__(self, name, content_type):
+        descriptor, self.path = tempfile.mkstemp(
+            suffix='.upload', dir=settings.FILE_UPLOAD_TEMP_DIR
+        )
+        super().__init__(
+            os.fdopen(descriptor, 'w+b'), name, content_type, 0, None
+        )
+        weakref.finalize(self, remove_file, self.path)
+
+    def temporary_file_path(self):
+        return self.path
 
 
 class Base64ImageField(serializers.ImageField):
-    """Преобразует строку base64 в файл изображения."""
+    """Принимает изображение строкой base64 или файлом из multipart-формы.
+
+    Строка base64 декодируется по частям во временный файл, размер
+    изображения ограничен max_upload_size. Если клиент прислал обратно
+    текущее изображение объекта - ссылку на него или на его уменьшенную
+    копию, либо тот же файл, - поле пропускается и файл не перезаписывается.
+    """
+
+    default_error_messages = {
+        'too_large': (
+            'Размер изображения не должен превышать {max_size} байт.'
+        ),
+        'invalid_base64': 'Некорректная строка base64.',
+    }
+
+    def __init__(self, *args, max_upload_size=IMAGE_UPLOAD_MAX_SIZE,
+                 **kwargs):
+        self.max_upload_size = max_upload_size
+        super().__init__(*args, **kwargs)
+
+    def decode_base64(self, data):
+        header_end = data.index(BASE64_SEPARATOR)
+        start = header_end + len(BASE64_SEPARATOR)
+        if (len(data) - start) // 4 * 3 > self.max_upload_size:
+            self.fail('too_large', max_size=self.max_upload_size)
+
+        ext = data[:header_end].split('/')[-1]
+        file = DecodedTemporaryFile('temp.' + ext, 'image/' + ext)
+        try:
+            for offset in range(start, len(data), BASE64_DECODE_CHUNK_SIZE):
+                file.write(binascii.a2b_base64(
+                    data[offset:offset + BASE64_DECODE_CHUNK_SIZE]
+                ))
+        except binascii.Error:
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        return file
+
+    def get_current_file(self):
+        instance = getattr(self.parent, 'instance', None)
+        if instance is None or isinstance(instance, (list, tuple)):
+            return None
+        return getattr(instance, self.source, None) or None
+
+    def is_current_file(self, data):
+        current_file = self.get_current_file()
+        if current_file is None:
+            return False
+        if isinstance(data, str):
+            path = urlparse(data).path
+            filename = posixpath.basename(current_file.name)
+            return (
+                path == current_file.url
+                or posixpath.basename(path).startswith(filename + '.')
+            )
+        try:
+            if current_file.size != data.size:
+                return False
+            with current_file.open('rb') as stored:
+                for chunk in data.chunks():
+                    if stored.read(len(chunk)) != chunk:
+                        return False
+        except OSError:
+            return False
+        finally:
+            data.seek(0)
+        return True
 
     def to_internal_value(self, data):
-        if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+        if (
+            isinstance(data, str)
+            and data.startswith('data:image')
+            and BASE64_SEPARATOR in data
+        ):
+            data = self.decode_base64(data)
+        elif getattr(data, 'size', 0) > self.max_upload_size:
+            self.fail('too_large', max_size=self.max_upload_size)
 
+        if self.is_current_file(data):
+            raise SkipField()
         return super().to_internal_value(data)